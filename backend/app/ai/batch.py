@@ -0,0 +1,396 @@
+"""Offline batch AI analysis - daily Quality Inspector and Control System reports for all users.
+
+Runs as a resumable pipeline over a work directory:
+
+1. prepare  - load every active user's day in bulk and write OpenAI batch JSONL
+2. submit   - upload the file and create a batch (/v1/files, /v1/batches)
+3. wait     - poll the batch until it finishes and download its output
+4. store    - parse results and save one inspection per user in chunks
+
+Progress is checkpointed to `checkpoint.json` after each stage (and after each
+stored chunk), so re-running with the same work directory resumes where it
+stopped. Run:
+
+    python -m app.ai.batch --date 2026-01-31 --work-dir ./batch_runs/2026-01-31
+
+Point OPENAI_BASE_URL at benchmarks.fake_llm_server to run against the local stand-in.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from datetime import date
+from typing import Any, AsyncIterator, Dict, List
+
+import httpx
+from sqlalchemy import select, delete, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.config import get_settings
+from app.database import async_session_maker
+from app.auth.models import UserModel
+from app.modules.inputs import models as _inputs_models  # noqa: F401 - configures relationships when run standalone
+from app.modules.process_design import models as _process_models  # noqa: F401
+from app.modules.daily_operations.models import DailyLogModel
+from app.modules.daily_operations.service import execution_detail
+from app.modules.measurement.models import InspectionModel
+from app.modules.measurement.service import compute_daily_metrics, find_issues
+from app.ai.context import build_execution_context
+from app.ai.service import get_ai_service
+from app.ai.prompts.quality_inspector import QUALITY_INSPECTOR_SYSTEM_PROMPT, get_quality_inspector_prompt
+from app.ai.prompts.control_system import CONTROL_SYSTEM_PROMPT, get_control_system_prompt
+
+settings = get_settings()
+
+# Inspection target type used for batch-generated daily reports
+BATCH_TARGET_TYPE = "ai_daily"
+
+STAGES = ("prepared", "submitted", "completed", "stored")
+
+
+class Checkpoint:
+    """JSON checkpoint persisted atomically in the work directory."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data: Dict[str, Any] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.data = json.load(f)
+
+    def reached(self, stage: str) -> bool:
+        """Check whether a stage has already completed."""
+        current = self.data.get("stage")
+        return current is not None and STAGES.index(current) >= STAGES.index(stage)
+
+    def save(self, **updates: Any) -> None:
+        """Merge updates and write the checkpoint."""
+        self.data.update(updates)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.data, f, indent=2, default=str)
+        os.replace(tmp_path, self.path)
+
+
+async def gather_snapshots(
+    db: AsyncSession,
+    target_date: date,
+    chunk_size: int = 500
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yield each active user's daily snapshot, loading logs for `chunk_size` users per query."""
+    user_ids = (await db.scalars(
+        select(DailyLogModel.user_id)
+        .join(UserModel, UserModel.id == DailyLogModel.user_id)
+        .where(UserModel.is_active == True, DailyLogModel.execution_date == target_date)
+        .distinct()
+        .order_by(DailyLogModel.user_id)
+    )).all()
+
+    for start in range(0, len(user_ids), chunk_size):
+        chunk = user_ids[start:start + chunk_size]
+        result = await db.execute(
+            select(DailyLogModel)
+            .where(DailyLogModel.user_id.in_(chunk), DailyLogModel.execution_date == target_date)
+            .options(joinedload(DailyLogModel.step), selectinload(DailyLogModel.deviations))
+            .order_by(DailyLogModel.user_id, DailyLogModel.planned_start, DailyLogModel.created_at)
+        )
+        logs_by_user: Dict[str, List[DailyLogModel]] = {}
+        for log in result.scalars().all():
+            logs_by_user.setdefault(log.user_id, []).append(log)
+
+        for user_id in chunk:
+            logs = logs_by_user.get(user_id, [])
+            yield {
+                "user_id": user_id,
+                "metrics": compute_daily_metrics(logs),
+                "issues": find_issues(logs),
+                "day_logs": [execution_detail(log) for log in logs]
+            }
+        # Keep memory flat across chunks
+        db.expunge_all()
+
+
+def build_requests(snapshot: Dict[str, Any], target_date: date) -> List[Dict[str, Any]]:
+    """Build the batch request lines (one per AI role) for a user snapshot."""
+    ai = get_ai_service()
+    metrics = snapshot["metrics"]
+    logs, deviations, omitted_summary = build_execution_context(
+        snapshot["day_logs"], settings.ai_prompt_token_budget
+    )
+    quality_prompt = get_quality_inspector_prompt({
+        "date": str(target_date),
+        "execution_accuracy": metrics.get("execution_accuracy"),
+        "time_deviation": metrics.get("time_deviation"),
+        "quality_compliance": metrics.get("quality_compliance"),
+        "logs": logs,
+        "deviations": deviations,
+        "omitted_summary": omitted_summary
+    })
+    control_prompt = get_control_system_prompt({
+        **metrics,
+        "issues": snapshot["issues"],
+        "recent_deviations": deviations,
+        "signals": []
+    })
+    return [
+        {
+            "custom_id": f"{snapshot['user_id']}|{role}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": ai.request_body(system_prompt, user_prompt)
+        }
+        for role, system_prompt, user_prompt in (
+            ("quality_inspector", QUALITY_INSPECTOR_SYSTEM_PROMPT, quality_prompt),
+            ("control_system", CONTROL_SYSTEM_PROMPT, control_prompt),
+        )
+    ]
+
+
+class BatchClient:
+    """Minimal client for the OpenAI files and batches REST endpoints."""
+
+    def __init__(self, base_url: str, api_key: str, timeout: float = 60.0):
+        self._client = httpx.AsyncClient(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout
+        )
+
+    async def close(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self._client.aclose()
+
+    async def upload(self, path: str) -> str:
+        """Upload a batch input file and return its file id."""
+        with open(path, "rb") as f:
+            response = await self._client.post(
+                "/files",
+                data={"purpose": "batch"},
+                files={"file": (os.path.basename(path), f, "application/jsonl")}
+            )
+        response.raise_for_status()
+        return response.json()["id"]
+
+    async def create_batch(self, input_file_id: str) -> Dict[str, Any]:
+        """Create a chat completions batch for an uploaded file."""
+        response = await self._client.post("/batches", json={
+            "input_file_id": input_file_id,
+            "endpoint": "/v1/chat/completions",
+            "completion_window": "24h"
+        })
+        response.raise_for_status()
+        return response.json()
+
+    async def get_batch(self, batch_id: str) -> Dict[str, Any]:
+        """Fetch a batch's current status."""
+        response = await self._client.get(f"/batches/{batch_id}")
+        response.raise_for_status()
+        return response.json()
+
+    async def download(self, file_id: str, path: str) -> None:
+        """Stream a file's content to disk."""
+        async with self._client.stream("GET", f"/files/{file_id}/content") as response:
+            response.raise_for_status()
+            with open(path, "wb") as f:
+                async for chunk in response.aiter_bytes():
+                    f.write(chunk)
+
+
+def _normalize_list(items: Any) -> List[Dict[str, Any]]:
+    """Coerce AI list output into the list-of-dicts shape inspections expect."""
+    if not isinstance(items, list):
+        return []
+    return [item if isinstance(item, dict) else {"type": item} for item in items]
+
+
+def _read_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """Parse batch output into {user_id: {role: parsed JSON or error}}, keeping usage under `_usage`."""
+    results: Dict[str, Dict[str, Any]] = {}
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            user_id, _, role = record["custom_id"].partition("|")
+            response = record.get("response") or {}
+            body = response.get("body") or {}
+            entry: Dict[str, Any]
+            if response.get("status_code") == 200:
+                try:
+                    entry = json.loads(body["choices"][0]["message"]["content"])
+                except (KeyError, IndexError, TypeError, ValueError) as e:
+                    entry = {"error": f"Invalid JSON from AI: {e}"}
+                if not isinstance(entry, dict):
+                    entry = {"error": f"Expected a JSON object from AI, got {type(entry).__name__}"}
+            else:
+                entry = {"error": (record.get("error") or body.get("error") or {"message": "request failed"})}
+            entry["_usage"] = body.get("usage") or {}
+            results.setdefault(user_id, {})[role] = entry
+    return results
+
+
+async def store_results(
+    results_path: str,
+    target_date: date,
+    checkpoint: Checkpoint,
+    chunk_size: int = 500
+) -> Dict[str, int]:
+    """Replace each user's batch inspection for the date, one transaction per chunk.
+
+    Users with a failed role are only counted in `errors`; their previous
+    inspection, if any, is kept.
+    """
+    results = _read_results(results_path)
+    user_ids = sorted(results)
+    stored = checkpoint.data.get("stored_users", 0)
+    counts = {"errors": 0, "prompt_tokens": 0, "completion_tokens": 0}
+
+    for roles in results.values():
+        for entry in roles.values():
+            counts["errors"] += "error" in entry
+            counts["prompt_tokens"] += entry["_usage"].get("prompt_tokens", 0)
+            counts["completion_tokens"] += entry["_usage"].get("completion_tokens", 0)
+
+    while stored < len(user_ids):
+        chunk = user_ids[stored:stored + chunk_size]
+        rows = []
+        for user_id in chunk:
+            quality = results[user_id].get("quality_inspector", {})
+            control = results[user_id].get("control_system", {})
+            if "error" in quality or "error" in control:
+                continue
+            rows.append({
+                "user_id": user_id,
+                "target_type": BATCH_TARGET_TYPE,
+                "target_id": str(target_date),
+                "inspection_date": target_date,
+                "quality_score": quality.get("quality_score"),
+                "compliance_score": quality.get("compliance_score"),
+                "findings": _normalize_list(quality.get("findings")),
+                "waste_identified": _normalize_list(quality.get("waste_identified")),
+                "errors_detected": _normalize_list(quality.get("errors_detected")),
+                "recommendations": [{k: v for k, v in control.items() if k != "_usage"}]
+            })
+
+        if rows:
+            async with async_session_maker() as db:
+                await db.execute(
+                    delete(InspectionModel).where(
+                        InspectionModel.user_id.in_([row["user_id"] for row in rows]),
+                        InspectionModel.target_type == BATCH_TARGET_TYPE,
+                        InspectionModel.inspection_date == target_date
+                    )
+                )
+                await db.execute(insert(InspectionModel), rows)
+                await db.commit()
+
+        stored += len(chunk)
+        checkpoint.save(stored_users=stored)
+
+    counts["users"] = len(user_ids)
+    return counts
+
+
+async def run_batch_pipeline(
+    target_date: date,
+    work_dir: str,
+    poll_interval: float = 10.0,
+    chunk_size: int = 500
+) -> Dict[str, Any]:
+    """Run (or resume) the batch pipeline for a date and return a throughput report."""
+    os.makedirs(work_dir, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(work_dir, "checkpoint.json"))
+    if checkpoint.data.get("date", str(target_date)) != str(target_date):
+        raise ValueError(f"Work directory {work_dir} belongs to {checkpoint.data['date']}")
+    checkpoint.save(date=str(target_date))
+
+    timings: Dict[str, float] = checkpoint.data.get("timings", {})
+    requests_path = os.path.join(work_dir, "requests.jsonl")
+    results_path = os.path.join(work_dir, "results.jsonl")
+
+    if not checkpoint.reached("prepared"):
+        started = time.perf_counter()
+        users = requests = 0
+        async with async_session_maker() as db:
+            with open(requests_path, "w") as f:
+                async for snapshot in gather_snapshots(db, target_date, chunk_size):
+                    for line in build_requests(snapshot, target_date):
+                        f.write(json.dumps(line) + "\n")
+                        requests += 1
+                    users += 1
+        timings["prepare"] = time.perf_counter() - started
+        checkpoint.save(stage="prepared", users=users, requests=requests, timings=timings)
+
+    if checkpoint.data.get("requests", 0) == 0:
+        return {"date": str(target_date), "users": 0, "requests": 0, "timings": timings}
+
+    client = BatchClient(
+        settings.openai_base_url or "https://api.openai.com/v1",
+        settings.openai_api_key
+    )
+    try:
+        if not checkpoint.reached("submitted"):
+            started = time.perf_counter()
+            file_id = await client.upload(requests_path)
+            batch = await client.create_batch(file_id)
+            timings["submit"] = time.perf_counter() - started
+            checkpoint.save(stage="submitted", input_file_id=file_id, batch_id=batch["id"], timings=timings)
+
+        if not checkpoint.reached("completed"):
+            started = time.perf_counter()
+            while True:
+                batch = await client.get_batch(checkpoint.data["batch_id"])
+                if batch["status"] in ("completed", "failed", "expired", "cancelled"):
+                    break
+                await asyncio.sleep(poll_interval)
+            if batch["status"] != "completed" or not batch.get("output_file_id"):
+                checkpoint.save(batch_status=batch["status"])
+                raise RuntimeError(f"Batch {batch['id']} ended with status {batch['status']}")
+            await client.download(batch["output_file_id"], results_path)
+            timings["wait"] = timings.get("wait", 0.0) + time.perf_counter() - started
+            checkpoint.save(
+                stage="completed",
+                output_file_id=batch["output_file_id"],
+                request_counts=batch.get("request_counts"),
+                timings=timings
+            )
+    finally:
+        await client.close()
+
+    if not checkpoint.reached("stored"):
+        started = time.perf_counter()
+        counts = await store_results(results_path, target_date, checkpoint, chunk_size)
+        timings["store"] = timings.get("store", 0.0) + time.perf_counter() - started
+        checkpoint.save(stage="stored", result_counts=counts, timings=timings)
+
+    data = checkpoint.data
+    users = data.get("users", 0)
+    return {
+        "date": data["date"],
+        "users": users,
+        "requests": data.get("requests", 0),
+        "request_counts": data.get("request_counts"),
+        "result_counts": data.get("result_counts"),
+        "timings": timings,
+        "prepare_users_per_second": users / timings["prepare"] if timings.get("prepare") else None,
+        "store_users_per_second": users / timings["store"] if timings.get("store") else None,
+        "end_to_end_seconds": sum(timings.values()),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the daily batch AI analysis for all active users.")
+    parser.add_argument("--date", type=date.fromisoformat, default=date.today(), help="Execution date (YYYY-MM-DD)")
+    parser.add_argument("--work-dir", required=True, help="Directory for batch files and the checkpoint")
+    parser.add_argument("--poll-interval", type=float, default=10.0, help="Seconds between batch status polls")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Users per load/store chunk")
+    args = parser.parse_args()
+    report = asyncio.run(run_batch_pipeline(args.date, args.work_dir, args.poll_interval, args.chunk_size))
+    print(json.dumps(report, indent=2, default=str))
+
+
+if __name__ == "__main__":
+    main()
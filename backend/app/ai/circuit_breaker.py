@@ -0,0 +1,128 @@
+"""Circuit breaker for AI provider calls."""
+
+import time
+from collections import deque
+from enum import Enum
+from typing import Deque, Dict, Any, Tuple
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker state enum."""
+    CLOSED = "closed"  # Calls flow normally
+    OPEN = "open"  # Calls are rejected immediately
+    HALF_OPEN = "half_open"  # A single trial call is let through
+
+
+class CircuitBreaker:
+    """Failure-rate and latency based circuit breaker.
+
+    Keeps the outcome of the last `window_size` calls. Once at least
+    `min_calls` have been recorded, the circuit opens when the share of
+    failed calls or of calls slower than `slow_call_seconds` reaches its
+    threshold. After `reset_timeout_seconds` one trial call is allowed;
+    its outcome closes the circuit or opens it again. A trial that has not
+    reported back within another `reset_timeout_seconds` is given up on and
+    the next call becomes the trial.
+    """
+
+    def __init__(
+        self,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        slow_call_rate_threshold: float = 0.5,
+        reset_timeout_seconds: float = 30.0,
+    ):
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+
+        self._outcomes: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)  # (failed, slow)
+        self._state = CircuitState.CLOSED
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started_at = 0.0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the timeout has elapsed."""
+        if self._state == CircuitState.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout_seconds:
+            self._state = CircuitState.HALF_OPEN
+            self._trial_in_flight = False
+        elif (
+            self._state == CircuitState.HALF_OPEN and self._trial_in_flight
+            and time.monotonic() - self._trial_started_at >= self.reset_timeout_seconds
+        ):
+            # The trial never reported an outcome; let another call try
+            self._trial_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Check whether a call may go to the provider, reserving the half-open trial."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and not self._trial_in_flight:
+            self._trial_in_flight = True
+            self._trial_started_at = time.monotonic()
+            return True
+        return False
+
+    def is_open(self) -> bool:
+        """Check whether calls are currently being rejected."""
+        state = self.state
+        return state == CircuitState.OPEN or (state == CircuitState.HALF_OPEN and self._trial_in_flight)
+
+    def record_success(self, latency_seconds: float) -> None:
+        """Record a successful call and its latency."""
+        self._record(failed=False, latency_seconds=latency_seconds)
+
+    def record_failure(self, latency_seconds: float) -> None:
+        """Record a failed call and its latency."""
+        self._record(failed=True, latency_seconds=latency_seconds)
+
+    def _record(self, failed: bool, latency_seconds: float) -> None:
+        slow = latency_seconds >= self.slow_call_seconds
+
+        if self._state == CircuitState.HALF_OPEN:
+            self._trial_in_flight = False
+            if failed or slow:
+                self._open()
+            else:
+                self._state = CircuitState.CLOSED
+                self._outcomes.clear()
+            return
+
+        self._outcomes.append((failed, slow))
+        if self._state == CircuitState.CLOSED and self._should_trip():
+            self._open()
+
+    def _should_trip(self) -> bool:
+        total = len(self._outcomes)
+        if total < self.min_calls:
+            return False
+        failures = sum(1 for failed, _ in self._outcomes if failed)
+        slow_calls = sum(1 for _, slow in self._outcomes if slow)
+        return (
+            failures / total >= self.failure_rate_threshold
+            or slow_calls / total >= self.slow_call_rate_threshold
+        )
+
+    def _open(self) -> None:
+        self._state = CircuitState.OPEN
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarize breaker state for health reporting."""
+        total = len(self._outcomes)
+        return {
+            "state": self.state.value,
+            "recent_calls": total,
+            "recent_failure_rate": (sum(1 for failed, _ in self._outcomes if failed) / total) if total else 0.0,
+            "recent_slow_call_rate": (sum(1 for _, slow in self._outcomes if slow) / total) if total else 0.0,
+        }
@@ -0,0 +1,136 @@
+"""Compact execution context for AI prompts under a token budget."""
+
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+# Per-field character caps applied before budgeting
+MAX_EXECUTION_CHARS = 160
+MAX_DEVIATION_CHARS = 200
+MAX_ROOT_CAUSE_CHARS = 160
+
+LOW_QUALITY_THRESHOLD = 0.6
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+def _truncate(text: Optional[str], limit: int) -> Optional[str]:
+    """Cut text to at most `limit` characters."""
+    if not text or len(text) <= limit:
+        return text
+    return text[: limit - 1].rstrip() + "…"
+
+
+def _priority(log: Dict[str, Any]) -> int:
+    """Rank logs by how much they tell the inspector; problems first."""
+    score = 0
+    if log.get("status") in ("skipped", "blocked"):
+        score += 3
+    quality = log.get("quality_score")
+    if quality is not None and quality < LOW_QUALITY_THRESHOLD:
+        score += 3
+    if log.get("deviations"):
+        score += 2
+    if log.get("status") in ("pending", "in_progress"):
+        score += 1
+    return score
+
+
+def _log_entry(log: Dict[str, Any], with_execution: bool) -> Dict[str, Any]:
+    """Compact a log to the fields the Quality Inspector prompt renders."""
+    entry = {
+        "step_name": log.get("step_name"),
+        "status": log.get("status"),
+        "quality_score": log.get("quality_score"),
+    }
+    if with_execution and log.get("actual_execution"):
+        entry["actual_execution"] = _truncate(log["actual_execution"], MAX_EXECUTION_CHARS)
+    return entry
+
+
+def _deviation_entry(deviation: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact a deviation to the fields the prompts render."""
+    return {
+        "type": deviation.get("type"),
+        "description": _truncate(deviation.get("description"), MAX_DEVIATION_CHARS),
+        "root_cause": _truncate(deviation.get("root_cause"), MAX_ROOT_CAUSE_CHARS),
+    }
+
+
+def _log_cost(entry: Dict[str, Any]) -> int:
+    """Token cost of the line the Quality Inspector prompt renders for a log."""
+    text = f"- {entry['step_name']}: {entry['status']} (Quality: {entry['quality_score']})"
+    if entry.get("actual_execution"):
+        text += f"\n  Execution: {entry['actual_execution']}"
+    return estimate_tokens(text)
+
+
+def _deviation_cost(entry: Dict[str, Any]) -> int:
+    """Token cost of the line the Quality Inspector prompt renders for a deviation."""
+    text = f"- [{entry['type']}] {entry['description']}"
+    if entry.get("root_cause"):
+        text += f"\n  Root cause: {entry['root_cause']}"
+    return estimate_tokens(text)
+
+
+def build_execution_context(
+    day_logs: List[Dict[str, Any]],
+    token_budget: int
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Optional[str]]:
+    """Select and compact a day's logs and deviations to fit a token budget.
+
+    Problem logs (skipped, blocked, low quality, with deviations) are kept
+    first, each with its deviations. When a log does not fit, it is retried
+    without its execution notes; logs that still do not fit are only counted
+    in the returned summary line.
+
+    Returns (logs, deviations, omitted_summary).
+    """
+    ranked = sorted(enumerate(day_logs), key=lambda item: (-_priority(item[1]), item[0]))
+
+    remaining = token_budget
+    selected: List[Tuple[int, Dict[str, Any], List[Dict[str, Any]]]] = []
+    omitted: List[Dict[str, Any]] = []
+
+    for position, log in ranked:
+        deviations = [_deviation_entry(d) for d in log.get("deviations") or []]
+        deviation_cost = sum(_deviation_cost(d) for d in deviations)
+
+        for with_execution in (True, False):
+            entry = _log_entry(log, with_execution)
+            cost = _log_cost(entry)
+            if cost + deviation_cost <= remaining:
+                selected.append((position, entry, deviations))
+                remaining -= cost + deviation_cost
+                break
+            if cost <= remaining and not with_execution:
+                # Keep the log line even if its deviations do not all fit
+                kept = []
+                remaining -= cost
+                for d in deviations:
+                    d_cost = _deviation_cost(d)
+                    if d_cost <= remaining:
+                        kept.append(d)
+                        remaining -= d_cost
+                selected.append((position, entry, kept))
+                break
+        else:
+            omitted.append(log)
+
+    # Present the kept logs in their original (schedule) order
+    selected.sort(key=lambda item: item[0])
+    logs = [entry for _, entry, _ in selected]
+    deviations = [d for _, _, kept in selected for d in kept]
+
+    summary = None
+    if omitted:
+        statuses = Counter(log.get("status") or "unknown" for log in omitted)
+        omitted_deviations = sum(len(log.get("deviations") or []) for log in omitted)
+        summary = (
+            f"{len(omitted)} more logs not shown ("
+            + ", ".join(f"{count} {status}" for status, count in statuses.most_common())
+            + f"; {omitted_deviations} deviations)"
+        )
+    return logs, deviations, summary
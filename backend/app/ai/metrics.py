@@ -0,0 +1,110 @@
+"""In-process instrumentation of AI calls per role."""
+
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS: Tuple[float, ...] = (0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+
+class RoleStats:
+    """Cumulative counters and latency histogram for one AI role."""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.parse_failures = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.estimated_cost_usd = 0.0
+        self.latency_sum = 0.0
+        self.bucket_counts: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe_latency(self, latency_seconds: float) -> None:
+        """Add a latency observation to the histogram."""
+        self.latency_sum += latency_seconds
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if latency_seconds <= bound:
+                self.bucket_counts[i] += 1
+                return
+        self.bucket_counts[-1] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize with cumulative (Prometheus-style) bucket counts."""
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], self.bucket_counts):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "parse_failures": self.parse_failures,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "estimated_cost_usd": round(self.estimated_cost_usd, 6),
+            "latency_seconds": {
+                "sum": round(self.latency_sum, 6),
+                "count": self.calls,
+                "buckets": buckets,
+            },
+        }
+
+
+class AIMetrics:
+    """Records latency, token usage, failures and estimated cost per AI role.
+
+    Cumulative counters feed the metrics endpoint; a bounded window of the
+    most recent calls feeds the error rate and p95 latency on the health check.
+    """
+
+    def __init__(self, prompt_cost_per_1k: float, completion_cost_per_1k: float, recent_window: int = 200):
+        self.prompt_cost_per_1k = prompt_cost_per_1k
+        self.completion_cost_per_1k = completion_cost_per_1k
+        self._roles: Dict[str, RoleStats] = {}
+        self._recent: Deque[Tuple[float, bool]] = deque(maxlen=recent_window)  # (latency, failed)
+
+    def record_call(
+        self,
+        role: str,
+        latency_seconds: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        error: bool = False,
+        parse_failure: bool = False,
+    ) -> None:
+        """Record one completed (or failed) provider call."""
+        stats = self._roles.setdefault(role, RoleStats())
+        stats.calls += 1
+        stats.observe_latency(latency_seconds)
+        stats.prompt_tokens += prompt_tokens
+        stats.completion_tokens += completion_tokens
+        stats.estimated_cost_usd += (
+            prompt_tokens / 1000 * self.prompt_cost_per_1k
+            + completion_tokens / 1000 * self.completion_cost_per_1k
+        )
+        if error:
+            stats.errors += 1
+        if parse_failure:
+            stats.parse_failures += 1
+        self._recent.append((latency_seconds, error or parse_failure))
+
+    def recent_error_rate(self) -> float:
+        """Share of failed calls in the recent window."""
+        if not self._recent:
+            return 0.0
+        return sum(1 for _, failed in self._recent if failed) / len(self._recent)
+
+    def recent_p95_latency(self) -> Optional[float]:
+        """95th percentile latency in seconds over the recent window."""
+        if not self._recent:
+            return None
+        latencies = sorted(latency for latency, _ in self._recent)
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Summarize all roles for the metrics endpoint."""
+        return {
+            "roles": {role: stats.to_dict() for role, stats in self._roles.items()},
+            "total_estimated_cost_usd": round(sum(s.estimated_cost_usd for s in self._roles.values()), 6),
+        }
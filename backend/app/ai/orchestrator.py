@@ -3,13 +3,21 @@
 from typing import Dict, Any, List
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.ai.service import get_ai_service
+from app.ai.template_index import TemplateStore, goal_text
+from app.ai.context import build_execution_context
 from app.modules.inputs.service import get_goal_by_id
-from app.modules.process_design.service import create_process
+from app.modules.process_design.service import create_processes_bulk
 from app.modules.process_design.schemas import ProcessCreate, ProcessStepCreate, StepFrequency
 from app.modules.measurement.service import calculate_daily_metrics, detect_issues
-from app.modules.control.service import create_improvement
+from app.modules.daily_operations.service import get_day_execution_details
+from app.modules.control.service import create_improvement, suggest_improvements
 from app.modules.control.schemas import ImprovementCreate
+from app.singleflight import get_single_flight, analysis_key
+from app.metrics import record_cache
+
+settings = get_settings()
 
 
 class AIOrchestrator:
@@ -17,6 +25,10 @@ class AIOrchestrator:
     
     def __init__(self):
         self.ai = get_ai_service()
+        self.templates = TemplateStore(
+            ttl_seconds=settings.ai_template_index_ttl_seconds,
+            max_users=settings.ai_template_index_max_users
+        )
     
     async def auto_design_processes(
         self, 
@@ -24,7 +36,11 @@ class AIOrchestrator:
         user_id: str, 
         goal_id: str
     ) -> Dict[str, Any]:
-        """Automatically design processes for a goal using AI Process Engineer."""
+        """Automatically design processes for a goal using AI Process Engineer.
+        
+        If one of the user's previously accepted designs belongs to a sufficiently
+        similar goal it is reused instead of generating a new one.
+        """
         from app.modules.inputs.models import GoalModel
         from sqlalchemy import select
         from sqlalchemy.orm import selectinload
@@ -58,14 +74,25 @@ class AIOrchestrator:
             ]
         }
         
-        # Get AI-designed processes
-        ai_result = await self.ai.design_processes(goal_data)
+        # Reuse the closest accepted design, falling back to the AI for novel goals
+        template_match = None
+        if settings.ai_template_reuse_enabled:
+            index = await self.templates.get_index(db, user_id)
+            matches = index.query(goal_text(goal_data), limit=1, exclude_id=goal.id)
+            if matches and matches[0][0] >= settings.ai_template_min_similarity:
+                template_match = matches[0]
+            record_cache("ai_template_reuse", template_match is not None)
+        
+        if template_match:
+            ai_result = template_match[2]
+        else:
+            ai_result = await self.ai.design_processes(goal_data)
         
         if "error" in ai_result:
             return ai_result
         
-        # Create processes in database
-        created_processes = []
+        # Create all processes and steps in bulk
+        processes_data = []
         for process_data in ai_result.get("processes", []):
             steps = [
                 ProcessStepCreate(
@@ -81,26 +108,33 @@ class AIOrchestrator:
                 for idx, step in enumerate(process_data.get("steps", []))
             ]
             
-            process_create = ProcessCreate(
+            processes_data.append(ProcessCreate(
                 name=process_data.get("name", "Untitled Process"),
                 description=process_data.get("description"),
                 purpose=process_data.get("purpose"),
                 sequence_order=process_data.get("sequence_order", 0),
                 steps=steps
-            )
-            
-            process = await create_process(db, goal_id, process_create)
-            created_processes.append({
+            ))
+        
+        processes = await create_processes_bulk(db, goal_id, processes_data)
+        created_processes = [
+            {
                 "id": process.id,
                 "name": process.name,
-                "steps_count": len(steps)
-            })
+                "steps_count": len(process.steps)
+            }
+            for process in processes
+        ]
         
-        return {
+        result = {
             "success": True,
+            "source": "template" if template_match else "ai",
             "processes_created": len(created_processes),
             "processes": created_processes
         }
+        if template_match:
+            result["template_similarity"] = round(template_match[0], 4)
+        return result
     
     async def full_analysis(
         self, 
@@ -108,21 +142,43 @@ class AIOrchestrator:
         user_id: str, 
         target_date
     ) -> Dict[str, Any]:
-        """Run full analysis using all AI roles."""
-        from datetime import date
+        """Run full analysis using all AI roles.
         
+        Concurrent requests for the same user and date share one pipeline run.
+        """
+        return await get_single_flight().do(
+            analysis_key(user_id, target_date, "ai_full_analysis"),
+            lambda: self._run_full_analysis(db, user_id, target_date)
+        )
+    
+    async def _run_full_analysis(
+        self, 
+        db: AsyncSession, 
+        user_id: str, 
+        target_date
+    ) -> Dict[str, Any]:
+        """Run the Quality Inspector and Control System pipeline."""
         # Step 1: Get metrics
         metrics = await calculate_daily_metrics(db, user_id, target_date)
         issues = await detect_issues(db, user_id, target_date)
         
-        # Step 2: Quality inspection
+        # Provider unhealthy: serve the rule-based analysis instead of waiting on it
+        if not self.ai.is_available():
+            return self._degraded_analysis(target_date, metrics, issues)
+        
+        # Step 2: Quality inspection on the day's logs, compacted to the prompt budget
+        day_logs = await get_day_execution_details(db, user_id, target_date)
+        logs, deviations, omitted_summary = build_execution_context(
+            day_logs, settings.ai_prompt_token_budget
+        )
         execution_data = {
             "date": str(target_date),
             "execution_accuracy": metrics.get("execution_accuracy"),
             "time_deviation": metrics.get("time_deviation"),
             "quality_compliance": metrics.get("quality_compliance"),
-            "logs": [],  # Would be populated with actual logs
-            "deviations": []
+            "logs": logs,
+            "deviations": deviations,
+            "omitted_summary": omitted_summary
         }
         quality_report = await self.ai.inspect_quality(execution_data)
         
@@ -130,11 +186,14 @@ class AIOrchestrator:
         analysis_data = {
             **metrics,
             "issues": issues,
-            "recent_deviations": [],
+            "recent_deviations": deviations,
             "signals": []
         }
         control_recommendations = await self.ai.get_control_recommendations(analysis_data)
         
+        if quality_report.get("degraded") or control_recommendations.get("degraded"):
+            return self._degraded_analysis(target_date, metrics, issues)
+        
         return {
             "date": str(target_date),
             "metrics": metrics,
@@ -142,6 +201,30 @@ class AIOrchestrator:
             "quality_report": quality_report,
             "control_recommendations": control_recommendations
         }
+    
+    def _degraded_analysis(
+        self,
+        target_date,
+        metrics: Dict[str, Any],
+        issues: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Build the full analysis from the deterministic control rules."""
+        return {
+            "date": str(target_date),
+            "degraded": True,
+            "metrics": metrics,
+            "issues_detected": issues,
+            "quality_report": {
+                "source": "rule_based",
+                "quality_score": metrics.get("quality_compliance"),
+                "compliance_score": metrics.get("execution_accuracy"),
+                "findings": issues
+            },
+            "control_recommendations": {
+                "source": "rule_based",
+                "recommendations": suggest_improvements(metrics, issues)
+            }
+        }
 
 
 # Singleton instance
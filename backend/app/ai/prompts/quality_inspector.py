@@ -60,7 +60,7 @@ Analyze the following execution data:
 DATE: {execution_data.get('date', 'Unknown')}
 
 EXECUTION LOGS:
-{_format_logs(execution_data.get('logs', []))}
+{_format_logs(execution_data.get('logs', []), execution_data.get('omitted_summary'))}
 
 METRICS:
 - Execution Accuracy: {execution_data.get('execution_accuracy', 'N/A')}
@@ -75,10 +75,10 @@ Focus on process issues, not personal criticism.
 """
 
 
-def _format_logs(logs: list) -> str:
+def _format_logs(logs: list, omitted_summary: str = None) -> str:
     """Format execution logs for the prompt."""
     if not logs:
-        return "- No logs available"
+        return f"- {omitted_summary}" if omitted_summary else "- No logs available"
     
     lines = []
     for log in logs:
@@ -88,6 +88,8 @@ def _format_logs(logs: list) -> str:
         if log.get('actual_execution'):
             line += f"\n  Execution: {log.get('actual_execution')}"
         lines.append(line)
+    if omitted_summary:
+        lines.append(f"- {omitted_summary}")
     return "\n".join(lines)
 
 
@@ -21,6 +21,11 @@ async def auto_design_processes(
     orchestrator = get_orchestrator()
     result = await orchestrator.auto_design_processes(db, user_id, goal_id)
     
+    if result.get("degraded"):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=result["error"]
+        )
     if "error" in result:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -36,7 +41,11 @@ async def full_analysis(
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """Run full AI analysis (Quality Inspection + Control Recommendations)."""
+    """Run full AI analysis (Quality Inspection + Control Recommendations).
+    
+    While the AI provider circuit is open the rule-based analysis is served
+    instead and the response is marked with `degraded: true`.
+    """
     orchestrator = get_orchestrator()
     result = await orchestrator.full_analysis(db, user_id, target_date)
     return result
@@ -49,5 +58,16 @@ async def ai_health():
     service = get_ai_service()
     return {
         "configured": service.client is not None,
-        "model": service.model
+        "model": service.model,
+        "circuit": service.breaker.snapshot(),
+        "recent_error_rate": service.metrics.recent_error_rate(),
+        "recent_p95_latency_seconds": service.metrics.recent_p95_latency()
     }
+
+
+@router.get("/metrics")
+async def ai_metrics():
+    """Per-role AI call latency histograms, token usage, parse failures and estimated cost."""
+    from app.ai.service import get_ai_service
+    service = get_ai_service()
+    return service.metrics.snapshot()
@@ -3,11 +3,14 @@
 from typing import Dict, Any, Optional
 from openai import AsyncOpenAI
 import json
+import time
 
 from app.config import get_settings
 from app.ai.prompts.process_engineer import PROCESS_ENGINEER_SYSTEM_PROMPT, get_process_engineer_prompt
 from app.ai.prompts.quality_inspector import QUALITY_INSPECTOR_SYSTEM_PROMPT, get_quality_inspector_prompt
 from app.ai.prompts.control_system import CONTROL_SYSTEM_PROMPT, get_control_system_prompt
+from app.ai.circuit_breaker import CircuitBreaker
+from app.ai.metrics import AIMetrics
 
 settings = get_settings()
 
@@ -16,45 +19,98 @@ class AIService:
     """Centralized AI service with role-based prompting."""
     
     def __init__(self):
-        self.client = AsyncOpenAI(api_key=settings.openai_api_key) if settings.openai_api_key else None
+        self.client = AsyncOpenAI(
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url or None,
+            timeout=settings.ai_timeout_seconds,
+            max_retries=0
+        ) if settings.openai_api_key else None
         self.model = "gpt-4o"
+        self.breaker = CircuitBreaker(
+            window_size=settings.ai_breaker_window_size,
+            min_calls=settings.ai_breaker_min_calls,
+            failure_rate_threshold=settings.ai_breaker_failure_rate,
+            slow_call_seconds=settings.ai_breaker_slow_call_seconds,
+            slow_call_rate_threshold=settings.ai_breaker_slow_call_rate,
+            reset_timeout_seconds=settings.ai_breaker_reset_seconds,
+        )
+        self.metrics = AIMetrics(
+            prompt_cost_per_1k=settings.ai_prompt_cost_per_1k,
+            completion_cost_per_1k=settings.ai_completion_cost_per_1k,
+        )
     
-    async def _call_ai(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
-        """Make an AI API call."""
+    def is_available(self) -> bool:
+        """Check whether AI calls are currently let through by the circuit breaker."""
+        return not self.breaker.is_open()
+    
+    def request_body(self, system_prompt: str, user_prompt: str) -> Dict[str, Any]:
+        """Build the chat completion request body shared by live and batch calls."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_prompt}
+            ],
+            "temperature": 0.3,
+            "response_format": {"type": "json_object"}
+        }
+    
+    async def _call_ai(self, system_prompt: str, user_prompt: str, role: str) -> Dict[str, Any]:
+        """Make an AI API call guarded by the circuit breaker and record its metrics."""
         if not self.client:
             # Return mock response if no API key
             return {"error": "AI service not configured", "mock": True}
         
+        if not self.breaker.allow_request():
+            # Fail fast while the provider is unhealthy
+            return {"error": "AI service temporarily unavailable", "degraded": True}
+        
+        started = time.monotonic()
+        failed = True
         try:
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                response_format={"type": "json_object"}
-            )
+            try:
+                response = await self.client.chat.completions.create(
+                    **self.request_body(system_prompt, user_prompt)
+                )
+            except Exception as e:
+                self.metrics.record_call(role, time.monotonic() - started, error=True)
+                return {"error": str(e)}
+            
+            latency = time.monotonic() - started
+            usage = response.usage
+            prompt_tokens = usage.prompt_tokens if usage else 0
+            completion_tokens = usage.completion_tokens if usage else 0
+            
+            try:
+                parsed = json.loads(response.choices[0].message.content)
+            except (TypeError, ValueError, IndexError, AttributeError) as e:
+                self.metrics.record_call(role, latency, prompt_tokens, completion_tokens, parse_failure=True)
+                return {"error": f"Invalid JSON from AI: {e}"}
             
-            content = response.choices[0].message.content
-            return json.loads(content)
-        except Exception as e:
-            return {"error": str(e)}
+            failed = False
+            self.metrics.record_call(role, latency, prompt_tokens, completion_tokens)
+            return parsed
+        finally:
+            # Settle every call, cancelled ones included, so a half-open trial is always released
+            if failed:
+                self.breaker.record_failure(time.monotonic() - started)
+            else:
+                self.breaker.record_success(time.monotonic() - started)
     
     async def design_processes(self, goal_data: Dict[str, Any]) -> Dict[str, Any]:
         """Use Process Engineer role to design processes for a goal."""
         user_prompt = get_process_engineer_prompt(goal_data)
-        return await self._call_ai(PROCESS_ENGINEER_SYSTEM_PROMPT, user_prompt)
+        return await self._call_ai(PROCESS_ENGINEER_SYSTEM_PROMPT, user_prompt, role="process_engineer")
     
     async def inspect_quality(self, execution_data: Dict[str, Any]) -> Dict[str, Any]:
         """Use Quality Inspector role to analyze execution quality."""
         user_prompt = get_quality_inspector_prompt(execution_data)
-        return await self._call_ai(QUALITY_INSPECTOR_SYSTEM_PROMPT, user_prompt)
+        return await self._call_ai(QUALITY_INSPECTOR_SYSTEM_PROMPT, user_prompt, role="quality_inspector")
     
     async def get_control_recommendations(self, analysis_data: Dict[str, Any]) -> Dict[str, Any]:
         """Use Control System role to get process improvement recommendations."""
         user_prompt = get_control_system_prompt(analysis_data)
-        return await self._call_ai(CONTROL_SYSTEM_PROMPT, user_prompt)
+        return await self._call_ai(CONTROL_SYSTEM_PROMPT, user_prompt, role="control_system")
 
 
 # Singleton instance
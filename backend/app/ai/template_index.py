@@ -0,0 +1,219 @@
+"""Template reuse index - local TF-IDF similarity over a user's previously accepted designs."""
+
+import asyncio
+import math
+import re
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.metrics import record_cache
+from app.modules.inputs.models import GoalModel
+from app.modules.process_design.models import ProcessModel, ProcessStatus
+
+# Process statuses that mark a design as accepted by its user
+ACCEPTED_STATUSES = (ProcessStatus.ACTIVE, ProcessStatus.COMPLETED)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it of on or that the this to with my our i we".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens without stopwords."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if t not in _STOPWORDS]
+
+
+def goal_text(goal: Dict[str, Any]) -> str:
+    """Flatten the goal fields used for matching into one document."""
+    parts = [goal.get("title") or "", goal.get("description") or "", goal.get("purpose") or ""]
+    for r in goal.get("resources") or []:
+        parts.append(" ".join(str(r.get(k) or "") for k in ("name", "type", "unit")))
+    return " ".join(parts)
+
+
+class TemplateIndex:
+    """In-memory TF-IDF index mapping goal documents to process templates.
+
+    Vectors use sublinear term frequency and smoothed IDF and are L2
+    normalized, so the dot product of two vectors is their cosine
+    similarity. An inverted index limits scoring to documents that share
+    at least one term with the query.
+    """
+
+    def __init__(self):
+        self._docs: List[Tuple[str, Counter, Dict[str, Any]]] = []  # (doc_id, term counts, template)
+        self._vectors: List[Dict[str, float]] = []
+        self._postings: Dict[str, List[int]] = {}
+        self._idf: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, doc_id: str, text: str, template: Dict[str, Any]) -> None:
+        """Add a document; call build() afterwards to make it searchable."""
+        self._docs.append((doc_id, Counter(tokenize(text)), template))
+
+    def build(self) -> None:
+        """Compute IDF weights, document vectors and postings."""
+        n_docs = len(self._docs)
+        df: Counter = Counter()
+        for _, counts, _ in self._docs:
+            df.update(counts.keys())
+        self._idf = {term: math.log((1 + n_docs) / (1 + freq)) + 1.0 for term, freq in df.items()}
+
+        self._vectors = []
+        self._postings = {}
+        for i, (_, counts, _) in enumerate(self._docs):
+            self._vectors.append(self._vectorize(counts))
+            for term in counts:
+                self._postings.setdefault(term, []).append(i)
+
+    def _vectorize(self, counts: Counter) -> Dict[str, float]:
+        """Turn term counts into a normalized TF-IDF vector over known terms."""
+        weights = {
+            term: (1.0 + math.log(tf)) * self._idf[term]
+            for term, tf in counts.items() if term in self._idf
+        }
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {term: w / norm for term, w in weights.items()} if norm else {}
+
+    def query(
+        self,
+        text: str,
+        limit: int = 5,
+        exclude_id: Optional[str] = None
+    ) -> List[Tuple[float, str, Dict[str, Any]]]:
+        """Return up to `limit` (similarity, doc_id, template) tuples, best first."""
+        vector = self._vectorize(Counter(tokenize(text)))
+        scores: Dict[int, float] = {}
+        for term, weight in vector.items():
+            for i in self._postings.get(term, ()):
+                scores[i] = scores.get(i, 0.0) + weight * self._vectors[i].get(term, 0.0)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        results = []
+        for i, score in ranked:
+            doc_id, _, template = self._docs[i]
+            if doc_id == exclude_id:
+                continue
+            results.append((score, doc_id, template))
+            if len(results) >= limit:
+                break
+        return results
+
+
+def _template_from_goal(goal: GoalModel) -> Optional[Dict[str, Any]]:
+    """Build an AI-shaped design from a goal's accepted processes."""
+    processes = sorted(
+        (p for p in goal.processes if p.status in ACCEPTED_STATUSES),
+        key=lambda p: p.sequence_order or 0
+    )
+    if not processes:
+        return None
+    return {
+        "processes": [
+            {
+                "name": p.name,
+                "description": p.description,
+                "purpose": p.purpose,
+                "sequence_order": p.sequence_order,
+                "steps": [
+                    {
+                        "name": s.name,
+                        "description": s.description,
+                        "action_verb": s.action_verb,
+                        "estimated_duration_minutes": s.estimated_duration_minutes,
+                        "quality_criteria": s.quality_criteria,
+                        "expected_output": s.expected_output
+                    }
+                    for s in sorted(p.steps, key=lambda s: s.sequence_order or 0)
+                ]
+            }
+            for p in processes
+        ]
+    }
+
+
+async def build_index_from_db(db: AsyncSession, user_id: str) -> TemplateIndex:
+    """Build an index from the user's goals that have at least one accepted process.
+
+    Designs are never shared between users: a template copies names and
+    descriptions into the goal it is applied to.
+    """
+    result = await db.execute(
+        select(GoalModel)
+        .where(
+            GoalModel.user_id == user_id,
+            GoalModel.processes.any(ProcessModel.status.in_(ACCEPTED_STATUSES))
+        )
+        .options(
+            selectinload(GoalModel.resources),
+            selectinload(GoalModel.processes).selectinload(ProcessModel.steps)
+        )
+    )
+    index = TemplateIndex()
+    for goal in result.scalars().all():
+        template = _template_from_goal(goal)
+        if template is None:
+            continue
+        index.add(goal.id, goal_text({
+            "title": goal.title,
+            "description": goal.description,
+            "purpose": goal.purpose,
+            "resources": [
+                {"name": r.name, "type": r.resource_type.value if r.resource_type else None, "unit": r.unit}
+                for r in goal.resources
+            ]
+        }), template)
+    index.build()
+    return index
+
+
+class TemplateStore:
+    """Holds one index per user and rebuilds it from the database when stale."""
+
+    def __init__(self, ttl_seconds: float, max_users: int = 1000):
+        self.ttl_seconds = ttl_seconds
+        self.max_users = max_users
+        self._indexes: "OrderedDict[str, Tuple[TemplateIndex, float]]" = OrderedDict()  # LRU: user -> (index, built at)
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _fresh(self, user_id: str) -> Optional[TemplateIndex]:
+        entry = self._indexes.get(user_id)
+        if entry is None or time.monotonic() - entry[1] >= self.ttl_seconds:
+            return None
+        self._indexes.move_to_end(user_id)
+        return entry[0]
+
+    async def get_index(self, db: AsyncSession, user_id: str) -> TemplateIndex:
+        """Return the user's index, rebuilding it at most once per TTL across concurrent callers."""
+        index = self._fresh(user_id)
+        if index is not None:
+            record_cache("ai_template_index", True)
+            return index
+        lock = self._locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            index = self._fresh(user_id)
+            record_cache("ai_template_index", index is not None)
+            if index is None:
+                index = await build_index_from_db(db, user_id)
+                self._indexes[user_id] = (index, time.monotonic())
+                self._indexes.move_to_end(user_id)
+                while len(self._indexes) > self.max_users:
+                    self._indexes.popitem(last=False)
+        if not lock.locked():
+            self._locks.pop(user_id, None)
+        return index
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """Force a rebuild on next use, for one user or for everyone."""
+        if user_id is None:
+            self._indexes.clear()
+        else:
+            self._indexes.pop(user_id, None)
@@ -38,7 +38,6 @@ async def create_user(db: AsyncSession, user_data: UserCreate) -> UserModel:
     )
     db.add(user)
     await db.flush()
-    await db.refresh(user)
     return user
 
 
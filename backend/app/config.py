@@ -18,7 +18,72 @@ class Settings(BaseSettings):
     
     # OpenAI
     openai_api_key: str = ""
+    openai_base_url: str = ""  # Override to point at an OpenAI-compatible server
+    ai_timeout_seconds: float = 30.0
+    ai_prompt_cost_per_1k: float = 0.0025  # USD per 1K prompt tokens
+    ai_completion_cost_per_1k: float = 0.01  # USD per 1K completion tokens
+    ai_prompt_token_budget: int = 1500  # Budget for logs and deviations in analysis prompts
     
+    # AI template reuse
+    ai_template_reuse_enabled: bool = True
+    ai_template_min_similarity: float = 0.85
+    ai_template_index_ttl_seconds: float = 600.0
+    ai_template_index_max_users: int = 1000  # per-user indexes kept in memory (LRU)
+    
+    # AI circuit breaker
+    ai_breaker_window_size: int = 20
+    ai_breaker_min_calls: int = 5
+    ai_breaker_failure_rate: float = 0.5
+    ai_breaker_slow_call_seconds: float = 20.0
+    ai_breaker_slow_call_rate: float = 0.5
+    ai_breaker_reset_seconds: float = 30.0
+    
+    # Control
+    improvement_trigger_window_days: int = 7  # Generated suggestions are deduplicated per window
+    control_max_range_days: int = 366  # Longest window accepted by range analysis
+    improvement_effect_window_days: int = 14  # Days compared before and after implementation
+    improvement_effect_min_change: float = 0.05  # Smallest metric change that counts as an effect
+    
+    # Daily operations
+    log_batch_max_operations: int = 200  # operations accepted by POST /logs/batch
+
+    # Pagination
+    page_default_limit: int = 100  # page size when a cursor is sent without limit
+    page_max_limit: int = 500
+
+    # Export
+    export_batch_size: int = 1000  # rows fetched per server-side cursor round trip
+    export_columnar_batch_size: int = 50000  # rows per Parquet row group / Arrow record batch
+
+    # Sync
+    sync_overlap_seconds: int = 5  # re-send rows this close to the cursor (in-flight transactions)
+    sync_initial_log_days: int = 30  # daily log history included in a full sync
+    sync_tombstone_retention_days: int = 90  # older cursors get a full sync; older tombstones are pruned
+
+    # Idempotency
+    idempotency_backend: str = "memory"  # "memory" (per process) or "redis"
+    idempotency_ttl_seconds: int = 86400  # how long a completed response is replayed
+    idempotency_lock_seconds: int = 60  # in-flight marker lifetime if a worker dies mid-request
+    idempotency_max_entries: int = 10000  # in-memory LRU capacity
+    idempotency_max_key_length: int = 255
+
+    # Events
+    events_backend: str = "memory"  # "memory" (single process) or "redis" (fan out across workers)
+    events_queue_size: int = 100  # events buffered per connection before it is told to resync
+    events_heartbeat_seconds: float = 15.0
+    events_retry_ms: int = 3000  # client reconnect delay sent in the stream
+
+    # Compression
+    compression_min_size: int = 1024  # complete bodies below this many bytes are sent uncompressed
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4  # 0-11; higher levels cost far more CPU on dynamic responses
+
+    # Metrics
+    metrics_enabled: bool = True  # request metrics middleware and GET /metrics
+
+    # Query stats
+    slow_query_ms: float = 200.0  # statements slower than this are logged with their route
+
     # App
     app_name: str = "IGAMS"
     debug: bool = True
@@ -1,5 +1,7 @@
+from sqlalchemy import event, inspect, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.dialects import postgresql, sqlite
 from app.config import get_settings
 
 settings = get_settings()
@@ -17,8 +19,32 @@ async_session_maker = async_sessionmaker(
 
 
 class Base(DeclarativeBase):
-    """Base class for all database models."""
-    pass
+    """Base class for all database models.
+    
+    `eager_defaults` makes the ORM fetch server-generated values (created_at,
+    updated_at on update) with RETURNING in the INSERT/UPDATE itself, so a
+    flushed object is complete without a refresh() round-trip.
+    """
+    __mapper_args__ = {"eager_defaults": True}
+
+
+@event.listens_for(Base, "init", propagate=True)
+def _init_onupdate_only_columns(target, args, kwargs):
+    """Start columns that only have an onupdate (updated_at) as NULL on new objects.
+    
+    Otherwise eager_defaults issues a separate SELECT after each INSERT to
+    load a column the INSERT already wrote as NULL.
+    """
+    for column in target.__table__.columns:
+        if column.onupdate is not None and column.default is None and column.server_default is None:
+            kwargs.setdefault(column.key, None)
+
+
+def upsert_insert(session: AsyncSession, model):
+    """Dialect-specific INSERT for `model` that supports ON CONFLICT (PostgreSQL, or SQLite locally)."""
+    if session.bind.dialect.name == "sqlite":
+        return sqlite.insert(model)
+    return postgresql.insert(model)
 
 
 async def get_db() -> AsyncSession:
@@ -34,7 +60,40 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
+# Columns and indexes added to tables that already existed. create_all() skips existing
+# tables, so init_db() adds whichever of these an older database lacks.
+SCHEMA_UPGRADE_COLUMNS = [
+    ("improvements", "fingerprint", "VARCHAR(64)"),
+]
+SCHEMA_UPGRADE_INDEXES = [
+    # A unique index rather than a table constraint so SQLite can add it too; ON CONFLICT infers either
+    ("improvements", "uq_improvements_user_fingerprint",
+     "CREATE UNIQUE INDEX uq_improvements_user_fingerprint ON improvements (user_id, fingerprint)"),
+    ("improvements", "ix_improvements_user_status_created",
+     "CREATE INDEX ix_improvements_user_status_created ON improvements (user_id, status, created_at)"),
+]
+
+
+def _upgrade_schema(conn) -> None:
+    """Add the upgrade columns and indexes missing from an existing database.
+
+    Rows written before the fingerprint column existed are manual or AI
+    improvements, which keep a NULL fingerprint (NULLs never conflict), so
+    there is nothing to backfill.
+    """
+    inspector = inspect(conn)
+    for table, column, column_type in SCHEMA_UPGRADE_COLUMNS:
+        if column not in {c["name"] for c in inspector.get_columns(table)}:
+            conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+    for table, name, ddl in SCHEMA_UPGRADE_INDEXES:
+        existing = {i["name"] for i in inspector.get_indexes(table)}
+        existing |= {c["name"] for c in inspector.get_unique_constraints(table)}
+        if name not in existing:
+            conn.execute(text(ddl))
+
+
 async def init_db():
-    """Initialize database tables."""
+    """Initialize database tables and apply schema upgrades to existing ones."""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_upgrade_schema)
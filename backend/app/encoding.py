@@ -0,0 +1,241 @@
+"""Response content negotiation: MessagePack via Accept, gzip/brotli via Accept-Encoding.
+
+Both are ASGI middlewares registered app-wide in app.main, so every route
+gets them without changes:
+
+- `MessagePackMiddleware` re-encodes complete `application/json` responses as
+  `application/msgpack` when the client prefers it in `Accept`.
+- `CompressionMiddleware` compresses text, JSON, NDJSON, CSV and MessagePack
+  bodies with brotli or gzip (brotli wins a tie in `Accept-Encoding`).
+  Complete bodies smaller than `compression_min_size` are left alone;
+  streamed bodies (exports) are compressed chunk by chunk and flushed after
+  each chunk so clients still receive rows as they are produced.
+
+A strong ETag no longer identifies the bytes once they are re-encoded, so
+re-encoded responses carry it as a weak ETag (If-None-Match compares weakly,
+see app.etag).
+"""
+
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import brotli
+import msgpack
+import orjson
+
+from app.config import get_settings
+
+settings = get_settings()
+
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+COMPRESSIBLE_MEDIA_TYPES = (
+    "application/json", "application/x-ndjson", "application/msgpack", "text/csv", "text/plain", "text/html"
+)
+ENCODINGS = ("br", "gzip")  # in order of preference
+
+
+def _media_ranges(header: str) -> Dict[str, float]:
+    """Media types or codings of an Accept-style header mapped to their q-values."""
+    ranges: Dict[str, float] = {}
+    for part in header.split(","):
+        name, *params = (piece.strip() for piece in part.split(";"))
+        if not name:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        ranges[name.lower()] = q
+    return ranges
+
+
+def wants_msgpack(accept: str) -> bool:
+    """Whether the client prefers MessagePack over JSON."""
+    ranges = _media_ranges(accept)
+    msgpack_q = max(ranges.get(media_type, 0.0) for media_type in MSGPACK_MEDIA_TYPES)
+    json_q = max(ranges.get("application/json", 0.0), ranges.get("application/*", 0.0), ranges.get("*/*", 0.0))
+    return msgpack_q > 0 and msgpack_q >= json_q
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Preferred supported content coding, or None for identity."""
+    ranges = _media_ranges(accept_encoding)
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = ranges.get(encoding, ranges.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _without(headers: List[Tuple[bytes, bytes]], *names: bytes) -> List[Tuple[bytes, bytes]]:
+    return [(key, value) for key, value in headers if key.lower() not in names]
+
+
+def _add_vary(headers: List[Tuple[bytes, bytes]], value: bytes) -> List[Tuple[bytes, bytes]]:
+    vary = _header(headers, b"vary")
+    if vary is None:
+        return headers + [(b"vary", value)]
+    if value.lower() in (part.strip().lower() for part in vary.split(b",")):
+        return headers
+    return _without(headers, b"vary") + [(b"vary", vary + b", " + value)]
+
+
+def _weaken_etag(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    etag = _header(headers, b"etag")
+    if etag is None or etag.startswith(b"W/"):
+        return headers
+    return _without(headers, b"etag") + [(b"etag", b"W/" + etag)]
+
+
+def _media_type(headers: List[Tuple[bytes, bytes]]) -> str:
+    content_type = _header(headers, b"content-type") or b""
+    return content_type.split(b";")[0].strip().decode("latin-1").lower()
+
+
+class MessagePackMiddleware:
+    """Re-encode JSON responses as MessagePack for clients that ask for it."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept = _header(scope["headers"], b"accept")
+        use_msgpack = accept is not None and wants_msgpack(accept.decode("latin-1"))
+
+        start: Optional[dict] = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def transcode(message):
+            nonlocal start, passthrough
+            if message["type"] == "http.response.start":
+                if _media_type(message.get("headers", [])) != "application/json":
+                    passthrough = True
+                    await send(message)
+                elif not use_msgpack:
+                    # The representation of JSON responses depends on Accept
+                    passthrough = True
+                    await send({**message, "headers": _add_vary(message.get("headers", []), b"Accept")})
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if message.get("more_body"):
+                return
+            body = b"".join(chunks)
+            headers = _without(start.get("headers", []), b"content-type", b"content-length")
+            if body:
+                body = msgpack.packb(orjson.loads(body))
+            headers = _weaken_etag(_add_vary(list(headers), b"Accept"))
+            headers += [(b"content-type", MSGPACK_MEDIA_TYPES[0].encode()), (b"content-length", str(len(body)).encode())]
+            await send({**start, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, transcode)
+
+
+class _Compressor:
+    """Incremental gzip or brotli compressor."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=settings.compression_brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(settings.compression_gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so the client can decode it right away."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        """Compress the last chunk and end the stream."""
+        if self.encoding == "br":
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """Compress compressible responses with brotli or gzip, including streamed ones."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = _header(scope["headers"], b"accept-encoding")
+        encoding = choose_encoding(accept_encoding.decode("latin-1")) if accept_encoding else None
+
+        start: Optional[dict] = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def compress(message):
+            nonlocal start, compressor, passthrough
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                compressible = (
+                    _media_type(headers) in COMPRESSIBLE_MEDIA_TYPES
+                    and _header(headers, b"content-encoding") is None
+                    and message["status"] not in (204, 304)
+                )
+                if compressible:
+                    message = {**message, "headers": _add_vary(headers, b"Accept-Encoding")}
+                if not compressible or encoding is None:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is None:
+                if not more_body and len(body) < settings.compression_min_size:
+                    # Small complete body: not worth the CPU or the framing overhead
+                    passthrough = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers = _weaken_etag(_without(start.get("headers", []), b"content-length"))
+                headers.append((b"content-encoding", encoding.encode()))
+                if more_body:
+                    await send({**start, "headers": headers})
+                else:
+                    body = compressor.finish(body)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send({**start, "headers": headers})
+                    await send({"type": "http.response.body", "body": body})
+                    return
+            if more_body:
+                await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, compress)
@@ -0,0 +1 @@
+"""Events - Per-user real-time push of log and improvement changes."""
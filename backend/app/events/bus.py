@@ -0,0 +1,164 @@
+"""Per-user event bus behind the real-time push channel.
+
+Services call `publish_after_commit` while they mutate state; the events are
+held on the session and published only once its transaction commits (and
+dropped on rollback), so clients never hear about changes that did not
+happen. The in-memory bus delivers to subscribers in this process; the Redis
+bus publishes to `events:<user_id>` and every worker relays the messages to
+its own local subscribers, so a client connected to any worker gets them.
+"""
+
+import asyncio
+import json
+import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Set, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+PENDING_EVENTS_KEY = "pending_events"
+RESYNC_EVENT = "resync"
+
+
+class MemoryEventBus:
+    """Fans events out to the subscribers of each user in this process."""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def deliver(self, user_id: str, event_data: Dict[str, Any]) -> None:
+        """Queue an event for every local subscriber of the user."""
+        for queue in self._subscribers.get(user_id, ()):
+            try:
+                queue.put_nowait(event_data)
+            except asyncio.QueueFull:
+                # Slow consumer: drop its backlog and tell it to resync instead
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"id": event_data["id"], "type": RESYNC_EVENT, "data": {}})
+
+    async def publish(self, user_id: str, event_data: Dict[str, Any]) -> None:
+        """Publish an event to the user's subscribers."""
+        self.deliver(user_id, event_data)
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Receive the user's events on a queue for as long as the context is open."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(user_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(queue)
+                if not subscribers:
+                    del self._subscribers[user_id]
+
+    def subscriber_count(self) -> int:
+        """Number of open subscriptions in this process."""
+        return sum(len(queues) for queues in self._subscribers.values())
+
+
+class RedisEventBus:
+    """Publishes events through Redis pub/sub; each worker relays them to its local subscribers."""
+
+    def __init__(self, url: str, queue_size: int, channel_prefix: str = "events:"):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+        self.local = MemoryEventBus(queue_size)
+        self.channel_prefix = channel_prefix
+        self._listener: "asyncio.Task | None" = None
+
+    async def publish(self, user_id: str, event_data: Dict[str, Any]) -> None:
+        """Publish an event to the user's subscribers on every worker."""
+        await self.redis.publish(self.channel_prefix + user_id, json.dumps(event_data))
+
+    @asynccontextmanager
+    async def subscribe(self, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Receive the user's events on a queue for as long as the context is open."""
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+        async with self.local.subscribe(user_id) as queue:
+            yield queue
+
+    async def _listen(self) -> None:
+        """Relay every user's events to local subscribers, reconnecting after Redis errors."""
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe(self.channel_prefix + "*")
+                async for message in pubsub.listen():
+                    if message["type"] != "pmessage":
+                        continue
+                    channel = message["channel"].decode()
+                    self.local.deliver(channel[len(self.channel_prefix):], json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Event bus listener lost its Redis connection; retrying")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def subscriber_count(self) -> int:
+        """Number of open subscriptions in this process."""
+        return self.local.subscriber_count()
+
+
+# Singleton instance
+_bus = None
+
+
+def get_event_bus():
+    """Get the configured event bus singleton."""
+    global _bus
+    if _bus is None:
+        if settings.events_backend == "redis":
+            _bus = RedisEventBus(settings.redis_url, settings.events_queue_size)
+        else:
+            _bus = MemoryEventBus(settings.events_queue_size)
+    return _bus
+
+
+def publish_after_commit(db: AsyncSession, user_id: str, event_type: str, data: Dict[str, Any]) -> None:
+    """Publish an event to the user once the session's transaction commits."""
+    event_data = {"id": uuid.uuid4().hex, "type": event_type, "data": jsonable_encoder(data)}
+    db.info.setdefault(PENDING_EVENTS_KEY, []).append((user_id, event_data))
+
+
+# Publish tasks in flight, referenced so they are not garbage collected early
+_publishing: Set[asyncio.Task] = set()
+
+
+async def _publish_all(events: List[Tuple[str, Dict[str, Any]]]) -> None:
+    bus = get_event_bus()
+    for user_id, event_data in events:
+        try:
+            await bus.publish(user_id, event_data)
+        except Exception:
+            logger.exception("Could not publish %s event", event_data["type"])
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending_events(session: Session) -> None:
+    events = session.info.pop(PENDING_EVENTS_KEY, None)
+    if events:
+        task = asyncio.get_running_loop().create_task(_publish_all(events))
+        _publishing.add(task)
+        task.add_done_callback(_publishing.discard)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_pending_events(session: Session) -> None:
+    session.info.pop(PENDING_EVENTS_KEY, None)
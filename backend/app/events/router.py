@@ -0,0 +1,41 @@
+"""Server-Sent Events stream of the current user's changes."""
+
+import asyncio
+import json
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
+
+from app.auth.jwt import get_current_user_id
+from app.config import get_settings
+from app.events.bus import get_event_bus
+
+router = APIRouter()
+settings = get_settings()
+
+
+async def _event_stream(user_id: str):
+    async with get_event_bus().subscribe(user_id) as queue:
+        yield f"retry: {settings.events_retry_ms}\n\n"
+        while True:
+            try:
+                event_data = await asyncio.wait_for(queue.get(), settings.events_heartbeat_seconds)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event_data['id']}\nevent: {event_data['type']}\ndata: {json.dumps(event_data['data'])}\n\n"
+
+
+@router.get("/stream")
+async def stream_events(user_id: str = Depends(get_current_user_id)):
+    """Push the user's log, deviation, improvement and control action changes as Server-Sent Events.
+    
+    Events are not replayed after a reconnect; catch up with /api/sync/changes
+    after reconnecting or on a `resync` event.
+    """
+    return StreamingResponse(
+        _event_stream(user_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,254 @@
+"""Idempotency-Key support for POST endpoints retried by mobile clients.
+
+A client sends `Idempotency-Key: <unique value>` with a create request. The
+first request runs normally and its response is stored for
+`idempotency_ttl_seconds`; a retry with the same key (same user, same
+method, path and body) gets the stored response replayed with an
+`Idempotent-Replayed: true` header, without reaching the endpoint or the
+database. While the first request is still running, a retry gets 409; a key
+reused for a different request gets 422. 5xx responses are not stored, so
+the client can retry them.
+
+Storage is an in-process LRU with TTL by default (per uvicorn worker) or
+Redis (`IDEMPOTENCY_BACKEND=redis`) to share keys between workers.
+"""
+
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+from app.auth.jwt import decode_token
+from app.config import get_settings
+from app.metrics import record_cache
+
+settings = get_settings()
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+
+# POST paths that honor Idempotency-Key
+IDEMPOTENT_PATHS = tuple(re.compile(pattern) for pattern in (
+    r"^/api/operations/logs$",
+    r"^/api/operations/logs/[^/]+/complete$",
+    r"^/api/operations/logs/[^/]+/deviations$",
+    r"^/api/control/improvements$",
+))
+
+# Response headers worth replaying (others, e.g. date or server, are regenerated)
+REPLAYED_RESPONSE_HEADERS = ("content-type", "location", "x-next-cursor")
+
+IN_PROGRESS = "in_progress"
+
+
+class MemoryIdempotencyStore:
+    """In-process LRU of idempotency records, each expiring after its TTL."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._records: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = asyncio.Lock()
+
+    def _get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._records.get(key)
+        if entry is None:
+            return None
+        expires_at, record = entry
+        if expires_at <= time.monotonic():
+            del self._records[key]
+            return None
+        self._records.move_to_end(key)
+        return record
+
+    def _set(self, key: str, record: Dict[str, Any], ttl: float) -> None:
+        self._records[key] = (time.monotonic() + ttl, record)
+        self._records.move_to_end(key)
+        while len(self._records) > self.max_entries:
+            self._records.popitem(last=False)
+
+    async def reserve(self, key: str, fingerprint: str, ttl: float) -> Optional[Dict[str, Any]]:
+        """Claim the key for a new request; return the existing record instead if there is one."""
+        async with self._lock:
+            existing = self._get(key)
+            if existing is not None:
+                return existing
+            self._set(key, {"state": IN_PROGRESS, "fingerprint": fingerprint}, ttl)
+            return None
+
+    async def complete(self, key: str, record: Dict[str, Any], ttl: float) -> None:
+        """Store the finished response."""
+        async with self._lock:
+            self._set(key, record, ttl)
+
+    async def release(self, key: str) -> None:
+        """Forget a key whose request failed so it can be retried."""
+        async with self._lock:
+            self._records.pop(key, None)
+
+
+class RedisIdempotencyStore:
+    """Idempotency records in Redis, shared by all workers; SET NX claims a key atomically."""
+
+    def __init__(self, url: str, prefix: str = "idempotency:"):
+        import redis.asyncio as redis
+        self.redis = redis.from_url(url)
+        self.prefix = prefix
+
+    async def reserve(self, key: str, fingerprint: str, ttl: float) -> Optional[Dict[str, Any]]:
+        """Claim the key for a new request; return the existing record instead if there is one."""
+        claimed = await self.redis.set(
+            self.prefix + key,
+            json.dumps({"state": IN_PROGRESS, "fingerprint": fingerprint}),
+            nx=True,
+            ex=max(1, int(ttl))
+        )
+        if claimed:
+            return None
+        raw = await self.redis.get(self.prefix + key)
+        # Expired between SET NX and GET: treat as still in progress, the client retries
+        return json.loads(raw) if raw else {"state": IN_PROGRESS, "fingerprint": fingerprint}
+
+    async def complete(self, key: str, record: Dict[str, Any], ttl: float) -> None:
+        """Store the finished response."""
+        await self.redis.set(self.prefix + key, json.dumps(record), ex=max(1, int(ttl)))
+
+    async def release(self, key: str) -> None:
+        """Forget a key whose request failed so it can be retried."""
+        await self.redis.delete(self.prefix + key)
+
+
+# Singleton instance
+_store = None
+
+
+def get_idempotency_store():
+    """Get the configured idempotency store singleton."""
+    global _store
+    if _store is None:
+        if settings.idempotency_backend == "redis":
+            _store = RedisIdempotencyStore(settings.redis_url)
+        else:
+            _store = MemoryIdempotencyStore(settings.idempotency_max_entries)
+    return _store
+
+
+def _user_scope(headers: Dict[str, str]) -> Optional[str]:
+    """User id from the bearer token, or None when the request is not authenticated."""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_token(token).user_id
+    except HTTPException:
+        return None
+
+
+async def _send_json(send, status_code: int, detail: str) -> None:
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status_code,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class IdempotencyMiddleware:
+    """ASGI middleware replaying stored responses for repeated Idempotency-Key requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not any(pattern.match(scope["path"]) for pattern in IDEMPOTENT_PATHS)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope["headers"]}
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER.lower())
+        user_id = _user_scope(headers) if idempotency_key else None
+        if not idempotency_key or user_id is None:
+            await self.app(scope, receive, send)
+            return
+        if len(idempotency_key) > settings.idempotency_max_key_length:
+            await _send_json(send, 400, f"{IDEMPOTENCY_HEADER} is too long")
+            return
+
+        # Read the body up front to fingerprint it, then hand it on unchanged
+        chunks: List[bytes] = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        fingerprint = hashlib.sha256(scope["path"].encode() + b"\n" + body).hexdigest()
+        key = hashlib.sha256(f"{user_id}\n{idempotency_key}".encode()).hexdigest()
+
+        store = get_idempotency_store()
+        existing = await store.reserve(key, fingerprint, settings.idempotency_lock_seconds)
+        record_cache("idempotency", existing is not None)
+        if existing is not None:
+            if existing["fingerprint"] != fingerprint:
+                await _send_json(send, 422, f"{IDEMPOTENCY_HEADER} was already used for a different request")
+            elif existing["state"] == IN_PROGRESS:
+                await _send_json(send, 409, "A request with this Idempotency-Key is still being processed")
+            else:
+                await self._replay(send, existing)
+            return
+
+        body_sent = False
+
+        async def replay_body():
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+
+        response: Dict[str, Any] = {"status": 500, "headers": [], "body": []}
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                response["headers"] = [
+                    [name.decode("latin-1"), value.decode("latin-1")]
+                    for name, value in message.get("headers", [])
+                    if name.decode("latin-1").lower() in REPLAYED_RESPONSE_HEADERS
+                ]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, replay_body, capture)
+        except BaseException:
+            await store.release(key)
+            raise
+
+        if response["status"] >= 500:
+            await store.release(key)
+            return
+        await store.complete(key, {
+            "state": "done",
+            "fingerprint": fingerprint,
+            "status": response["status"],
+            "headers": response["headers"],
+            "body": b"".join(response["body"]).decode("utf-8"),
+        }, settings.idempotency_ttl_seconds)
+
+    async def _replay(self, send, record: Dict[str, Any]) -> None:
+        body = record["body"].encode("utf-8")
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in record["headers"]]
+        headers += [(b"content-length", str(len(body)).encode()), (REPLAYED_HEADER.lower().encode(), b"true")]
+        await send({"type": "http.response.start", "status": record["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
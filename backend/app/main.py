@@ -1,9 +1,14 @@
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.config import get_settings
 from app.database import init_db
+from app.idempotency import IdempotencyMiddleware, REPLAYED_HEADER
+from app.encoding import CompressionMiddleware, MessagePackMiddleware
+from app.query_stats import QUERIES_HEADER, QueryStatsMiddleware
+from app.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, get_metrics
 
 # Import routers
 from app.auth.router import router as auth_router
@@ -12,6 +17,8 @@ from app.modules.process_design.router import router as process_design_router
 from app.modules.daily_operations.router import router as daily_operations_router
 from app.modules.measurement.router import router as measurement_router
 from app.modules.control.router import router as control_router
+from app.modules.sync.router import router as sync_router
+from app.events.router import router as events_router
 from app.ai.router import router as ai_router
 
 settings = get_settings()
@@ -34,6 +41,18 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Replays retried POSTs carrying an Idempotency-Key (inside CORS so replays get CORS headers)
+app.add_middleware(IdempotencyMiddleware)
+
+# SQL statement count and time per request (X-DB-Queries / Server-Timing in debug); outside
+# idempotency so replayed responses do not carry the original request's numbers
+app.add_middleware(QueryStatsMiddleware)
+
+# MessagePack (Accept) and gzip/brotli (Accept-Encoding) negotiation; outside idempotency so
+# replays are re-encoded for the retrying client
+app.add_middleware(MessagePackMiddleware)
+app.add_middleware(CompressionMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -41,8 +60,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", REPLAYED_HEADER, QUERIES_HEADER, "Server-Timing"],
 )
 
+# Request metrics, outermost so latency and sizes cover every other middleware
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth_router, prefix="/api/auth", tags=["Authentication"])
 app.include_router(inputs_router, prefix="/api/inputs", tags=["Inputs Module"])
@@ -50,6 +74,8 @@ app.include_router(process_design_router, prefix="/api/processes", tags=["Proces
 app.include_router(daily_operations_router, prefix="/api/operations", tags=["Daily Operations"])
 app.include_router(measurement_router, prefix="/api/measurements", tags=["Measurement & Inspection"])
 app.include_router(control_router, prefix="/api/control", tags=["Control & Reengineering"])
+app.include_router(sync_router, prefix="/api/sync", tags=["Sync"])
+app.include_router(events_router, prefix="/api/events", tags=["Events"])
 app.include_router(ai_router)
 
 
@@ -68,3 +94,10 @@ async def root():
 async def health_check():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        """Request, cache and database pool metrics in the Prometheus text format."""
+        return PlainTextResponse(get_metrics().render(), media_type=METRICS_CONTENT_TYPE)
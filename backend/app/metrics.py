@@ -0,0 +1,248 @@
+"""HTTP, database pool and cache metrics in the Prometheus text exposition format.
+
+`MetricsMiddleware` records, per method and route template (`/api/operations/
+logs/{log_id}`, not the concrete path, so label cardinality stays bounded):
+
+- http_requests_total{method,route,status}
+- http_request_duration_seconds{method,route} (histogram)
+- http_requests_in_progress{method,route}
+- http_response_size_bytes{method,route} (histogram, bytes as sent)
+
+`record_cache` counts hits and misses of the in-process caches (ETags,
+idempotency replays, AI template reuse, single-flight coalescing), and the
+database pool gauges are read from the engine when `/metrics` is scraped.
+Like the AI metrics, values are per process: with several uvicorn workers
+each scrape sees one worker, so scrape the workers individually or sum
+counters across them.
+"""
+
+import re
+import time
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from app.database import engine
+
+# Upper bounds of the histogram buckets; the last bucket is +Inf
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS: Tuple[float, ...] = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+UNMATCHED_ROUTE = "unmatched"
+
+CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette appends the charset
+
+
+class Histogram:
+    """Bucket counts, sum and count of observations."""
+
+    __slots__ = ("bounds", "bucket_counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.bucket_counts: List[int] = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """Add an observation."""
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                return
+        self.bucket_counts[-1] += 1
+
+
+def _labels(**labels: str) -> str:
+    pairs = (
+        f'{name}="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in labels.items()
+    )
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_bound(bound: float) -> str:
+    return str(int(bound)) if float(bound).is_integer() else str(bound)
+
+
+class Metrics:
+    """Registry of the request, cache and pool metrics of this process."""
+
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, str], int] = {}
+        self.in_progress: Dict[Tuple[str, str], int] = {}
+        self.durations: Dict[Tuple[str, str], Histogram] = {}
+        self.sizes: Dict[Tuple[str, str], Histogram] = {}
+        self.cache: Dict[Tuple[str, str], int] = {}
+
+    def record_request(self, method: str, route: str, status_code: int, duration: float, size: int) -> None:
+        """Record a finished request."""
+        key = (method, route)
+        status_key = (method, route, str(status_code))
+        self.requests[status_key] = self.requests.get(status_key, 0) + 1
+        histogram = self.durations.get(key)
+        if histogram is None:
+            histogram = self.durations[key] = Histogram(LATENCY_BUCKETS)
+            self.sizes[key] = Histogram(SIZE_BUCKETS)
+        histogram.observe(duration)
+        self.sizes[key].observe(size)
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Count a lookup in one of the in-process caches."""
+        key = (cache, "hit" if hit else "miss")
+        self.cache[key] = self.cache.get(key, 0) + 1
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = [
+            "# HELP http_requests_total Requests by method, route template and status.",
+            "# TYPE http_requests_total counter",
+        ]
+        for (method, route, status_code), count in self.requests.items():
+            lines.append(f"http_requests_total{_labels(method=method, route=route, status=status_code)} {count}")
+        lines += [
+            "# HELP http_requests_in_progress Requests being handled.",
+            "# TYPE http_requests_in_progress gauge",
+        ]
+        for (method, route), count in self.in_progress.items():
+            lines.append(f"http_requests_in_progress{_labels(method=method, route=route)} {count}")
+        self._render_histograms(lines, "http_request_duration_seconds", "Request latency until the last body byte.", self.durations)
+        self._render_histograms(lines, "http_response_size_bytes", "Response body size as sent.", self.sizes)
+        lines += [
+            "# HELP cache_requests_total Lookups in in-process caches by result.",
+            "# TYPE cache_requests_total counter",
+        ]
+        for (cache, result), count in self.cache.items():
+            lines.append(f"cache_requests_total{_labels(cache=cache, result=result)} {count}")
+        lines += _render_pool()
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _render_histograms(lines: List[str], name: str, help_text: str, histograms: Dict[Tuple[str, str], Histogram]) -> None:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        for (method, route), histogram in histograms.items():
+            cumulative = 0
+            for bound, count in zip(histogram.bounds, histogram.bucket_counts):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(method=method, route=route, le=_format_bound(bound))} {cumulative}")
+            labels = _labels(method=method, route=route)
+            lines.append(f"{name}_bucket{_labels(method=method, route=route, le='+Inf')} {histogram.count}")
+            lines.append(f"{name}_sum{labels} {histogram.sum}")
+            lines.append(f"{name}_count{labels} {histogram.count}")
+
+
+def _render_pool() -> List[str]:
+    """Connection pool gauges; pools without a fixed size (NullPool for SQLite) have none."""
+    pool = engine.pool
+    if not hasattr(pool, "checkedout"):
+        return []
+    gauges = (
+        ("db_pool_size", "Configured pool size.", pool.size()),
+        ("db_pool_checked_out", "Connections currently checked out.", pool.checkedout()),
+        ("db_pool_checked_in", "Idle connections in the pool.", pool.checkedin()),
+        # QueuePool counts overflow from -size until the pool is full
+        ("db_pool_overflow", "Connections open beyond the pool size.", max(0, pool.overflow())),
+    )
+    lines: List[str] = []
+    for name, help_text, value in gauges:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge", f"{name} {value}"]
+    return lines
+
+
+# Singleton instance
+_metrics = None
+
+
+def get_metrics() -> Metrics:
+    """Get the process-wide metrics registry."""
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+    return _metrics
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """Count a hit or miss of an in-process cache."""
+    get_metrics().record_cache(cache, hit)
+
+
+_NAMED_GROUP = re.compile(r"\(\?P<\w+>")
+
+
+def _alternation(routes: List[Tuple[int, Any]]) -> Pattern:
+    """One regex matching any of `routes`; the name of the matching group is `r<index>`."""
+    return re.compile("|".join(
+        f"(?P<r{index}>{_NAMED_GROUP.sub('(?:', route.path_regex.pattern)})" for index, route in routes
+    ))
+
+
+class RouteTemplates:
+    """Resolves a request to the template of the route the router will pick, with one regex match.
+
+    Asking each route in turn (as the router does) costs microseconds per
+    route; instead the route patterns are combined into one alternation per
+    method, tried in router order. A path that only matches routes of other
+    methods (405) resolves to the first of them.
+    """
+
+    def __init__(self, routes: List[Any]):
+        candidates = list(enumerate(route for route in routes if hasattr(route, "path_regex")))
+        self._templates = {f"r{index}": route.path for index, route in candidates}
+        self._any = _alternation(candidates)
+        methods = set().union(*(route.methods for _, route in candidates if getattr(route, "methods", None)))
+        self._by_method = {
+            method: _alternation([
+                (index, route) for index, route in candidates
+                if not getattr(route, "methods", None) or method in route.methods
+            ])
+            for method in methods
+        }
+
+    def resolve(self, method: str, path: str) -> str:
+        """Route template for the request, or UNMATCHED_ROUTE (404)."""
+        pattern = self._by_method.get(method)
+        match = pattern.match(path) if pattern is not None else None
+        if match is None:
+            match = self._any.match(path)
+        return self._templates[match.lastgroup] if match else UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording count, latency, in-flight and response size per route template."""
+
+    def __init__(self, app):
+        self.app = app
+        self.routes: Optional[RouteTemplates] = None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        if self.routes is None:
+            # Built on the first request, once every route has been registered
+            self.routes = RouteTemplates(scope["app"].router.routes)
+        path = scope["path"]
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path):]
+        metrics = get_metrics()
+        key = (scope["method"], self.routes.resolve(scope["method"], path))
+        metrics.in_progress[key] = metrics.in_progress.get(key, 0) + 1
+        status_code = 500
+        size = 0
+        started = time.perf_counter()
+
+        async def measure(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, measure)
+        finally:
+            metrics.in_progress[key] -= 1
+            metrics.record_request(key[0], key[1], status_code, time.perf_counter() - started, size)
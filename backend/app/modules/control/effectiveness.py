@@ -0,0 +1,286 @@
+"""Improvement effectiveness job - compares step/process metrics before and after implementation.
+
+For every implemented improvement targeting a step or a process whose
+"after" window has closed, the logs in the `window_days` days before and
+after the implementation day are aggregated in one grouped query. The
+per-window metrics, their deltas and a verdict are upserted into
+`improvement_effects`, and `was_effective` is set on the improvement's
+control actions, so effectiveness views only read precomputed rows.
+
+    python -m app.modules.control.effectiveness --as-of 2026-03-31
+"""
+
+import argparse
+import asyncio
+import json
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, update, func, case, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.config import get_settings
+from app.database import async_session_maker, upsert_insert
+from app.modules.inputs import models as _inputs_models  # noqa: F401 - configures relationships when run standalone
+from app.modules.control.models import (
+    ImprovementModel, ImprovementEffectModel, ControlActionModel, ImprovementStatus
+)
+from app.modules.daily_operations.models import DailyLogModel, ExecutionStatus
+from app.modules.process_design.models import ProcessStepModel
+
+settings = get_settings()
+
+# Metric name -> +1 if higher is better, -1 if lower is better
+METRIC_DIRECTIONS = {
+    "execution_accuracy": 1,
+    "quality": 1,
+    "skip_rate": -1,
+    "duration_ratio": -1,
+}
+
+
+def _days_between(later, earlier, dialect: str):
+    """SQL expression for the whole days from `earlier` to `later` (both dates)."""
+    if dialect == "sqlite":
+        return func.julianday(later) - func.julianday(earlier)
+    return later - earlier
+
+
+def _minutes_between(end, start, dialect: str):
+    """SQL expression for the minutes from `start` to `end` (both timestamps)."""
+    if dialect == "sqlite":
+        return (func.julianday(end) - func.julianday(start)) * 1440
+    return func.extract("epoch", end - start) / 60
+
+
+def _window_metrics(row) -> Optional[Dict[str, Any]]:
+    """Turn one aggregated (improvement, period) row into window metrics."""
+    if not row.logs:
+        return None
+    return {
+        "logs": row.logs,
+        "execution_accuracy": row.completed / row.logs,
+        "skip_rate": row.skipped / row.logs,
+        "duration_ratio": row.duration_ratio,
+        "quality": row.quality,
+    }
+
+
+def assess_effect(
+    before: Optional[Dict[str, Any]],
+    after: Optional[Dict[str, Any]],
+    min_change: float
+) -> Dict[str, Any]:
+    """Compute per-metric deltas (after - before) and whether the change helped.
+
+    Effective means at least one metric moved in the good direction by
+    `min_change` and none moved in the bad direction by as much. The verdict
+    is None when either window has no logs.
+    """
+    if before is None or after is None:
+        return {"deltas": {}, "is_effective": None}
+
+    deltas = {}
+    improved = worsened = False
+    for metric, direction in METRIC_DIRECTIONS.items():
+        if before.get(metric) is None or after.get(metric) is None:
+            continue
+        delta = after[metric] - before[metric]
+        deltas[metric] = delta
+        improved |= delta * direction >= min_change
+        worsened |= delta * direction <= -min_change
+    return {"deltas": deltas, "is_effective": improved and not worsened}
+
+
+async def compute_improvement_effects(
+    db: AsyncSession,
+    as_of: date,
+    window_days: Optional[int] = None,
+    recompute: bool = False
+) -> Dict[str, int]:
+    """Compute and store effects for improvements whose after-window ended before `as_of`.
+
+    Uses three statements regardless of how many improvements are due: one
+    grouped read, one upsert of the effects and one UPDATE of control actions.
+    Already computed improvements are skipped unless `recompute` is set.
+    """
+    window_days = window_days or settings.improvement_effect_window_days
+    dialect = db.bind.dialect.name
+    # The after-window [day + 1, day + window] has closed once day + window < as_of
+    cutoff = datetime.combine(as_of - timedelta(days=window_days), time.min)
+
+    due = (
+        select(
+            ImprovementModel.id,
+            ImprovementModel.user_id,
+            ImprovementModel.target_type,
+            ImprovementModel.target_id,
+            func.date(ImprovementModel.implemented_at).label("implemented_on")
+        )
+        .where(
+            ImprovementModel.status == ImprovementStatus.IMPLEMENTED,
+            ImprovementModel.implemented_at < cutoff,
+            ImprovementModel.target_type.in_(("step", "process"))
+        )
+    )
+    if not recompute:
+        due = due.where(~select(ImprovementEffectModel.id).where(
+            ImprovementEffectModel.improvement_id == ImprovementModel.id
+        ).exists())
+    due = due.cte("due")
+
+    offset = _days_between(DailyLogModel.execution_date, due.c.implemented_on, dialect)
+    period = case((offset < 0, "before"), else_="after")
+    process_step = aliased(ProcessStepModel)
+    on_target = or_(
+        and_(due.c.target_type == "step", DailyLogModel.step_id == due.c.target_id),
+        and_(due.c.target_type == "process", DailyLogModel.step_id.in_(
+            select(process_step.id).where(process_step.process_id == due.c.target_id)
+        ))
+    )
+    duration_ratio = case(
+        (
+            and_(
+                DailyLogModel.actual_start.is_not(None),
+                DailyLogModel.actual_end.is_not(None),
+                ProcessStepModel.estimated_duration_minutes > 0
+            ),
+            _minutes_between(DailyLogModel.actual_end, DailyLogModel.actual_start, dialect)
+            / ProcessStepModel.estimated_duration_minutes
+        )
+    )
+
+    result = await db.execute(
+        select(
+            due.c.id,
+            due.c.user_id,
+            due.c.implemented_on,
+            period.label("period"),
+            func.count(DailyLogModel.id).label("logs"),
+            func.coalesce(func.sum(case((DailyLogModel.status == ExecutionStatus.COMPLETED, 1), else_=0)), 0).label("completed"),
+            func.coalesce(func.sum(case((DailyLogModel.status == ExecutionStatus.SKIPPED, 1), else_=0)), 0).label("skipped"),
+            func.avg(DailyLogModel.quality_score).label("quality"),
+            func.avg(duration_ratio).label("duration_ratio")
+        )
+        .select_from(due)
+        .outerjoin(DailyLogModel, and_(
+            DailyLogModel.user_id == due.c.user_id,
+            offset.between(-window_days, window_days),
+            offset != 0,
+            on_target
+        ))
+        .outerjoin(ProcessStepModel, ProcessStepModel.id == DailyLogModel.step_id)
+        .group_by(due.c.id, due.c.user_id, due.c.implemented_on, period)
+    )
+
+    windows: Dict[str, Dict[str, Any]] = {}
+    for row in result.all():
+        entry = windows.setdefault(row.id, {
+            "user_id": row.user_id,
+            "implemented_on": row.implemented_on,
+            "before": None,
+            "after": None
+        })
+        if row.logs:
+            entry[row.period] = _window_metrics(row)
+
+    if not windows:
+        return {"improvements": 0, "effective": 0, "ineffective": 0, "insufficient_data": 0, "control_actions": 0}
+
+    rows = []
+    verdicts: Dict[str, bool] = {}
+    for improvement_id, entry in windows.items():
+        implemented_on = entry["implemented_on"]
+        if isinstance(implemented_on, str):
+            implemented_on = date.fromisoformat(implemented_on)
+        assessment = assess_effect(entry["before"], entry["after"], settings.improvement_effect_min_change)
+        if assessment["is_effective"] is not None:
+            verdicts[improvement_id] = assessment["is_effective"]
+        rows.append({
+            "improvement_id": improvement_id,
+            "user_id": entry["user_id"],
+            "window_days": window_days,
+            "before_start": implemented_on - timedelta(days=window_days),
+            "after_end": implemented_on + timedelta(days=window_days),
+            "before_metrics": entry["before"],
+            "after_metrics": entry["after"],
+            "deltas": assessment["deltas"],
+            "is_effective": assessment["is_effective"]
+        })
+
+    stmt = upsert_insert(db, ImprovementEffectModel)
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ImprovementEffectModel.improvement_id],
+            set_={
+                column: stmt.excluded[column]
+                for column in ("window_days", "before_start", "after_end", "before_metrics",
+                               "after_metrics", "deltas", "is_effective")
+            } | {"computed_at": func.now()}
+        ),
+        rows
+    )
+
+    updated = 0
+    if verdicts:
+        result = await db.execute(
+            update(ControlActionModel)
+            .where(ControlActionModel.improvement_id.in_(verdicts))
+            .values(was_effective=case(verdicts, value=ControlActionModel.improvement_id))
+            .execution_options(synchronize_session=False)
+        )
+        updated = result.rowcount
+
+    effective = sum(verdicts.values())
+    return {
+        "improvements": len(rows),
+        "effective": effective,
+        "ineffective": len(verdicts) - effective,
+        "insufficient_data": len(rows) - len(verdicts),
+        "control_actions": updated
+    }
+
+
+async def get_effects_by_user(db: AsyncSession, user_id: str) -> List[ImprovementEffectModel]:
+    """Get all computed improvement effects for a user."""
+    result = await db.execute(
+        select(ImprovementEffectModel)
+        .where(ImprovementEffectModel.user_id == user_id)
+        .order_by(ImprovementEffectModel.computed_at.desc())
+    )
+    return result.scalars().all()
+
+
+async def get_effect_for_improvement(
+    db: AsyncSession,
+    improvement_id: str,
+    user_id: str
+) -> Optional[ImprovementEffectModel]:
+    """Get the computed effect of one improvement."""
+    result = await db.execute(
+        select(ImprovementEffectModel)
+        .where(ImprovementEffectModel.improvement_id == improvement_id, ImprovementEffectModel.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def run(as_of: date, window_days: Optional[int], recompute: bool) -> Dict[str, int]:
+    """Run the job in its own transaction."""
+    async with async_session_maker() as db:
+        counts = await compute_improvement_effects(db, as_of, window_days, recompute)
+        await db.commit()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compute before/after effects of implemented improvements.")
+    parser.add_argument("--as-of", type=date.fromisoformat, default=date.today(), help="Evaluation date (YYYY-MM-DD)")
+    parser.add_argument("--window-days", type=int, default=None, help="Days compared on each side (default from settings)")
+    parser.add_argument("--recompute", action="store_true", help="Recompute effects that already exist")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.as_of, args.window_days, args.recompute)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Text, Float, Enum, ForeignKey, Date, JSON, Boolean
+from sqlalchemy import Column, String, DateTime, Text, Float, Integer, Enum, ForeignKey, Date, JSON, Boolean, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from app.database import Base
 import uuid
@@ -27,12 +27,17 @@ class ImprovementStatus(str, enum.Enum):
 class ImprovementModel(Base):
     """Improvement database model - suggested process improvements."""
     __tablename__ = "improvements"
+    __table_args__ = (
+        # One generated suggestion per (user, target, type, trigger window)
+        UniqueConstraint("user_id", "fingerprint", name="uq_improvements_user_fingerprint"),
+        Index("ix_improvements_user_status_created", "user_id", "status", "created_at"),
+    )
     
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
     
     # Target
-    target_type = Column(String(50), nullable=False)  # 'step', 'process', 'goal'
+    target_type = Column(String(50), nullable=False)  # 'step', 'process', 'goal', 'user'
     target_id = Column(String, nullable=False, index=True)
     
     # Improvement details
@@ -48,6 +53,7 @@ class ImprovementModel(Base):
     
     # Data that triggered this suggestion
     trigger_data = Column(JSON)
+    fingerprint = Column(String(64))  # Set for generated suggestions; NULL for manual ones
     
     # Status
     status = Column(Enum(ImprovementStatus), default=ImprovementStatus.PROPOSED)
@@ -89,3 +95,28 @@ class ControlActionModel(Base):
     
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ImprovementEffectModel(Base):
+    """Improvement Effect database model - metrics before and after an improvement was implemented."""
+    __tablename__ = "improvement_effects"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    improvement_id = Column(String, ForeignKey("improvements.id"), nullable=False, unique=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False, index=True)
+    
+    # Compared windows (implementation day excluded)
+    window_days = Column(Integer, nullable=False)
+    before_start = Column(Date, nullable=False)
+    after_end = Column(Date, nullable=False)
+    
+    # Metrics per window: logs, execution_accuracy, skip_rate, duration_ratio, quality
+    before_metrics = Column(JSON)
+    after_metrics = Column(JSON)
+    deltas = Column(JSON)  # after - before, per metric
+    
+    # None when either window has no logs
+    is_effective = Column(Boolean)
+    
+    # Timestamps
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,27 +1,36 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List
+from typing import List, Optional
 from datetime import date
 
+from app.config import get_settings
 from app.database import get_db
 from app.auth.jwt import get_current_user_id
+from app.pagination import PageRequest, page_params, finish_page
+from app.responses import model_response
 from app.modules.control.schemas import (
-    Improvement, ImprovementCreate, ImprovementUpdate,
-    ControlAction, ControlActionCreate, ControlActionUpdate
+    Improvement, ImprovementCreate, ImprovementUpdate, ImprovementStatus,
+    ImprovementApply, ImprovementApplyResult,
+    ControlAction, ControlActionCreate, ControlActionUpdate, ImprovementEffect
 )
-from app.modules.control import service
+from app.modules.control import service, effectiveness
 
 router = APIRouter()
+settings = get_settings()
 
 
 @router.get("/improvements", response_model=List[Improvement])
 async def list_improvements(
+    response: Response,
+    status_filter: Optional[ImprovementStatus] = Query(None, alias="status", description="Only improvements with this status"),
+    page: PageRequest = Depends(page_params),
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all improvement suggestions."""
-    improvements = await service.get_improvements_by_user(db, user_id)
-    return improvements
+    """Get improvement suggestions, including those stored by /analyze (paginated, see X-Next-Cursor)."""
+    improvements = await service.get_improvements_by_user(db, user_id, status_filter, page)
+    improvements = finish_page(response, improvements, page, key=lambda improvement: (improvement.created_at, improvement.id))
+    return model_response(List[Improvement], improvements, response)
 
 
 @router.post("/improvements", response_model=Improvement, status_code=status.HTTP_201_CREATED)
@@ -63,6 +72,54 @@ async def update_improvement(
     return updated
 
 
+@router.post("/improvements/{improvement_id}/apply", response_model=ImprovementApplyResult)
+async def apply_improvement(
+    improvement_id: str,
+    apply_data: ImprovementApply,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply an approved split, merge, remove or reorder improvement to its process steps.
+    
+    All step changes, the status change to implemented and the recorded
+    control action are committed together or not at all. Routine-wide
+    suggestions (target_type "user") get 400; mark them implemented with PATCH.
+    """
+    improvement = await service.get_improvement_by_id(db, improvement_id, user_id)
+    if not improvement:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Improvement not found")
+    try:
+        result = await service.apply_improvement(db, user_id, improvement, apply_data)
+    except LookupError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return result
+
+
+@router.get("/improvements/{improvement_id}/effect", response_model=ImprovementEffect)
+async def get_improvement_effect(
+    improvement_id: str,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the measured before/after effect of an implemented improvement."""
+    effect = await effectiveness.get_effect_for_improvement(db, improvement_id, user_id)
+    if not effect:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Effect not computed yet")
+    return effect
+
+
+@router.get("/effects", response_model=List[ImprovementEffect])
+async def list_improvement_effects(
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the measured effects of all implemented improvements."""
+    effects = await effectiveness.get_effects_by_user(db, user_id)
+    return effects
+
+
 @router.post("/actions", response_model=ControlAction, status_code=status.HTTP_201_CREATED)
 async def create_control_action(
     action_data: ControlActionCreate,
@@ -76,12 +133,15 @@ async def create_control_action(
 
 @router.get("/actions", response_model=List[ControlAction])
 async def list_control_actions(
+    response: Response,
+    page: PageRequest = Depends(page_params),
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all control actions."""
-    actions = await service.get_control_actions(db, user_id)
-    return actions
+    """Get control actions, newest first (paginated, see X-Next-Cursor)."""
+    actions = await service.get_control_actions(db, user_id, page)
+    actions = finish_page(response, actions, page, key=lambda action: (action.created_at, action.id))
+    return model_response(List[ControlAction], actions, response)
 
 
 @router.get("/analyze")
@@ -102,11 +162,46 @@ async def analyze_and_suggest(
     - Procedure redesigns
     - Waste removal
     - Method improvements
+    
+    Suggestions are stored as proposed improvements; repeating the analysis
+    within the same trigger window returns the same improvements.
     """
-    suggestions = await service.analyze_and_suggest_improvements(db, user_id, target_date)
+    improvements = await service.analyze_and_suggest_improvements(db, user_id, target_date)
+    suggestions = [Improvement.model_validate(improvement) for improvement in improvements]
     return {
         "date": target_date,
         "suggestions": suggestions,
         "count": len(suggestions),
         "note": "Focused on reducing effort and improving method, not adding pressure"
     }
+
+
+@router.get("/analyze/range")
+async def analyze_range(
+    start_date: date = Query(..., description="First date to analyze"),
+    end_date: date = Query(..., description="Last date to analyze"),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Analyze every step over a date range and get step-targeted suggestions.
+    
+    Returns per-step skip rates, duration ratios (actual / estimated) and
+    quality trends, plus the stored improvement suggestions they triggered.
+    """
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date")
+    if (end_date - start_date).days + 1 > settings.control_max_range_days:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Range must not exceed {settings.control_max_range_days} days"
+        )
+    analysis = await service.analyze_range_and_suggest_improvements(db, user_id, start_date, end_date)
+    suggestions = [Improvement.model_validate(improvement) for improvement in analysis["improvements"]]
+    return {
+        "start_date": start_date,
+        "end_date": end_date,
+        "steps": analysis["steps"],
+        "suggestions": suggestions,
+        "count": len(suggestions),
+        "note": "Focused on reducing effort and improving method, not adding pressure"
+    }
@@ -1,8 +1,10 @@
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import date, datetime
 from typing import Optional, List, Dict, Any
 from enum import Enum
 
+from app.modules.process_design.schemas import ProcessStep, ProcessStepCreate, ProcessStepUpdate
+
 
 class ImprovementType(str, Enum):
     """Improvement type enum."""
@@ -47,6 +49,20 @@ class ImprovementUpdate(BaseModel):
     implementation_notes: Optional[str] = None
 
 
+class ImprovementApply(BaseModel):
+    """Schema for applying an approved improvement to process steps.
+    
+    - split: `parts` replace the target step (at least two)
+    - merge: `step_ids` are merged into the first, which takes the `merged_step` fields
+    - remove: `step_ids` (default: the target step) are removed
+    - reorder: `step_ids` lists every active step of the process in its new order
+    """
+    step_ids: List[str] = []
+    parts: List[ProcessStepCreate] = []
+    merged_step: ProcessStepUpdate = ProcessStepUpdate()
+    notes: Optional[str] = None
+
+
 class Improvement(ImprovementBase):
     """Improvement response schema."""
     id: str
@@ -100,6 +116,32 @@ class ControlAction(ControlActionBase):
         from_attributes = True
 
 
+class ImprovementApplyResult(BaseModel):
+    """Result of applying an improvement."""
+    improvement: Improvement
+    control_action: ControlAction
+    steps: List[ProcessStep]
+
+
+# Improvement Effect Schemas
+class ImprovementEffect(BaseModel):
+    """Before/after effect of an implemented improvement."""
+    id: str
+    improvement_id: str
+    user_id: str
+    window_days: int
+    before_start: date
+    after_end: date
+    before_metrics: Optional[Dict[str, Any]] = None
+    after_metrics: Optional[Dict[str, Any]] = None
+    deltas: Optional[Dict[str, float]] = None
+    is_effective: Optional[bool] = None
+    computed_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
 # Analysis Response Schemas
 class ProcessAnalysis(BaseModel):
     """Process analysis response."""
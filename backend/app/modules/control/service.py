@@ -1,20 +1,53 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, update, insert, func
 from typing import List, Optional, Dict, Any
 from datetime import date, datetime, timedelta
+import hashlib
+import uuid
 
+from app.config import get_settings
+from app.database import upsert_insert
+from app.pagination import PageRequest, apply_keyset
 from app.modules.control.models import ImprovementModel, ControlActionModel, ImprovementType, ImprovementStatus
-from app.modules.control.schemas import ImprovementCreate, ImprovementUpdate, ControlActionCreate, ControlActionUpdate
-from app.modules.measurement.service import calculate_daily_metrics, detect_issues
+from app.modules.control.schemas import ImprovementCreate, ImprovementUpdate, ImprovementApply, ControlActionCreate, ControlActionUpdate
+from app.modules.process_design import service as process_service
+from app.modules.process_design.models import ProcessStepModel
+from app.modules.measurement.service import calculate_daily_metrics, detect_issues, get_step_statistics
+from app.singleflight import get_single_flight, analysis_key
+from app.events.bus import publish_after_commit
 
+settings = get_settings()
 
-async def get_improvements_by_user(db: AsyncSession, user_id: str) -> List[ImprovementModel]:
-    """Get all improvements for a user."""
-    result = await db.execute(
-        select(ImprovementModel)
-        .where(ImprovementModel.user_id == user_id)
-        .order_by(ImprovementModel.created_at.desc())
-    )
+# Target for suggestions about the user's whole daily routine; they are guidance only
+# and cannot be applied automatically (there are no specific steps to change)
+ROUTINE_TARGET_TYPE = "user"
+
+# Per-step rules for range analysis
+STEP_MIN_SAMPLES = 3
+STEP_SKIP_RATE = 0.5
+STEP_DURATION_RATIO = 1.5
+STEP_LOW_QUALITY = 0.6
+STEP_QUALITY_DECLINE_PER_WEEK = 0.05
+
+
+async def get_improvements_by_user(
+    db: AsyncSession,
+    user_id: str,
+    status: Optional[ImprovementStatus] = None,
+    page: Optional[PageRequest] = None
+) -> List[ImprovementModel]:
+    """Get a user's improvements newest first, optionally only those with a given status.
+    
+    Returns one page (plus a look-ahead row) when `page` is given.
+    """
+    query = select(ImprovementModel).where(ImprovementModel.user_id == user_id)
+    if status is not None:
+        query = query.where(ImprovementModel.status == status)
+    if page is None:
+        query = query.order_by(ImprovementModel.created_at.desc())
+    else:
+        query = apply_keyset(query, [ImprovementModel.created_at, ImprovementModel.id], page, descending=True)
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -27,6 +60,15 @@ async def get_improvement_by_id(db: AsyncSession, improvement_id: str, user_id:
     return result.scalar_one_or_none()
 
 
+def _improvement_event_data(improvement: ImprovementModel) -> Dict[str, Any]:
+    """Fields of an improvement pushed to clients when it changes."""
+    return {
+        "id": improvement.id, "title": improvement.title, "status": improvement.status,
+        "improvement_type": improvement.improvement_type,
+        "target_type": improvement.target_type, "target_id": improvement.target_id
+    }
+
+
 async def create_improvement(db: AsyncSession, user_id: str, improvement_data: ImprovementCreate) -> ImprovementModel:
     """Create a new improvement suggestion."""
     improvement = ImprovementModel(
@@ -44,7 +86,7 @@ async def create_improvement(db: AsyncSession, user_id: str, improvement_data: I
     )
     db.add(improvement)
     await db.flush()
-    await db.refresh(improvement)
+    publish_after_commit(db, user_id, "improvement.created", _improvement_event_data(improvement))
     return improvement
 
 
@@ -58,10 +100,129 @@ async def update_improvement(db: AsyncSession, improvement: ImprovementModel, up
         improvement.implemented_at = datetime.utcnow()
     
     await db.flush()
-    await db.refresh(improvement)
+    publish_after_commit(db, improvement.user_id, "improvement.updated", _improvement_event_data(improvement))
     return improvement
 
 
+# Improvement types that can be applied to process steps automatically
+APPLICABLE_TYPES = (ImprovementType.SPLIT, ImprovementType.MERGE, ImprovementType.REMOVE, ImprovementType.REORDER)
+
+
+async def apply_improvement(
+    db: AsyncSession,
+    user_id: str,
+    improvement: ImprovementModel,
+    apply_data: ImprovementApply
+) -> Dict[str, Any]:
+    """Apply an approved improvement to its process steps in the request transaction.
+    
+    The step changes run as bulk UPDATE/INSERT/DELETE statements, then the
+    improvement is marked implemented and a control action is recorded, so the
+    number of round-trips does not depend on how many steps are touched.
+    Raises LookupError when the target step or process is missing or not the
+    user's, and ValueError when the improvement or the requested change is invalid.
+    """
+    if improvement.target_type == ROUTINE_TARGET_TYPE:
+        raise ValueError(
+            "Routine-wide suggestions do not target specific steps and cannot be applied automatically; "
+            "carry them out by hand and mark them implemented"
+        )
+    if improvement.status != ImprovementStatus.APPROVED:
+        raise ValueError("Only approved improvements can be applied")
+    if improvement.improvement_type not in APPLICABLE_TYPES:
+        raise ValueError(f"'{improvement.improvement_type.value}' improvements cannot be applied automatically")
+    
+    if improvement.target_type == "step":
+        steps = await process_service.get_owned_active_steps(db, user_id, step_id=improvement.target_id)
+    elif improvement.target_type == "process":
+        steps = await process_service.get_owned_active_steps(db, user_id, process_id=improvement.target_id)
+    else:
+        raise ValueError("Improvement must target a step or a process")
+    if not steps:
+        target = {f"{improvement.target_type}_id": improvement.target_id}
+        if not await process_service.owns_process(db, user_id, **target):
+            raise LookupError(f"Target {improvement.target_type} not found")
+        raise ValueError("Target process has no active steps")
+    
+    by_id = {step.id: step for step in steps}
+    step_ids = apply_data.step_ids
+    if not step_ids and improvement.target_type == "step":
+        step_ids = [improvement.target_id]
+    unknown = [step_id for step_id in step_ids if step_id not in by_id]
+    if unknown:
+        raise ValueError(f"Steps not active in the target process: {', '.join(unknown)}")
+    if len(set(step_ids)) != len(step_ids):
+        raise ValueError("step_ids must not contain duplicates")
+    
+    improvement_type = improvement.improvement_type
+    if improvement_type == ImprovementType.SPLIT:
+        if len(step_ids) != 1:
+            raise ValueError("Split needs exactly one step")
+        if len(apply_data.parts) < 2:
+            raise ValueError("Split needs at least two parts")
+        await process_service.split_step_bulk(db, steps, by_id[step_ids[0]], apply_data.parts)
+        description = f"Split '{by_id[step_ids[0]].name}' into {len(apply_data.parts)} steps"
+    elif improvement_type == ImprovementType.MERGE:
+        if len(step_ids) < 2:
+            raise ValueError("Merge needs at least two steps")
+        await process_service.merge_steps_bulk(db, [by_id[step_id] for step_id in step_ids], apply_data.merged_step)
+        description = f"Merged {len(step_ids)} steps into '{by_id[step_ids[0]].name}'"
+    elif improvement_type == ImprovementType.REMOVE:
+        if not step_ids:
+            raise ValueError("Remove needs at least one step")
+        await process_service.remove_steps_bulk(db, step_ids)
+        description = f"Removed {len(step_ids)} step(s)"
+    else:
+        if set(step_ids) != set(by_id):
+            raise ValueError("Reorder must list every active step of the process exactly once")
+        await process_service.reorder_steps_bulk(db, step_ids)
+        description = f"Reordered {len(step_ids)} steps"
+    
+    improvement = (await db.scalars(
+        update(ImprovementModel)
+        .where(ImprovementModel.id == improvement.id)
+        .values(
+            status=ImprovementStatus.IMPLEMENTED,
+            implemented_at=datetime.utcnow(),
+            implementation_notes=apply_data.notes or improvement.implementation_notes
+        )
+        .returning(ImprovementModel),
+        execution_options={"populate_existing": True}
+    )).one()
+    action = (await db.scalars(
+        insert(ControlActionModel).returning(ControlActionModel),
+        [{
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "trigger_type": "improvement",
+            "trigger_description": improvement.title,
+            "action_type": "reengineer",
+            "action_description": description,
+            "target_type": improvement.target_type,
+            "target_id": improvement.target_id,
+            "improvement_id": improvement.id
+        }]
+    )).one()
+    
+    result = await db.execute(
+        select(ProcessStepModel)
+        .where(ProcessStepModel.process_id == steps[0].process_id, ProcessStepModel.is_active == True)
+        .order_by(ProcessStepModel.sequence_order)
+        .execution_options(populate_existing=True)
+    )
+    publish_after_commit(db, user_id, "improvement.updated", _improvement_event_data(improvement))
+    publish_after_commit(db, user_id, "control_action.created", _action_event_data(action))
+    return {"improvement": improvement, "control_action": action, "steps": result.scalars().all()}
+
+
+def _action_event_data(action: ControlActionModel) -> Dict[str, Any]:
+    """Fields of a control action pushed to clients when it is recorded."""
+    return {
+        "id": action.id, "action_type": action.action_type, "improvement_id": action.improvement_id,
+        "target_type": action.target_type, "target_id": action.target_id
+    }
+
+
 async def create_control_action(db: AsyncSession, user_id: str, action_data: ControlActionCreate) -> ControlActionModel:
     """Record a control action."""
     action = ControlActionModel(
@@ -76,17 +237,22 @@ async def create_control_action(db: AsyncSession, user_id: str, action_data: Con
     )
     db.add(action)
     await db.flush()
-    await db.refresh(action)
+    publish_after_commit(db, user_id, "control_action.created", _action_event_data(action))
     return action
 
 
-async def get_control_actions(db: AsyncSession, user_id: str) -> List[ControlActionModel]:
-    """Get all control actions for a user."""
-    result = await db.execute(
-        select(ControlActionModel)
-        .where(ControlActionModel.user_id == user_id)
-        .order_by(ControlActionModel.created_at.desc())
-    )
+async def get_control_actions(
+    db: AsyncSession,
+    user_id: str,
+    page: Optional[PageRequest] = None
+) -> List[ControlActionModel]:
+    """Get a user's control actions newest first; one page (plus a look-ahead row) when `page` is given."""
+    query = select(ControlActionModel).where(ControlActionModel.user_id == user_id)
+    if page is None:
+        query = query.order_by(ControlActionModel.created_at.desc())
+    else:
+        query = apply_keyset(query, [ControlActionModel.created_at, ControlActionModel.id], page, descending=True)
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -94,7 +260,7 @@ async def analyze_and_suggest_improvements(
     db: AsyncSession, 
     user_id: str, 
     target_date: date
-) -> List[Dict[str, Any]]:
+) -> List[ImprovementModel]:
     """Analyze data and suggest improvements based on control logic.
     
     Control Logic (from requirements):
@@ -107,17 +273,206 @@ async def analyze_and_suggest_improvements(
     - Redesigns the procedure
     - Removes waste
     - Improves the method
-    """
-    suggestions = []
     
-    # Get metrics and issues
+    Suggestions are stored as proposed improvements, one per (target, type,
+    trigger window), so re-running the analysis is idempotent and a status the
+    user already set (e.g. rejected) is kept. Concurrent requests for the same
+    user and date share one analysis run; each request then stores the
+    suggestions in its own session, so it only answers with rows it committed.
+    """
+    suggestions = await get_single_flight().do(
+        analysis_key(user_id, target_date, "control_analysis"),
+        lambda: _suggest_for_day(db, user_id, target_date)
+    )
+    return await upsert_suggestions(db, user_id, target_date, suggestions)
+
+
+async def _suggest_for_day(
+    db: AsyncSession, 
+    user_id: str, 
+    target_date: date
+) -> List[Dict[str, Any]]:
+    """Load the day's metrics and issues and apply the control rules."""
     metrics = await calculate_daily_metrics(db, user_id, target_date)
     issues = await detect_issues(db, user_id, target_date)
+    return suggest_improvements(metrics, issues)
+
+
+async def analyze_range_and_suggest_improvements(
+    db: AsyncSession,
+    user_id: str,
+    start_date: date,
+    end_date: date
+) -> Dict[str, Any]:
+    """Analyze every step over a date range and store step-targeted suggestions.
+
+    All logs in the range are read with one query and aggregated per step.
+    Suggestions are fingerprinted against the trigger window of `end_date`.
+    Concurrent requests for the same range share the statistics query; each
+    stores the suggestions in its own session.
+    """
+    steps = await get_single_flight().do(
+        analysis_key(user_id, f"{start_date}..{end_date}", "control_range_analysis"),
+        lambda: get_step_statistics(db, user_id, start_date, end_date)
+    )
+    improvements = await upsert_suggestions(db, user_id, end_date, suggest_step_improvements(steps))
+    return {"steps": steps, "improvements": improvements}
+
+
+def suggest_step_improvements(steps: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Apply the control rules to per-step range statistics."""
+    suggestions = []
+    for step in steps:
+        name = step["step_name"]
+        target = {"target_type": "step", "target_id": step["step_id"]}
+        
+        # Repeatedly skipped → the step may not be needed
+        if step["total_logs"] >= STEP_MIN_SAMPLES and step["skip_rate"] >= STEP_SKIP_RATE:
+            suggestions.append({
+                **target,
+                "trigger": "step_repeated_skips",
+                "improvement_type": ImprovementType.REMOVE,
+                "title": f"Review Skipped Step: {name}",
+                "description": f"'{name}' is skipped more often than it is done. Consider removing it, lowering its frequency or rescheduling it.",
+                "rationale": f"Skipped {step['skipped']} of {step['total_logs']} times ({step['skip_rate']:.0%})",
+                "expected_effort_reduction": 0.2,
+                "trigger_data": {"skip_rate": step["skip_rate"], "total_logs": step["total_logs"]}
+            })
+        
+        # Sustained overruns → split the step
+        ratio = step["duration_ratio"]
+        if step["timed_executions"] >= STEP_MIN_SAMPLES and ratio is not None and ratio >= STEP_DURATION_RATIO:
+            suggestions.append({
+                **target,
+                "trigger": "step_time_overrun",
+                "improvement_type": ImprovementType.SPLIT,
+                "title": f"Split Long-Running Step: {name}",
+                "description": f"'{name}' consistently takes longer than planned. Consider splitting it into smaller steps or trimming non-essential parts.",
+                "rationale": f"Takes {ratio:.1f}x its estimate on average over {step['timed_executions']} executions",
+                "expected_time_savings": 15,
+                "trigger_data": {"duration_ratio": ratio, "timed_executions": step["timed_executions"]}
+            })
+        
+        # Low or declining quality → simplify the step's criteria
+        quality = step["average_quality"]
+        trend = step["quality_trend"]
+        if step["quality_samples"] >= STEP_MIN_SAMPLES and quality is not None and quality < STEP_LOW_QUALITY:
+            suggestions.append({
+                **target,
+                "trigger": "step_low_quality",
+                "improvement_type": ImprovementType.SIMPLIFY,
+                "title": f"Simplify Quality Criteria: {name}",
+                "description": f"'{name}' rarely meets its quality criteria. Consider simplifying the criteria or clarifying the expected output.",
+                "rationale": f"Average quality {quality:.1%} over {step['quality_samples']} executions",
+                "expected_quality_improvement": 0.2,
+                "trigger_data": {"average_quality": quality, "quality_samples": step["quality_samples"]}
+            })
+        elif step["quality_samples"] >= STEP_MIN_SAMPLES and trend is not None and trend * 7 <= -STEP_QUALITY_DECLINE_PER_WEEK:
+            suggestions.append({
+                **target,
+                "trigger": "step_quality_decline",
+                "improvement_type": ImprovementType.SIMPLIFY,
+                "title": f"Address Declining Quality: {name}",
+                "description": f"Quality of '{name}' is trending down. Review whether the step has become harder than planned or needs a better method.",
+                "rationale": f"Quality falling by {-trend * 7:.1%} per week",
+                "expected_quality_improvement": 0.1,
+                "trigger_data": {"quality_trend": trend, "quality_samples": step["quality_samples"]}
+            })
+    return suggestions
+
+
+def trigger_window_start(target_date: date, window_days: int) -> date:
+    """First day of the fixed-length trigger window containing `target_date` (weeks start on Monday)."""
+    return date.fromordinal(target_date.toordinal() - (target_date.toordinal() - 1) % window_days)
+
+
+def suggestion_fingerprint(
+    user_id: str,
+    target_type: str,
+    target_id: str,
+    improvement_type: ImprovementType,
+    trigger: str,
+    window_start: date
+) -> str:
+    """Stable identity of a generated suggestion within its trigger window."""
+    raw = "|".join([user_id, target_type, target_id, ImprovementType(improvement_type).value, trigger, window_start.isoformat()])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+async def upsert_suggestions(
+    db: AsyncSession,
+    user_id: str,
+    target_date: date,
+    suggestions: List[Dict[str, Any]]
+) -> List[ImprovementModel]:
+    """Store generated suggestions with one INSERT ... ON CONFLICT ... RETURNING.
+
+    A suggestion already stored for the same fingerprint only gets its
+    rationale and trigger data refreshed, and only while it is still
+    proposed. Returns the new and refreshed proposals; suggestions the user
+    already approved, rejected or implemented are left alone and not returned.
+    """
+    window_start = trigger_window_start(target_date, settings.improvement_trigger_window_days)
+    rows: Dict[str, Dict[str, Any]] = {}
+    for suggestion in suggestions:
+        target_type = suggestion.get("target_type", ROUTINE_TARGET_TYPE)
+        target_id = suggestion.get("target_id", user_id)
+        fingerprint = suggestion_fingerprint(
+            user_id, target_type, target_id,
+            suggestion["improvement_type"], suggestion["trigger"], window_start
+        )
+        rows[fingerprint] = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "target_type": target_type,
+            "target_id": target_id,
+            "improvement_type": suggestion["improvement_type"],
+            "title": suggestion["title"],
+            "description": suggestion["description"],
+            "rationale": suggestion.get("rationale"),
+            "expected_time_savings": suggestion.get("expected_time_savings"),
+            "expected_quality_improvement": suggestion.get("expected_quality_improvement"),
+            "expected_effort_reduction": suggestion.get("expected_effort_reduction"),
+            "trigger_data": {
+                "trigger": suggestion["trigger"],
+                "date": target_date.isoformat(),
+                "window_start": window_start.isoformat(),
+                **suggestion.get("trigger_data", {})
+            },
+            "fingerprint": fingerprint,
+            "status": ImprovementStatus.PROPOSED
+        }
+    if not rows:
+        return []
+
+    stmt = upsert_insert(db, ImprovementModel)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ImprovementModel.user_id, ImprovementModel.fingerprint],
+        set_={
+            "rationale": stmt.excluded.rationale,
+            "trigger_data": stmt.excluded.trigger_data,
+            "updated_at": func.now()
+        },
+        where=ImprovementModel.status == ImprovementStatus.PROPOSED
+    ).returning(ImprovementModel)
+    result = await db.scalars(stmt, list(rows.values()), execution_options={"populate_existing": True})
+    improvements = result.all()
+    if not improvements:
+        return []
+    # New and refreshed suggestions come back alike, so clients get one event listing them
+    publish_after_commit(db, user_id, "improvements.suggested", {"ids": [improvement.id for improvement in improvements]})
+    return improvements
+
+
+def suggest_improvements(metrics: Dict[str, Any], issues: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Apply the deterministic control rules to precomputed metrics and issues."""
+    suggestions = []
     
     # Low quality → Suggest simplification or better criteria
     if metrics["quality_compliance"] < 0.6:
         suggestions.append({
             "improvement_type": ImprovementType.SIMPLIFY,
+            "trigger": "low_quality",
             "title": "Simplify Quality Criteria",
             "description": "Quality compliance is low. Consider simplifying the quality criteria or breaking steps into smaller, more achievable parts.",
             "rationale": f"Current quality compliance: {metrics['quality_compliance']:.1%}",
@@ -128,6 +483,7 @@ async def analyze_and_suggest_improvements(
     if metrics["time_deviation"] > 1.5:
         suggestions.append({
             "improvement_type": ImprovementType.SPLIT,
+            "trigger": "time_overrun",
             "title": "Reduce Step Complexity",
             "description": "Steps are taking significantly longer than planned. Consider splitting complex steps into smaller ones or removing non-essential parts.",
             "rationale": f"Time deviation: {metrics['time_deviation']:.1%}",
@@ -138,6 +494,7 @@ async def analyze_and_suggest_improvements(
     if metrics["execution_accuracy"] < 0.5:
         suggestions.append({
             "improvement_type": ImprovementType.REMOVE,
+            "trigger": "low_execution",
             "title": "Remove Unnecessary Steps",
             "description": "Many steps are not being completed. Review which steps are truly essential and remove or defer those that aren't adding value.",
             "rationale": f"Execution accuracy: {metrics['execution_accuracy']:.1%}",
@@ -149,6 +506,7 @@ async def analyze_and_suggest_improvements(
     if len(skip_issues) >= 2:
         suggestions.append({
             "improvement_type": ImprovementType.REMOVE,
+            "trigger": "repeated_skips",
             "title": "Review Frequently Skipped Steps",
             "description": "Multiple steps are being skipped. This may indicate the process has unnecessary steps or unrealistic expectations. Consider removing or rescheduling these steps.",
             "rationale": f"{len(skip_issues)} steps skipped",
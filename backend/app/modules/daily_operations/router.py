@@ -1,43 +1,83 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import date
 
+from app.config import get_settings
 from app.database import get_db
 from app.auth.jwt import get_current_user_id
+from app.pagination import PageRequest, page_params, finish_page
+from app.streaming import export_response
+from app.etag import etag_for, is_not_modified, not_modified, set_etag
+from app.responses import model_response, rows_response
 from app.modules.daily_operations.schemas import (
     DailyLog, DailyLogCreate, DailyLogUpdate, DailyLogStart, DailyLogComplete,
-    Deviation, DeviationCreate
+    Deviation, DeviationCreate, LogBatch, LogBatchResult
 )
 from app.modules.daily_operations import service
+from app.modules.sync.service import get_change_version
 
 router = APIRouter()
+settings = get_settings()
 
 
 @router.get("/logs", response_model=List[DailyLog])
 async def list_logs(
+    request: Request,
+    response: Response,
     execution_date: date = Query(..., description="Date to get logs for"),
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all daily logs for a specific date."""
+    """Get all daily logs for a specific date (honors If-None-Match)."""
+    # Logs are generated from the active steps, so their changes are part of the version
+    entity_types = ("process", "step", "daily_log", "deviation")
+    etag = etag_for(request, user_id, await get_change_version(db, user_id, *entity_types, execution_date=execution_date))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+
     # Smart Logic: Generate logs for active steps if they don't exist
-    await service.generate_daily_logs(db, user_id, execution_date)
-    
-    logs = await service.get_logs_by_date(db, user_id, execution_date)
-    return logs
+    logs = await service.generate_daily_logs(db, user_id, execution_date)
+    # Generating may have inserted logs; tag the response with the version clients will see next
+    etag = etag_for(request, user_id, await get_change_version(db, user_id, *entity_types, execution_date=execution_date))
+    set_etag(response, etag)
+    return model_response(List[DailyLog], logs, response)
 
 
 @router.get("/logs/range", response_model=List[DailyLog])
 async def list_logs_range(
+    response: Response,
     start_date: date = Query(..., description="Start date"),
     end_date: date = Query(..., description="End date"),
+    page: PageRequest = Depends(page_params),
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all daily logs in a date range."""
-    logs = await service.get_logs_in_range(db, user_id, start_date, end_date)
-    return logs
+    """Get daily logs in a date range (paginated, see X-Next-Cursor)."""
+    key = lambda log: (log.execution_date, log.created_at, log.id)
+    if not page.include_nested:
+        rows = await service.get_log_rows_in_range(db, user_id, start_date, end_date, page)
+        return rows_response(finish_page(response, rows, page, key=key), response, constants={"deviations": []})
+    logs = await service.get_logs_in_range(db, user_id, start_date, end_date, page)
+    return model_response(List[DailyLog], finish_page(response, logs, page, key=key), response)
+
+
+@router.get("/logs/export")
+async def export_logs(
+    start_date: date = Query(..., description="Start date"),
+    end_date: date = Query(..., description="End date"),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Stream daily logs (with deviations) in a date range as NDJSON or CSV."""
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date")
+    return export_response(
+        service.stream_logs_in_range(user_id, start_date, end_date),
+        export_format,
+        service.LOG_EXPORT_FIELDS,
+        filename=f"daily_logs_{start_date}_{end_date}"
+    )
 
 
 @router.post("/logs", response_model=DailyLog, status_code=status.HTTP_201_CREATED)
@@ -51,6 +91,25 @@ async def create_log(
     return log
 
 
+@router.post("/logs/batch", response_model=LogBatchResult)
+async def apply_log_batch(
+    batch: LogBatch,
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Apply ordered start/complete/deviation operations on many logs in one transaction.
+    
+    Operations on logs that do not exist or belong to someone else fail
+    individually (see `results`); the others are still applied.
+    """
+    if len(batch.operations) > settings.log_batch_max_operations:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.log_batch_max_operations} operations per batch"
+        )
+    return await service.apply_log_operations(db, user_id, batch.operations)
+
+
 @router.get("/logs/{log_id}", response_model=DailyLog)
 async def get_log(
     log_id: str,
@@ -83,7 +142,7 @@ async def start_log(
 async def complete_log(
     log_id: str,
     complete_data: DailyLogComplete,
-    user_id: str,
+    user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
     """Mark a log as completed with execution details."""
@@ -120,5 +179,5 @@ async def add_deviation(
     log = await service.get_log_by_id(db, log_id, user_id)
     if not log:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Log not found")
-    deviation = await service.add_deviation(db, log_id, deviation_data)
+    deviation = await service.add_deviation(db, log, deviation_data)
     return deviation
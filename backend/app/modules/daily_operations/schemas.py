@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Optional, List, Literal, Union, Annotated
 from enum import Enum
 
 
@@ -109,3 +109,49 @@ class DailyLogWithStep(DailyLog):
     step_quality_criteria: Optional[str] = None
     process_name: Optional[str] = None
     goal_title: Optional[str] = None
+
+
+# Batch Schemas
+class LogStartOperation(DailyLogStart):
+    """Batch operation: mark a log as started."""
+    op: Literal["start"]
+    log_id: str
+
+
+class LogCompleteOperation(DailyLogComplete):
+    """Batch operation: mark a log as completed."""
+    op: Literal["complete"]
+    log_id: str
+
+
+class LogDeviationOperation(DeviationCreate):
+    """Batch operation: add a deviation to a log."""
+    op: Literal["deviation"]
+    log_id: str
+
+
+LogOperation = Annotated[
+    Union[LogStartOperation, LogCompleteOperation, LogDeviationOperation],
+    Field(discriminator="op")
+]
+
+
+class LogBatch(BaseModel):
+    """Ordered log operations applied in one transaction (e.g. actions queued offline)."""
+    operations: List[LogOperation] = Field(..., min_length=1)
+
+
+class LogOperationResult(BaseModel):
+    """Outcome of one batch operation; failed operations are skipped, the rest still apply."""
+    index: int
+    op: str
+    log_id: str
+    ok: bool
+    detail: Optional[str] = None
+    deviation: Optional[Deviation] = None
+
+
+class LogBatchResult(BaseModel):
+    """Per-operation results and the final state of every changed log."""
+    results: List[LogOperationResult]
+    logs: List[DailyLog]
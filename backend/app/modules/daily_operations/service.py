@@ -1,12 +1,16 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
-from typing import List, Optional
+from sqlalchemy import select, update, insert
+from sqlalchemy.orm import joinedload, selectinload
+from typing import List, Optional, Dict, Any, AsyncIterator
 from datetime import date, datetime
 
+from app.pagination import PageRequest, apply_keyset, nested_options
+from app.streaming import jsonable, stream_batches
+from app.events.bus import publish_after_commit
 from app.modules.daily_operations.models import DailyLogModel, DeviationModel, ExecutionStatus
 from app.modules.daily_operations.schemas import (
-    DailyLogCreate, DailyLogUpdate, DailyLogStart, DailyLogComplete, DeviationCreate
+    DailyLog, DailyLogCreate, DailyLogUpdate, DailyLogStart, DailyLogComplete, DeviationCreate,
+    LogStartOperation, LogDeviationOperation, LogOperation
 )
 
 
@@ -34,6 +38,11 @@ async def get_log_by_id(db: AsyncSession, log_id: str, user_id: str) -> Optional
     return result.scalar_one_or_none()
 
 
+def _log_event_data(log: DailyLogModel) -> Dict[str, Any]:
+    """Fields of a log pushed to clients when it changes."""
+    return {"id": log.id, "step_id": log.step_id, "execution_date": log.execution_date, "status": log.status}
+
+
 async def create_daily_log(db: AsyncSession, user_id: str, log_data: DailyLogCreate) -> DailyLogModel:
     """Create a new daily log entry."""
     log = DailyLogModel(
@@ -41,11 +50,12 @@ async def create_daily_log(db: AsyncSession, user_id: str, log_data: DailyLogCre
         user_id=user_id,
         execution_date=log_data.execution_date,
         planned_start=log_data.planned_start,
-        status=ExecutionStatus.PENDING
+        status=ExecutionStatus.PENDING,
+        deviations=[]
     )
     db.add(log)
     await db.flush()
-    await db.refresh(log)
+    publish_after_commit(db, user_id, "daily_log.created", _log_event_data(log))
     return log
 
 
@@ -54,7 +64,7 @@ async def start_execution(db: AsyncSession, log: DailyLogModel, start_data: Dail
     log.status = ExecutionStatus.IN_PROGRESS
     log.actual_start = start_data.actual_start
     await db.flush()
-    await db.refresh(log)
+    publish_after_commit(db, log.user_id, "daily_log.updated", _log_event_data(log))
     return log
 
 
@@ -67,7 +77,7 @@ async def complete_execution(db: AsyncSession, log: DailyLogModel, complete_data
     log.quality_score = complete_data.quality_score
     log.quality_notes = complete_data.quality_notes
     await db.flush()
-    await db.refresh(log)
+    publish_after_commit(db, log.user_id, "daily_log.updated", _log_event_data(log))
     return log
 
 
@@ -77,14 +87,14 @@ async def update_daily_log(db: AsyncSession, log: DailyLogModel, log_data: Daily
     for field, value in update_data.items():
         setattr(log, field, value)
     await db.flush()
-    await db.refresh(log)
+    publish_after_commit(db, log.user_id, "daily_log.updated", _log_event_data(log))
     return log
 
 
-async def add_deviation(db: AsyncSession, log_id: str, deviation_data: DeviationCreate) -> DeviationModel:
+async def add_deviation(db: AsyncSession, log: DailyLogModel, deviation_data: DeviationCreate) -> DeviationModel:
     """Add a deviation to a daily log."""
     deviation = DeviationModel(
-        daily_log_id=log_id,
+        daily_log_id=log.id,
         deviation_type=deviation_data.deviation_type,
         description=deviation_data.description,
         impact_level=deviation_data.impact_level,
@@ -92,30 +102,233 @@ async def add_deviation(db: AsyncSession, log_id: str, deviation_data: Deviation
     )
     db.add(deviation)
     await db.flush()
-    await db.refresh(deviation)
+    publish_after_commit(db, log.user_id, "deviation.created", {
+        "id": deviation.id, "daily_log_id": log.id, "deviation_type": deviation.deviation_type
+    })
     return deviation
 
 
+def _operation_values(operation: LogOperation) -> Dict[str, Any]:
+    """Column values a start or complete operation sets on its log."""
+    if isinstance(operation, LogStartOperation):
+        return {"status": ExecutionStatus.IN_PROGRESS, "actual_start": operation.actual_start}
+    return {
+        "status": ExecutionStatus.COMPLETED,
+        "actual_end": operation.actual_end,
+        "actual_execution": operation.actual_execution,
+        "output_produced": operation.output_produced,
+        "quality_score": operation.quality_score,
+        "quality_notes": operation.quality_notes,
+    }
+
+
+async def apply_log_operations(db: AsyncSession, user_id: str, operations: List[LogOperation]) -> Dict[str, Any]:
+    """Apply ordered start/complete/deviation operations in bulk.
+
+    Ownership of every referenced log is checked with one query; operations on
+    unknown logs fail individually and the rest are applied. Successive updates
+    of the same log are folded in order, then written with one bulk UPDATE by
+    primary key, and all deviations with one INSERT ... RETURNING. The statement
+    count does not depend on the number of operations.
+    """
+    log_ids = {operation.log_id for operation in operations}
+    result = await db.execute(
+        select(DailyLogModel.id).where(DailyLogModel.id.in_(log_ids), DailyLogModel.user_id == user_id)
+    )
+    owned = set(result.scalars().all())
+
+    results: List[Dict[str, Any]] = []
+    changes: Dict[str, Dict[str, Any]] = {}
+    deviation_rows: List[Dict[str, Any]] = []
+    deviation_results: List[Dict[str, Any]] = []
+    for index, operation in enumerate(operations):
+        item = {"index": index, "op": operation.op, "log_id": operation.log_id, "ok": operation.log_id in owned}
+        results.append(item)
+        if not item["ok"]:
+            item["detail"] = "Log not found"
+        elif isinstance(operation, LogDeviationOperation):
+            deviation_rows.append({
+                "daily_log_id": operation.log_id,
+                **operation.model_dump(include={"deviation_type", "description", "impact_level", "root_cause"})
+            })
+            deviation_results.append(item)
+        else:
+            changes.setdefault(operation.log_id, {}).update(_operation_values(operation))
+
+    if changes:
+        await db.execute(update(DailyLogModel), [{"id": log_id, **values} for log_id, values in changes.items()])
+    if deviation_rows:
+        result = await db.scalars(
+            insert(DeviationModel).returning(DeviationModel, sort_by_parameter_order=True),
+            deviation_rows
+        )
+        for item, deviation in zip(deviation_results, result.all()):
+            item["deviation"] = deviation
+
+    logs: List[DailyLogModel] = []
+    changed_ids = set(changes) | {row["daily_log_id"] for row in deviation_rows}
+    if changed_ids:
+        result = await db.execute(
+            select(DailyLogModel)
+            .where(DailyLogModel.id.in_(changed_ids))
+            .options(selectinload(DailyLogModel.deviations))
+            .order_by(DailyLogModel.execution_date, DailyLogModel.created_at)
+            .execution_options(populate_existing=True)
+        )
+        logs = result.scalars().all()
+    for log in logs:
+        publish_after_commit(db, user_id, "daily_log.updated", _log_event_data(log))
+    for item in deviation_results:
+        publish_after_commit(db, user_id, "deviation.created", {
+            "id": item["deviation"].id, "daily_log_id": item["log_id"], "deviation_type": item["deviation"].deviation_type
+        })
+    return {"results": results, "logs": logs}
+
+
+async def get_day_execution_details(db: AsyncSession, user_id: str, execution_date: date) -> List[Dict[str, Any]]:
+    """Get a day's logs with step names and deviations as execution_detail() dicts.
+    
+    The step is joined and the deviations are loaded with one more query, the
+    same way the batch analysis loads them, so both build identical AI prompts.
+    """
+    result = await db.execute(
+        select(DailyLogModel)
+        .where(
+            DailyLogModel.user_id == user_id,
+            DailyLogModel.execution_date == execution_date
+        )
+        .options(joinedload(DailyLogModel.step), selectinload(DailyLogModel.deviations))
+        .order_by(DailyLogModel.planned_start, DailyLogModel.created_at)
+    )
+    return [execution_detail(log) for log in result.scalars().all()]
+
+
+def execution_detail(log: DailyLogModel) -> Dict[str, Any]:
+    """Build the per-log dict of AI prompts from a log loaded with its step and deviations."""
+    duration = None
+    if log.actual_start and log.actual_end:
+        duration = (log.actual_end - log.actual_start).total_seconds() / 60
+    return {
+        "log_id": log.id,
+        "step_name": log.step.name,
+        "status": log.status.value if log.status else None,
+        "quality_score": log.quality_score,
+        "actual_execution": log.actual_execution,
+        "duration_minutes": duration,
+        "estimated_duration_minutes": log.step.estimated_duration_minutes,
+        "deviations": [
+            {
+                "type": d.deviation_type.value,
+                "description": d.description,
+                "root_cause": d.root_cause,
+                "impact_level": d.impact_level
+            }
+            for d in sorted(log.deviations, key=lambda d: d.created_at)
+        ]
+    }
+
+
 async def get_logs_in_range(
     db: AsyncSession, 
     user_id: str, 
     start_date: date, 
-    end_date: date
+    end_date: date,
+    page: Optional[PageRequest] = None
 ) -> List[DailyLogModel]:
-    """Get all logs in a date range."""
-    result = await db.execute(
+    """Get logs in a date range in schedule order; one page (plus a look-ahead row) when `page` is given."""
+    query = (
         select(DailyLogModel)
         .where(
             DailyLogModel.user_id == user_id,
             DailyLogModel.execution_date >= start_date,
             DailyLogModel.execution_date <= end_date
         )
-        .options(selectinload(DailyLogModel.deviations))
-        .order_by(DailyLogModel.execution_date, DailyLogModel.created_at)
+        .options(*nested_options(page, DailyLogModel.deviations))
     )
+    if page is None:
+        query = query.order_by(DailyLogModel.execution_date, DailyLogModel.created_at)
+    else:
+        query = apply_keyset(query, [DailyLogModel.execution_date, DailyLogModel.created_at, DailyLogModel.id], page)
+    result = await db.execute(query)
     return result.scalars().all()
 
 
+# DailyLog response fields other than the nested deviations, selected as plain columns
+LOG_FLAT_COLUMNS = tuple(getattr(DailyLogModel, name) for name in DailyLog.model_fields if name != "deviations")
+
+
+async def get_log_rows_in_range(
+    db: AsyncSession,
+    user_id: str,
+    start_date: date,
+    end_date: date,
+    page: PageRequest
+) -> List[Any]:
+    """Like `get_logs_in_range` without deviations, as `Row` tuples of `LOG_FLAT_COLUMNS` (no ORM objects)."""
+    query = select(*LOG_FLAT_COLUMNS).where(
+        DailyLogModel.user_id == user_id,
+        DailyLogModel.execution_date >= start_date,
+        DailyLogModel.execution_date <= end_date
+    )
+    query = apply_keyset(query, [DailyLogModel.execution_date, DailyLogModel.created_at, DailyLogModel.id], page)
+    result = await db.execute(query)
+    return result.all()
+
+
+LOG_EXPORT_COLUMNS = (
+    DailyLogModel.id, DailyLogModel.step_id, DailyLogModel.execution_date, DailyLogModel.status,
+    DailyLogModel.planned_start, DailyLogModel.actual_start, DailyLogModel.actual_end,
+    DailyLogModel.actual_execution, DailyLogModel.output_produced,
+    DailyLogModel.quality_score, DailyLogModel.quality_notes,
+    DailyLogModel.created_at, DailyLogModel.updated_at,
+)
+DEVIATION_EXPORT_COLUMNS = (
+    DeviationModel.id, DeviationModel.deviation_type, DeviationModel.description,
+    DeviationModel.impact_level, DeviationModel.root_cause, DeviationModel.created_at,
+)
+LOG_EXPORT_FIELDS = tuple(column.key for column in LOG_EXPORT_COLUMNS) + ("deviations",)
+
+
+async def stream_logs_in_range(
+    user_id: str,
+    start_date: date,
+    end_date: date,
+    batch_size: int = 0
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Stream a user's logs in a date range, with their deviations, as batches of export records.
+
+    Logs and deviations come from one LEFT JOIN on a server-side cursor; the
+    joined rows of a log are adjacent, so they are folded into one record as
+    they arrive and a log split across two batches is carried over.
+    """
+    query = (
+        select(*LOG_EXPORT_COLUMNS, *(c.label(f"deviation_{c.key}") for c in DEVIATION_EXPORT_COLUMNS))
+        .outerjoin(DeviationModel, DeviationModel.daily_log_id == DailyLogModel.id)
+        .where(
+            DailyLogModel.user_id == user_id,
+            DailyLogModel.execution_date >= start_date,
+            DailyLogModel.execution_date <= end_date
+        )
+        .order_by(DailyLogModel.execution_date, DailyLogModel.created_at, DailyLogModel.id, DeviationModel.created_at)
+    )
+    current: Optional[Dict[str, Any]] = None
+    async for rows in stream_batches(query, batch_size):
+        records = []
+        for row in rows:
+            if current is None or current["id"] != row.id:
+                if current is not None:
+                    records.append(current)
+                current = {column.key: jsonable(getattr(row, column.key)) for column in LOG_EXPORT_COLUMNS}
+                current["deviations"] = []
+            if row.deviation_id is not None:
+                current["deviations"].append({
+                    column.key: jsonable(getattr(row, f"deviation_{column.key}")) for column in DEVIATION_EXPORT_COLUMNS
+                })
+        yield records
+    if current is not None:
+        yield [current]
+
+
 async def generate_daily_logs(db: AsyncSession, user_id: str, execution_date: date) -> List[DailyLogModel]:
     """
     Smart Logic: Automatically generate daily logs for all active process steps.
@@ -179,6 +392,8 @@ async def generate_daily_logs(db: AsyncSession, user_id: str, execution_date: da
     
     if new_logs:
         await db.flush()
+        for log in new_logs:
+            publish_after_commit(db, user_id, "daily_log.created", _log_event_data(log))
         
     # Return all logs (existing + new)
     # Re-fetch to ensure everything is clean and ordered
@@ -1,23 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.database import get_db
 from app.auth.jwt import get_current_user_id
+from app.pagination import PageRequest, page_params, finish_page
+from app.etag import etag_for, is_not_modified, not_modified, set_etag
+from app.responses import model_response
 from app.modules.inputs.schemas import Goal, GoalCreate, GoalUpdate, Resource, ResourceCreate
 from app.modules.inputs import service
+from app.modules.sync.service import get_change_version
 
 router = APIRouter()
 
 
 @router.get("/goals", response_model=List[Goal])
 async def list_goals(
+    request: Request,
+    response: Response,
+    page: PageRequest = Depends(page_params),
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all goals for current user."""
-    goals = await service.get_goals_by_user(db, user_id)
-    return goals
+    """Get goals for current user, newest first (paginated, see X-Next-Cursor; honors If-None-Match)."""
+    etag = etag_for(request, user_id, await get_change_version(db, user_id, "goal", "resource"))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
+    goals = await service.get_goals_by_user(db, user_id, page)
+    return model_response(List[Goal], finish_page(response, goals, page, key=lambda goal: (goal.created_at, goal.id)), response)
 
 
 @router.post("/goals", response_model=Goal, status_code=status.HTTP_201_CREATED)
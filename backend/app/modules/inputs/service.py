@@ -3,18 +3,28 @@ from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 
+from app.pagination import PageRequest, apply_keyset, nested_options
 from app.modules.inputs.models import GoalModel, ResourceModel, GoalStatus
 from app.modules.inputs.schemas import GoalCreate, GoalUpdate, ResourceCreate
+from app.modules.sync.service import record_tombstones
 
 
-async def get_goals_by_user(db: AsyncSession, user_id: str) -> List[GoalModel]:
-    """Get all goals for a user."""
-    result = await db.execute(
+async def get_goals_by_user(
+    db: AsyncSession,
+    user_id: str,
+    page: Optional[PageRequest] = None
+) -> List[GoalModel]:
+    """Get a user's goals, newest first; one page (plus a look-ahead row) when `page` is given."""
+    query = (
         select(GoalModel)
         .where(GoalModel.user_id == user_id)
-        .options(selectinload(GoalModel.resources))
-        .order_by(GoalModel.created_at.desc())
+        .options(*nested_options(page, GoalModel.resources))
     )
+    if page is None:
+        query = query.order_by(GoalModel.created_at.desc())
+    else:
+        query = apply_keyset(query, [GoalModel.created_at, GoalModel.id], page, descending=True)
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -29,7 +39,11 @@ async def get_goal_by_id(db: AsyncSession, goal_id: str, user_id: str) -> Option
 
 
 async def create_goal(db: AsyncSession, user_id: str, goal_data: GoalCreate) -> GoalModel:
-    """Create a new goal with resources."""
+    """Create a new goal with resources.
+    
+    The goal and its resources are flushed together as INSERT ... RETURNING
+    statements; the resources collection is already loaded, so nothing is re-fetched.
+    """
     goal = GoalModel(
         user_id=user_id,
         title=goal_data.title,
@@ -37,32 +51,21 @@ async def create_goal(db: AsyncSession, user_id: str, goal_data: GoalCreate) ->
         purpose=goal_data.purpose,
         start_date=goal_data.start_date,
         target_date=goal_data.target_date,
-        status=GoalStatus.DRAFT
+        status=GoalStatus.DRAFT,
+        resources=[
+            ResourceModel(
+                resource_type=resource_data.resource_type,
+                name=resource_data.name,
+                description=resource_data.description,
+                quantity=resource_data.quantity,
+                unit=resource_data.unit
+            )
+            for resource_data in goal_data.resources or []
+        ]
     )
     db.add(goal)
     await db.flush()
-    
-    # Add resources
-    for resource_data in goal_data.resources:
-        resource = ResourceModel(
-            goal_id=goal.id,
-            resource_type=resource_data.resource_type,
-            name=resource_data.name,
-            description=resource_data.description,
-            quantity=resource_data.quantity,
-            unit=resource_data.unit
-        )
-        db.add(resource)
-    
-    await db.flush()
-    
-    # Re-fetch with resources loaded to avoid lazy loading issues
-    result = await db.execute(
-        select(GoalModel)
-        .where(GoalModel.id == goal.id)
-        .options(selectinload(GoalModel.resources))
-    )
-    return result.scalar_one()
+    return goal
 
 
 async def update_goal(db: AsyncSession, goal: GoalModel, goal_data: GoalUpdate) -> GoalModel:
@@ -71,12 +74,12 @@ async def update_goal(db: AsyncSession, goal: GoalModel, goal_data: GoalUpdate)
     for field, value in update_data.items():
         setattr(goal, field, value)
     await db.flush()
-    await db.refresh(goal)
     return goal
 
 
 async def delete_goal(db: AsyncSession, goal: GoalModel) -> None:
-    """Delete a goal."""
+    """Delete a goal (its tombstone covers the resources and processes deleted with it)."""
+    await record_tombstones(db, "goal", GoalModel.id == goal.id)
     await db.delete(goal)
     await db.flush()
 
@@ -93,5 +96,4 @@ async def add_resource_to_goal(db: AsyncSession, goal_id: str, resource_data: Re
     )
     db.add(resource)
     await db.flush()
-    await db.refresh(resource)
     return resource
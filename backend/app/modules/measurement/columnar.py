@@ -0,0 +1,210 @@
+"""Columnar (Parquet / Arrow IPC) export of measurements and daily logs for analytics.
+
+Rows are read on a server-side cursor in date order and converted batch by
+batch into Arrow record batches with a fixed schema, then appended to one
+file per calendar month, so memory is bounded by the batch size:
+
+    <out>/<dataset>/month=2026-01/<dataset>.parquet
+
+The layout is hive-partitioned, so `pyarrow.dataset`, pandas, polars or
+DuckDB read the directory directly. Requires the optional `pyarrow` package.
+
+    python -m app.modules.measurement.columnar --dataset daily_logs --out ./exports
+    python -m app.modules.measurement.columnar --dataset measurements --user-id <id> --format arrow --out ./exports
+"""
+
+import argparse
+import asyncio
+import enum
+import itertools
+import json
+import os
+from datetime import date
+from typing import Any, Dict, List, Optional, Sequence
+
+from sqlalchemy import Date, DateTime, Enum, Float, JSON, select
+
+from app.config import get_settings
+from app.streaming import stream_batches
+from app.modules.inputs import models as _inputs_models  # noqa: F401 - configures relationships when run standalone
+from app.modules.process_design import models as _process_models  # noqa: F401
+from app.modules.daily_operations.models import DailyLogModel
+from app.modules.measurement.models import MeasurementModel
+
+settings = get_settings()
+
+# Dataset name -> (model, partitioning date column, exported columns)
+DATASETS = {
+    "measurements": (MeasurementModel, MeasurementModel.measurement_date, tuple(MeasurementModel.__table__.columns)),
+    "daily_logs": (DailyLogModel, DailyLogModel.execution_date, tuple(DailyLogModel.__table__.columns)),
+}
+FILE_EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+
+
+def _require_pyarrow():
+    """Import pyarrow, which is only needed for columnar exports."""
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise RuntimeError("Columnar export requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def arrow_schema(columns: Sequence[Any]):
+    """Arrow schema for the exported columns; enums become strings and JSON becomes JSON text."""
+    pa = _require_pyarrow()
+    fields = []
+    for column in columns:
+        if isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us", tz="UTC" if column.type.timezone else None)
+        elif isinstance(column.type, Date):
+            arrow_type = pa.date32()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.key, arrow_type, nullable=column.nullable))
+    return pa.schema(fields)
+
+
+def _converter(column):
+    """Per-column value conversion to what the Arrow type accepts."""
+    if isinstance(column.type, Enum):
+        return lambda value: value.value if isinstance(value, enum.Enum) else value
+    if isinstance(column.type, JSON):
+        return lambda value: None if value is None else json.dumps(value, default=str)
+    return None
+
+
+def record_batch(rows: Sequence[Any], columns: Sequence[Any], schema):
+    """Build one Arrow record batch from result rows, column by column."""
+    pa = _require_pyarrow()
+    arrays = []
+    for index, (column, field) in enumerate(zip(columns, schema)):
+        values = [row[index] for row in rows]
+        convert = _converter(column)
+        if convert is not None:
+            values = [convert(value) for value in values]
+        arrays.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+class MonthlyWriter:
+    """Appends record batches to one file per month, keeping only the current month's file open."""
+
+    def __init__(self, out_dir: str, dataset: str, schema, file_format: str, compression: str):
+        self.out_dir = out_dir
+        self.dataset = dataset
+        self.schema = schema
+        self.file_format = file_format
+        self.compression = compression
+        self.month: Optional[str] = None
+        self.path: Optional[str] = None
+        self.writer = None
+        self.files: Dict[str, int] = {}
+
+    def _open(self, month: str) -> None:
+        pa = _require_pyarrow()
+        directory = os.path.join(self.out_dir, self.dataset, f"month={month}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self.dataset}.{FILE_EXTENSIONS[self.file_format]}")
+        if self.file_format == "parquet":
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema, compression=self.compression)
+        else:
+            self.writer = pa.ipc.new_file(path, self.schema)
+        self.month = month
+        self.path = path
+        self.files[path] = 0
+
+    def write(self, month: str, batch) -> None:
+        if month != self.month:
+            self.close()
+            self._open(month)
+        if self.file_format == "parquet":
+            self.writer.write_batch(batch)
+        else:
+            self.writer.write(batch)
+        self.files[self.path] += batch.num_rows
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+async def export_dataset(
+    dataset: str,
+    out_dir: str,
+    user_id: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    file_format: str = "parquet",
+    compression: str = "zstd",
+    batch_size: int = 0
+) -> Dict[str, Any]:
+    """Write one dataset (one user's rows, or everyone's) as month-partitioned columnar files.
+
+    Rows are ordered by date, so each month's rows arrive contiguously and
+    every month is written as a single file of `batch_size`-row chunks
+    (row groups for Parquet, record batches for Arrow IPC).
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    if file_format not in FILE_EXTENSIONS:
+        raise ValueError(f"Unknown format: {file_format}")
+    model, date_column, columns = DATASETS[dataset]
+    schema = arrow_schema(columns)
+
+    query = select(*columns).order_by(date_column, model.id)
+    if user_id is not None:
+        query = query.where(model.user_id == user_id)
+    if start_date is not None:
+        query = query.where(date_column >= start_date)
+    if end_date is not None:
+        query = query.where(date_column <= end_date)
+
+    date_index = [column.key for column in columns].index(date_column.key)
+    writer = MonthlyWriter(out_dir, dataset, schema, file_format, compression)
+    try:
+        async for rows in stream_batches(query, batch_size or settings.export_columnar_batch_size):
+            for month, month_rows in itertools.groupby(rows, key=lambda row: row[date_index].strftime("%Y-%m")):
+                writer.write(month, record_batch(list(month_rows), columns, schema))
+    finally:
+        writer.close()
+
+    return {
+        "dataset": dataset,
+        "rows": sum(writer.files.values()),
+        "files": writer.files,
+    }
+
+
+async def run(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    """Export the requested datasets one after another."""
+    datasets = list(DATASETS) if args.dataset == "all" else [args.dataset]
+    return [
+        await export_dataset(
+            dataset, args.out, args.user_id, args.start_date, args.end_date,
+            args.format, args.compression, args.batch_size
+        )
+        for dataset in datasets
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export measurements and daily logs as month-partitioned Parquet or Arrow files.")
+    parser.add_argument("--dataset", choices=[*DATASETS, "all"], default="all", help="Dataset to export")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--user-id", default=None, help="Only export this user's rows (default: all users)")
+    parser.add_argument("--start-date", type=date.fromisoformat, default=None, help="First date to include (YYYY-MM-DD)")
+    parser.add_argument("--end-date", type=date.fromisoformat, default=None, help="Last date to include (YYYY-MM-DD)")
+    parser.add_argument("--format", choices=list(FILE_EXTENSIONS), default="parquet", help="Output file format")
+    parser.add_argument("--compression", default="zstd", help="Parquet compression codec")
+    parser.add_argument("--batch-size", type=int, default=0, help="Rows per chunk (default from settings)")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
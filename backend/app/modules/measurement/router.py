@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from datetime import date
 
 from app.database import get_db
 from app.auth.jwt import get_current_user_id
+from app.pagination import PageRequest, page_params, finish_page
+from app.streaming import export_response
 from app.modules.measurement.schemas import Measurement, Inspection, DailyMetrics
 from app.modules.measurement import service
 
@@ -46,14 +48,34 @@ async def get_daily_metrics(
 
 @router.get("/range", response_model=List[Measurement])
 async def get_measurements_range(
+    response: Response,
     start_date: date = Query(..., description="Start date"),
     end_date: date = Query(..., description="End date"),
+    page: PageRequest = Depends(page_params),
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get measurements in a date range."""
-    measurements = await service.get_measurements_in_range(db, user_id, start_date, end_date)
-    return measurements
+    """Get measurements in a date range (paginated, see X-Next-Cursor)."""
+    measurements = await service.get_measurements_in_range(db, user_id, start_date, end_date, page)
+    return finish_page(response, measurements, page, key=lambda m: (m.measurement_date, m.id))
+
+
+@router.get("/export")
+async def export_measurements(
+    start_date: date = Query(..., description="Start date"),
+    end_date: date = Query(..., description="End date"),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson or csv"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Stream measurements in a date range as NDJSON or CSV."""
+    if end_date < start_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="end_date must not be before start_date")
+    return export_response(
+        service.stream_measurements_in_range(user_id, start_date, end_date),
+        export_format,
+        service.MEASUREMENT_EXPORT_FIELDS,
+        filename=f"measurements_{start_date}_{end_date}"
+    )
 
 
 @router.get("/{measurement_id}", response_model=Measurement)
@@ -1,8 +1,10 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
 from datetime import date, timedelta
 
+from app.pagination import PageRequest, apply_keyset
+from app.streaming import jsonable, stream_batches
 from app.modules.measurement.models import MeasurementModel, InspectionModel, MeasurementType
 from app.modules.daily_operations.models import DailyLogModel, DeviationModel, ExecutionStatus
 from app.modules.process_design.models import ProcessStepModel
@@ -19,7 +21,11 @@ async def calculate_daily_metrics(db: AsyncSession, user_id: str, target_date: d
         )
     )
     logs = result.scalars().all()
-    
+    return compute_daily_metrics(logs)
+
+
+def compute_daily_metrics(logs: List[DailyLogModel]) -> Dict[str, Any]:
+    """Calculate daily metrics from already-loaded logs."""
     if not logs:
         return {
             "total_steps": 0,
@@ -81,7 +87,6 @@ async def create_daily_measurement(db: AsyncSession, user_id: str, target_date:
     )
     db.add(measurement)
     await db.flush()
-    await db.refresh(measurement)
     return measurement
 
 
@@ -89,19 +94,53 @@ async def get_measurements_in_range(
     db: AsyncSession, 
     user_id: str, 
     start_date: date, 
-    end_date: date
+    end_date: date,
+    page: Optional[PageRequest] = None
 ) -> List[MeasurementModel]:
-    """Get measurements in a date range."""
-    result = await db.execute(
-        select(MeasurementModel)
+    """Get measurements in a date range by date; one page (plus a look-ahead row) when `page` is given."""
+    query = select(MeasurementModel).where(
+        MeasurementModel.user_id == user_id,
+        MeasurementModel.measurement_date >= start_date,
+        MeasurementModel.measurement_date <= end_date
+    )
+    if page is None:
+        query = query.order_by(MeasurementModel.measurement_date)
+    else:
+        query = apply_keyset(query, [MeasurementModel.measurement_date, MeasurementModel.id], page)
+    result = await db.execute(query)
+    return result.scalars().all()
+
+
+MEASUREMENT_EXPORT_COLUMNS = (
+    MeasurementModel.id, MeasurementModel.measurement_type, MeasurementModel.reference_id,
+    MeasurementModel.measurement_date, MeasurementModel.execution_accuracy, MeasurementModel.time_deviation,
+    MeasurementModel.quality_compliance, MeasurementModel.process_efficiency, MeasurementModel.raw_data,
+    MeasurementModel.analysis_summary, MeasurementModel.issues_detected, MeasurementModel.created_at,
+)
+MEASUREMENT_EXPORT_FIELDS = tuple(column.key for column in MEASUREMENT_EXPORT_COLUMNS)
+
+
+async def stream_measurements_in_range(
+    user_id: str,
+    start_date: date,
+    end_date: date,
+    batch_size: int = 0
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Stream a user's measurements in a date range as batches of export records."""
+    query = (
+        select(*MEASUREMENT_EXPORT_COLUMNS)
         .where(
             MeasurementModel.user_id == user_id,
             MeasurementModel.measurement_date >= start_date,
             MeasurementModel.measurement_date <= end_date
         )
-        .order_by(MeasurementModel.measurement_date)
+        .order_by(MeasurementModel.measurement_date, MeasurementModel.id)
     )
-    return result.scalars().all()
+    async for rows in stream_batches(query, batch_size):
+        yield [
+            {key: jsonable(value) for key, value in zip(MEASUREMENT_EXPORT_FIELDS, row)}
+            for row in rows
+        ]
 
 
 async def get_measurement_by_id(db: AsyncSession, measurement_id: str, user_id: str) -> Optional[MeasurementModel]:
@@ -123,7 +162,11 @@ async def detect_issues(db: AsyncSession, user_id: str, target_date: date) -> Li
         )
     )
     logs = result.scalars().all()
-    
+    return find_issues(logs)
+
+
+def find_issues(logs: List[DailyLogModel]) -> List[Dict[str, Any]]:
+    """Detect quality issues in already-loaded logs."""
     issues = []
     
     for log in logs:
@@ -161,6 +204,87 @@ async def detect_issues(db: AsyncSession, user_id: str, target_date: date) -> Li
     return issues
 
 
+async def get_step_statistics(
+    db: AsyncSession,
+    user_id: str,
+    start_date: date,
+    end_date: date
+) -> List[Dict[str, Any]]:
+    """Per-step execution statistics for a date range, from one query over the range's logs."""
+    result = await db.execute(
+        select(
+            DailyLogModel.step_id,
+            ProcessStepModel.name,
+            ProcessStepModel.estimated_duration_minutes,
+            DailyLogModel.execution_date,
+            DailyLogModel.status,
+            DailyLogModel.actual_start,
+            DailyLogModel.actual_end,
+            DailyLogModel.quality_score
+        )
+        .join(ProcessStepModel, ProcessStepModel.id == DailyLogModel.step_id)
+        .where(
+            DailyLogModel.user_id == user_id,
+            DailyLogModel.execution_date >= start_date,
+            DailyLogModel.execution_date <= end_date
+        )
+    )
+    return compute_step_statistics(result.all(), start_date)
+
+
+def compute_step_statistics(rows, start_date: date) -> List[Dict[str, Any]]:
+    """Aggregate (step_id, name, estimated_minutes, date, status, start, end, quality) rows per step.
+
+    Runs in a single pass with running sums: skip rate, mean actual/estimated
+    duration ratio, mean quality and the least-squares quality slope per day
+    (negative means quality is declining).
+    """
+    acc: Dict[str, Dict[str, Any]] = {}
+    for step_id, name, estimated, execution_date, status, actual_start, actual_end, quality in rows:
+        a = acc.get(step_id)
+        if a is None:
+            a = acc[step_id] = {
+                "name": name, "estimated": estimated, "logs": 0, "completed": 0, "skipped": 0,
+                "ratio_n": 0, "ratio_sum": 0.0,
+                "q_n": 0, "q_sum": 0.0, "q_x": 0.0, "q_xx": 0.0, "q_xy": 0.0
+            }
+        a["logs"] += 1
+        if status == ExecutionStatus.COMPLETED:
+            a["completed"] += 1
+        elif status == ExecutionStatus.SKIPPED:
+            a["skipped"] += 1
+        if actual_start and actual_end and estimated:
+            a["ratio_n"] += 1
+            a["ratio_sum"] += (actual_end - actual_start).total_seconds() / 60 / estimated
+        if quality is not None:
+            x = (execution_date - start_date).days
+            a["q_n"] += 1
+            a["q_sum"] += quality
+            a["q_x"] += x
+            a["q_xx"] += x * x
+            a["q_xy"] += x * quality
+
+    stats = []
+    for step_id, a in acc.items():
+        q_n = a["q_n"]
+        denominator = q_n * a["q_xx"] - a["q_x"] ** 2
+        stats.append({
+            "step_id": step_id,
+            "step_name": a["name"],
+            "total_logs": a["logs"],
+            "completed": a["completed"],
+            "skipped": a["skipped"],
+            "skip_rate": a["skipped"] / a["logs"],
+            "timed_executions": a["ratio_n"],
+            "duration_ratio": a["ratio_sum"] / a["ratio_n"] if a["ratio_n"] else None,
+            "quality_samples": q_n,
+            "average_quality": a["q_sum"] / q_n if q_n else None,
+            "quality_trend": (q_n * a["q_xy"] - a["q_x"] * a["q_sum"]) / denominator if q_n > 1 and denominator else None
+        })
+    stats.sort(key=lambda s: s["step_name"] or "")
+    return stats
+
+
 async def create_inspection(
     db: AsyncSession, 
     user_id: str, 
@@ -189,5 +313,4 @@ async def create_inspection(
     )
     db.add(inspection)
     await db.flush()
-    await db.refresh(inspection)
     return inspection
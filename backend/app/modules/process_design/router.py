@@ -1,31 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
 from app.database import get_db
 from app.auth.jwt import get_current_user_id
+from app.pagination import PageRequest, page_params, finish_page
+from app.etag import etag_for, is_not_modified, not_modified, set_etag
+from app.responses import model_response
 from app.modules.process_design.schemas import (
     Process, ProcessCreate, ProcessUpdate,
     ProcessStep, ProcessStepCreate, ProcessStepUpdate
 )
 from app.modules.process_design import service
 from app.modules.inputs.service import get_goal_by_id
+from app.modules.sync.service import get_change_version
 
 router = APIRouter()
 
 
 @router.get("", response_model=List[Process])
 async def list_all_processes(
+    request: Request,
+    response: Response,
     goal_id: Optional[str] = Query(None),
+    page: PageRequest = Depends(page_params),
     user_id: str = Depends(get_current_user_id),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all processes, optionally filtered by goal_id."""
+    """Get all processes, optionally filtered by goal_id.
+    
+    Without goal_id the result is paginated newest first (see X-Next-Cursor).
+    Honors If-None-Match.
+    """
+    etag = etag_for(request, user_id, await get_change_version(db, user_id, "process", "step"))
+    if is_not_modified(request, etag):
+        return not_modified(etag)
+    set_etag(response, etag)
     if goal_id:
-        processes = await service.get_processes_by_goal(db, goal_id)
-    else:
-        processes = await service.get_all_processes_for_user(db, user_id)
-    return processes
+        return model_response(List[Process], await service.get_processes_by_goal(db, goal_id, page), response)
+    processes = await service.get_all_processes_for_user(db, user_id, page)
+    processes = finish_page(response, processes, page, key=lambda process: (process.created_at, process.id))
+    return model_response(List[Process], processes, response)
 
 
 @router.post("", response_model=Process, status_code=status.HTTP_201_CREATED)
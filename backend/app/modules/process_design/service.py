@@ -1,35 +1,52 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, insert, update, delete, case
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 from typing import List, Optional
+import uuid
 
+from app.pagination import PageRequest, apply_keyset, nested_options
 from app.modules.process_design.models import ProcessModel, ProcessStepModel, ProcessStatus
 from app.modules.process_design.schemas import ProcessCreate, ProcessUpdate, ProcessStepCreate, ProcessStepUpdate
 from app.modules.inputs.models import GoalModel
+from app.modules.daily_operations.models import DailyLogModel
+from app.modules.sync.service import record_tombstones
 
 
-async def get_processes_by_goal(db: AsyncSession, goal_id: str) -> List[ProcessModel]:
-    """Get all processes for a goal."""
+async def get_processes_by_goal(
+    db: AsyncSession,
+    goal_id: str,
+    page: Optional[PageRequest] = None
+) -> List[ProcessModel]:
+    """Get all processes for a goal (`page` only controls whether steps are loaded)."""
     result = await db.execute(
         select(ProcessModel)
         .where(ProcessModel.goal_id == goal_id)
-        .options(selectinload(ProcessModel.steps))
+        .options(*nested_options(page, ProcessModel.steps))
         .order_by(ProcessModel.sequence_order)
     )
     return result.scalars().all()
 
 
-async def get_all_processes_for_user(db: AsyncSession, user_id: str) -> List[ProcessModel]:
-    """Get all processes for a user across all their goals."""
-    result = await db.execute(
+async def get_all_processes_for_user(
+    db: AsyncSession,
+    user_id: str,
+    page: Optional[PageRequest] = None
+) -> List[ProcessModel]:
+    """Get processes across a user's goals, newest first; one page (plus a look-ahead row) when `page` is given."""
+    query = (
         select(ProcessModel)
         .join(GoalModel, ProcessModel.goal_id == GoalModel.id, isouter=True)
         .where(
             (GoalModel.user_id == user_id) | (ProcessModel.goal_id == None)
         )
-        .options(selectinload(ProcessModel.steps))
-        .order_by(ProcessModel.created_at.desc())
+        .options(*nested_options(page, ProcessModel.steps))
     )
+    if page is None:
+        query = query.order_by(ProcessModel.created_at.desc())
+    else:
+        query = apply_keyset(query, [ProcessModel.created_at, ProcessModel.id], page, descending=True)
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -44,7 +61,11 @@ async def get_process_by_id(db: AsyncSession, process_id: str) -> Optional[Proce
 
 
 async def create_process(db: AsyncSession, goal_id: Optional[str], process_data: ProcessCreate) -> ProcessModel:
-    """Create a new process with steps."""
+    """Create a new process with steps.
+    
+    The process and its steps are flushed together as INSERT ... RETURNING
+    statements; the steps collection is already loaded, so nothing is re-fetched.
+    """
     # Use goal_id from parameter if provided, otherwise from process_data
     actual_goal_id = goal_id if goal_id is not None else process_data.goal_id
     
@@ -54,35 +75,88 @@ async def create_process(db: AsyncSession, goal_id: Optional[str], process_data:
         description=process_data.description,
         purpose=process_data.purpose,
         sequence_order=process_data.sequence_order,
-        status=ProcessStatus.DRAFT
+        status=ProcessStatus.DRAFT,
+        steps=[
+            ProcessStepModel(
+                name=step_data.name,
+                description=step_data.description,
+                action_verb=step_data.action_verb,
+                sequence_order=step_data.sequence_order,
+                frequency=step_data.frequency,
+                estimated_duration_minutes=step_data.estimated_duration_minutes,
+                quality_criteria=step_data.quality_criteria,
+                expected_output=step_data.expected_output
+            )
+            for step_data in process_data.steps or []
+        ]
     )
     db.add(process)
     await db.flush()
+    return process
+
+
+async def create_processes_bulk(
+    db: AsyncSession, 
+    goal_id: Optional[str], 
+    processes_data: List[ProcessCreate]
+) -> List[ProcessModel]:
+    """Create many processes with their steps using two multi-row INSERT ... RETURNING statements.
     
-    # Add steps
-    for step_data in process_data.steps or []:
-        step = ProcessStepModel(
-            process_id=process.id,
-            name=step_data.name,
-            description=step_data.description,
-            action_verb=step_data.action_verb,
-            sequence_order=step_data.sequence_order,
-            frequency=step_data.frequency,
-            estimated_duration_minutes=step_data.estimated_duration_minutes,
-            quality_criteria=step_data.quality_criteria,
-            expected_output=step_data.expected_output
-        )
-        db.add(step)
+    IDs are generated up front so steps can reference their process without a
+    flush in between, and the returned graph is assembled in memory instead of
+    being re-fetched.
+    """
+    if not processes_data:
+        return []
     
-    await db.flush()
+    process_rows = []
+    step_rows = []
+    for process_data in processes_data:
+        process_id = str(uuid.uuid4())
+        process_rows.append({
+            "id": process_id,
+            "goal_id": goal_id if goal_id is not None else process_data.goal_id,
+            "name": process_data.name,
+            "description": process_data.description,
+            "purpose": process_data.purpose,
+            "sequence_order": process_data.sequence_order,
+            "status": ProcessStatus.DRAFT
+        })
+        for step_data in process_data.steps or []:
+            step_rows.append({
+                "id": str(uuid.uuid4()),
+                "process_id": process_id,
+                "name": step_data.name,
+                "description": step_data.description,
+                "action_verb": step_data.action_verb,
+                "sequence_order": step_data.sequence_order,
+                "frequency": step_data.frequency,
+                "estimated_duration_minutes": step_data.estimated_duration_minutes,
+                "quality_criteria": step_data.quality_criteria,
+                "expected_output": step_data.expected_output,
+                "is_active": True
+            })
     
-    # Re-fetch with steps loaded to avoid lazy loading issues
-    result = await db.execute(
-        select(ProcessModel)
-        .where(ProcessModel.id == process.id)
-        .options(selectinload(ProcessModel.steps))
-    )
-    return result.scalar_one()
+    processes = (await db.scalars(
+        insert(ProcessModel).returning(ProcessModel, sort_by_parameter_order=True),
+        process_rows
+    )).all()
+    
+    steps: List[ProcessStepModel] = []
+    if step_rows:
+        steps = (await db.scalars(
+            insert(ProcessStepModel).returning(ProcessStepModel, sort_by_parameter_order=True),
+            step_rows
+        )).all()
+    
+    # Attach steps as already-loaded collections so no lazy load is attempted
+    steps_by_process = {process.id: [] for process in processes}
+    for step in steps:
+        steps_by_process[step.process_id].append(step)
+    for process in processes:
+        set_committed_value(process, "steps", steps_by_process[process.id])
+    
+    return list(processes)
 
 
 async def update_process(db: AsyncSession, process: ProcessModel, process_data: ProcessUpdate) -> ProcessModel:
@@ -91,12 +165,12 @@ async def update_process(db: AsyncSession, process: ProcessModel, process_data:
     for field, value in update_data.items():
         setattr(process, field, value)
     await db.flush()
-    await db.refresh(process)
     return process
 
 
 async def delete_process(db: AsyncSession, process: ProcessModel) -> None:
-    """Delete a process."""
+    """Delete a process (its tombstone covers the steps deleted with it)."""
+    await record_tombstones(db, "process", ProcessModel.id == process.id)
     await db.delete(process)
     await db.flush()
 
@@ -116,7 +190,6 @@ async def add_step_to_process(db: AsyncSession, process_id: str, step_data: Proc
     )
     db.add(step)
     await db.flush()
-    await db.refresh(step)
     return step
 
 
@@ -144,16 +217,171 @@ async def update_step(db: AsyncSession, step: ProcessStepModel, step_data: Proce
     for field, value in update_data.items():
         setattr(step, field, value)
     await db.flush()
-    await db.refresh(step)
     return step
 
 
 async def delete_step(db: AsyncSession, step: ProcessStepModel) -> None:
-    """Delete a step."""
+    """Delete a step (its tombstone covers the logs deleted with it)."""
+    await record_tombstones(db, "step", ProcessStepModel.id == step.id)
     await db.delete(step)
     await db.flush()
 
 
+async def get_owned_active_steps(
+    db: AsyncSession,
+    user_id: str,
+    process_id: Optional[str] = None,
+    step_id: Optional[str] = None
+) -> List[ProcessStepModel]:
+    """Get the active steps of a user's process (given directly or via one of its steps), in order.
+    
+    Returns an empty list when the process does not exist or belongs to someone else.
+    """
+    if process_id is None:
+        process_id = select(ProcessStepModel.process_id).where(ProcessStepModel.id == step_id).scalar_subquery()
+    result = await db.execute(
+        select(ProcessStepModel)
+        .join(ProcessModel)
+        .join(GoalModel)
+        .where(
+            ProcessStepModel.process_id == process_id,
+            ProcessStepModel.is_active == True,
+            GoalModel.user_id == user_id
+        )
+        .order_by(ProcessStepModel.sequence_order, ProcessStepModel.created_at)
+    )
+    return result.scalars().all()
+
+
+async def owns_process(
+    db: AsyncSession,
+    user_id: str,
+    process_id: Optional[str] = None,
+    step_id: Optional[str] = None
+) -> bool:
+    """Check that a process (given directly or via one of its steps) exists and belongs to the user."""
+    if process_id is None:
+        process_id = select(ProcessStepModel.process_id).where(ProcessStepModel.id == step_id).scalar_subquery()
+    result = await db.execute(
+        select(ProcessModel.id)
+        .join(GoalModel)
+        .where(ProcessModel.id == process_id, GoalModel.user_id == user_id)
+    )
+    return result.first() is not None
+
+
+def _step_values(step_data) -> dict:
+    """Column values for a step from a ProcessStepCreate, without its sequence."""
+    return {
+        "name": step_data.name,
+        "description": step_data.description,
+        "action_verb": step_data.action_verb,
+        "frequency": step_data.frequency,
+        "estimated_duration_minutes": step_data.estimated_duration_minutes,
+        "quality_criteria": step_data.quality_criteria,
+        "expected_output": step_data.expected_output
+    }
+
+
+async def remove_steps_bulk(db: AsyncSession, step_ids: List[str]) -> None:
+    """Remove steps: delete those never logged, deactivate the rest to keep their history."""
+    if not step_ids:
+        return
+    never_logged = (
+        ProcessStepModel.id.in_(step_ids),
+        ~select(DailyLogModel.id).where(DailyLogModel.step_id == ProcessStepModel.id).exists()
+    )
+    await record_tombstones(db, "step", *never_logged)
+    await db.execute(
+        delete(ProcessStepModel)
+        .where(*never_logged)
+        .execution_options(synchronize_session=False)
+    )
+    await db.execute(
+        update(ProcessStepModel)
+        .where(ProcessStepModel.id.in_(step_ids))
+        .values(is_active=False)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def reorder_steps_bulk(db: AsyncSession, step_ids: List[str]) -> None:
+    """Set sequence_order to each step's position in `step_ids` with one UPDATE."""
+    await _set_sequence_orders(db, {step_id: position for position, step_id in enumerate(step_ids)})
+
+
+async def _set_sequence_orders(db: AsyncSession, positions: dict) -> None:
+    """Set sequence_order for many steps with a single UPDATE ... CASE."""
+    if not positions:
+        return
+    await db.execute(
+        update(ProcessStepModel)
+        .where(ProcessStepModel.id.in_(positions))
+        .values(sequence_order=case(positions, value=ProcessStepModel.id))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def merge_steps_bulk(
+    db: AsyncSession,
+    steps: List[ProcessStepModel],
+    merged: ProcessStepUpdate
+) -> None:
+    """Merge steps into the first one, which takes the `merged` fields; the others are removed."""
+    keep, others = steps[0], steps[1:]
+    values = merged.model_dump(exclude_unset=True, exclude={"sequence_order", "is_active"})
+    values.setdefault("name", " + ".join(step.name for step in steps))
+    if "estimated_duration_minutes" not in values:
+        durations = [step.estimated_duration_minutes for step in steps if step.estimated_duration_minutes]
+        values["estimated_duration_minutes"] = sum(durations) if durations else None
+    await db.execute(
+        update(ProcessStepModel)
+        .where(ProcessStepModel.id == keep.id)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    await remove_steps_bulk(db, [step.id for step in others])
+
+
+async def split_step_bulk(
+    db: AsyncSession,
+    steps: List[ProcessStepModel],
+    step: ProcessStepModel,
+    parts: List[ProcessStepCreate]
+) -> None:
+    """Replace `step` by `parts` within the ordered `steps` of its process.
+    
+    The step becomes the first part, the other parts are inserted right after
+    it and the process is renumbered, in three statements.
+    """
+    part_ids = [str(uuid.uuid4()) for _ in parts[1:]]
+    order: List[str] = []
+    for existing in steps:
+        order.append(existing.id)
+        if existing.id == step.id:
+            order.extend(part_ids)
+    positions = {step_id: position for position, step_id in enumerate(order)}
+    
+    await db.execute(
+        update(ProcessStepModel)
+        .where(ProcessStepModel.id == step.id)
+        .values(**_step_values(parts[0]))
+        .execution_options(synchronize_session=False)
+    )
+    if part_ids:
+        await db.execute(insert(ProcessStepModel), [
+            {
+                "id": part_id,
+                "process_id": step.process_id,
+                "sequence_order": positions.pop(part_id),
+                "is_active": True,
+                **_step_values(part)
+            }
+            for part_id, part in zip(part_ids, parts[1:])
+        ])
+    await _set_sequence_orders(db, positions)
+
+
 async def get_active_steps_for_today(db: AsyncSession, user_id: str) -> List[ProcessStepModel]:
     """Get all active daily steps for a user."""
     result = await db.execute(
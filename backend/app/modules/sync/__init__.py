@@ -0,0 +1 @@
+"""Sync Module - Delta sync of a user's data for offline-capable clients."""
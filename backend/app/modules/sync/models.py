@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class SyncTombstoneModel(Base):
+    """Sync tombstone database model - records a deleted row so clients can drop it."""
+    __tablename__ = "sync_tombstones"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String, ForeignKey("users.id"), nullable=False)
+    entity_type = Column(String(32), nullable=False)  # goal, resource, process, step, daily_log, deviation
+    entity_id = Column(String, nullable=False)
+    
+    # Timestamps
+    deleted_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_sync_tombstones_user_deleted", "user_id", "deleted_at"),
+    )
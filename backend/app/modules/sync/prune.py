@@ -0,0 +1,29 @@
+"""Tombstone pruning job - deletes sync tombstones older than the retention.
+
+Run it periodically (e.g. daily from cron) so `sync_tombstones` stays bounded:
+
+    python -m app.modules.sync.prune
+"""
+
+import asyncio
+import json
+from typing import Dict
+
+from app.database import async_session_maker
+from app.modules.sync.service import prune_tombstones
+
+
+async def run() -> Dict[str, int]:
+    """Run the job in its own transaction."""
+    async with async_session_maker() as db:
+        deleted = await prune_tombstones(db)
+        await db.commit()
+    return {"deleted": deleted}
+
+
+def main() -> None:
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime
+
+from app.database import get_db
+from app.auth.jwt import get_current_user_id
+from app.pagination import decode_cursor
+from app.modules.sync.schemas import SyncChanges
+from app.modules.sync import service
+
+router = APIRouter()
+
+
+@router.get("/changes", response_model=SyncChanges)
+async def get_changes(
+    cursor: Optional[str] = Query(None, description="Cursor from the previous sync; omit for a full sync"),
+    user_id: str = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get goals, resources, processes, steps, daily logs and deviations changed since the cursor.
+    
+    Deleted rows are listed in `deleted`. Store the returned `cursor` and send it on the next sync.
+    """
+    since = None
+    if cursor:
+        try:
+            (since,) = decode_cursor(cursor)
+        except ValueError:
+            since = None
+        if not isinstance(since, datetime):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return await service.get_changes(db, user_id, since)
@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field
+from typing import List
+from datetime import datetime
+
+from app.modules.inputs.schemas import Goal, Resource
+from app.modules.process_design.schemas import Process, ProcessStep
+from app.modules.daily_operations.schemas import DailyLog, Deviation
+
+
+class SyncGoal(Goal):
+    """Goal row without nested resources (they are synced as their own rows)."""
+    resources: List[Resource] = Field(default=[], exclude=True)
+
+
+class SyncProcess(Process):
+    """Process row without nested steps."""
+    steps: List[ProcessStep] = Field(default=[], exclude=True)
+
+
+class SyncDailyLog(DailyLog):
+    """Daily log row without nested deviations."""
+    deviations: List[Deviation] = Field(default=[], exclude=True)
+
+
+class Tombstone(BaseModel):
+    """A deleted row. Deleting a parent also deletes its children, which get no tombstones of their own."""
+    entity_type: str
+    entity_id: str
+    deleted_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class SyncChanges(BaseModel):
+    """Rows changed since the client's cursor, plus the cursor for the next sync.
+    
+    When `full` is true the client should replace its local copy instead of merging.
+    """
+    cursor: str
+    full: bool
+    goals: List[SyncGoal] = []
+    resources: List[Resource] = []
+    processes: List[SyncProcess] = []
+    steps: List[ProcessStep] = []
+    daily_logs: List[SyncDailyLog] = []
+    deviations: List[Deviation] = []
+    deleted: List[Tombstone] = []
@@ -0,0 +1,170 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, delete, func, literal, literal_column, union_all, BigInteger, String, Select
+from sqlalchemy.orm import noload
+from typing import Any, Dict, Optional
+from datetime import date, datetime, timedelta
+
+from app.config import get_settings
+from app.pagination import encode_cursor
+from app.modules.inputs.models import GoalModel, ResourceModel
+from app.modules.process_design.models import ProcessModel, ProcessStepModel
+from app.modules.daily_operations.models import DailyLogModel, DeviationModel
+from app.modules.sync.models import SyncTombstoneModel
+
+settings = get_settings()
+
+# Entity type -> model, in the order clients should apply them
+SYNC_MODELS = {
+    "goal": GoalModel,
+    "resource": ResourceModel,
+    "process": ProcessModel,
+    "step": ProcessStepModel,
+    "daily_log": DailyLogModel,
+    "deviation": DeviationModel,
+}
+# Entity type -> SyncChanges field
+SYNC_FIELDS = {
+    "goal": "goals",
+    "resource": "resources",
+    "process": "processes",
+    "step": "steps",
+    "daily_log": "daily_logs",
+    "deviation": "deviations",
+}
+# Nested collections left out of synced rows (their rows are synced separately)
+NESTED = {
+    "goal": (GoalModel.resources, GoalModel.processes),
+    "process": (ProcessModel.steps,),
+    "daily_log": (DailyLogModel.deviations,),
+}
+
+
+def _owned(entity_type: str, *columns: Any) -> Select:
+    """Select `columns` of an entity joined up to the table that carries its user_id."""
+    model = SYNC_MODELS[entity_type]
+    query = select(*columns)
+    if entity_type in ("resource", "process"):
+        query = query.join(GoalModel, GoalModel.id == model.goal_id)
+    elif entity_type == "step":
+        query = (
+            query.join(ProcessModel, ProcessModel.id == ProcessStepModel.process_id)
+            .join(GoalModel, GoalModel.id == ProcessModel.goal_id)
+        )
+    elif entity_type == "deviation":
+        query = query.join(DailyLogModel, DailyLogModel.id == DeviationModel.daily_log_id)
+    return query
+
+
+def _owner_column(entity_type: str):
+    """The user_id column `_owned` filters on."""
+    return DailyLogModel.user_id if entity_type in ("daily_log", "deviation") else GoalModel.user_id
+
+
+def _changed_at(model):
+    """When a row last changed; updated_at is only set on update and some tables only have created_at."""
+    if hasattr(model, "updated_at"):
+        return func.coalesce(model.updated_at, model.created_at)
+    return model.created_at
+
+
+async def record_tombstones(db: AsyncSession, entity_type: str, *criteria: Any) -> None:
+    """Record tombstones for the rows of `entity_type` matching `criteria`; call before deleting them.
+
+    Runs as one INSERT ... SELECT, so the owner is read from the database and
+    any number of rows costs a single statement.
+    """
+    model = SYNC_MODELS[entity_type]
+    owned = _owned(entity_type, model.id, _owner_column(entity_type)).where(*criteria).subquery()
+    await db.execute(
+        insert(SyncTombstoneModel).from_select(
+            ["entity_type", "entity_id", "user_id"],
+            select(literal(entity_type, String), *owned.c)
+        )
+    )
+
+
+def _row_versions(db: AsyncSession, model):
+    """Sum of the rows' last writing transaction ids (PostgreSQL xmin); 0 elsewhere.
+
+    `now()` is the transaction start, so a write committed after a later-started
+    one can leave both the count and the latest change time unchanged. Any
+    committed update or insert changes the row's xmin, and with it this sum.
+    SQLite serializes write transactions, so its timestamps cannot go back.
+    """
+    if db.bind.dialect.name != "postgresql":
+        return literal(0, BigInteger)
+    return func.sum(literal_column(f"{model.__tablename__}.xmin::text::bigint", BigInteger))
+
+
+async def get_change_version(
+    db: AsyncSession, user_id: str, *entity_types: str, execution_date: Optional[date] = None
+) -> str:
+    """Version of a user's rows of `entity_types`, changing whenever one is inserted, updated or deleted.
+
+    One statement: the row count, latest change time and row versions (see
+    `_row_versions`) per entity type. A delete lowers the count; inserts and
+    updates move the latest time and the row versions, including writes from
+    transactions that started before the last read but committed after it.
+    `execution_date` limits daily logs and deviations to that day.
+    """
+    queries = []
+    for entity_type in entity_types:
+        model = SYNC_MODELS[entity_type]
+        query = _owned(
+            entity_type, literal(entity_type, String), func.count(), func.max(_changed_at(model)),
+            _row_versions(db, model)
+        ).where(_owner_column(entity_type) == user_id)
+        if execution_date is not None and entity_type in ("daily_log", "deviation"):
+            query = query.where(DailyLogModel.execution_date == execution_date)
+        queries.append(query)
+    rows = (await db.execute(union_all(*queries))).all()
+    return ";".join(
+        f"{entity_type}:{count}:{changed_at}:{versions}" for entity_type, count, changed_at, versions in sorted(rows)
+    )
+
+
+async def get_changes(db: AsyncSession, user_id: str, since: Optional[datetime] = None) -> Dict[str, Any]:
+    """Get a user's rows changed after `since`, plus tombstones of deleted rows.
+
+    Without `since` (or when it is older than the tombstone retention) this is a
+    full sync, limited to the last `sync_initial_log_days` of daily logs. Every
+    sync overlaps the previous one by `sync_overlap_seconds` so rows written by
+    transactions still in flight at the last sync are not missed; clients apply
+    rows as upserts, so the overlap is harmless.
+    """
+    now = (await db.execute(select(func.now()))).scalar_one()
+    full = since is None or since < now - timedelta(days=settings.sync_tombstone_retention_days)
+    threshold = None if full else since - timedelta(seconds=settings.sync_overlap_seconds)
+
+    changes: Dict[str, Any] = {"cursor": encode_cursor([now]), "full": full}
+    for entity_type, model in SYNC_MODELS.items():
+        query = _owned(entity_type, model).where(_owner_column(entity_type) == user_id)
+        query = query.options(*(noload(relationship) for relationship in NESTED.get(entity_type, ())))
+        if threshold is not None:
+            query = query.where(_changed_at(model) > threshold)
+        elif entity_type in ("daily_log", "deviation"):
+            query = query.where(DailyLogModel.execution_date >= now.date() - timedelta(days=settings.sync_initial_log_days))
+        result = await db.execute(query.order_by(_changed_at(model)))
+        changes[SYNC_FIELDS[entity_type]] = result.scalars().all()
+
+    changes["deleted"] = []
+    if threshold is not None:
+        result = await db.execute(
+            select(SyncTombstoneModel)
+            .where(SyncTombstoneModel.user_id == user_id, SyncTombstoneModel.deleted_at > threshold)
+            .order_by(SyncTombstoneModel.deleted_at)
+        )
+        changes["deleted"] = result.scalars().all()
+    return changes
+
+
+async def prune_tombstones(db: AsyncSession) -> int:
+    """Delete tombstones no cursor can still ask for; returns how many were deleted.
+
+    Cursors older than `sync_tombstone_retention_days` get a full sync, so
+    tombstones past the retention (plus the sync overlap) are never read again.
+    """
+    now = (await db.execute(select(func.now()))).scalar_one()
+    cutoff = now - timedelta(days=settings.sync_tombstone_retention_days, seconds=settings.sync_overlap_seconds)
+    result = await db.execute(delete(SyncTombstoneModel).where(SyncTombstoneModel.deleted_at < cutoff))
+    return result.rowcount
@@ -0,0 +1,154 @@
+"""Keyset (cursor) pagination for list endpoints.
+
+List endpoints keep returning a plain JSON array. Pagination is opt-in: without
+`limit` or `cursor` the whole list is returned as before. Otherwise the cursor
+for the next page is sent in the `X-Next-Cursor` response header and is absent
+on the last page. Cursors are opaque, URL-safe encodings of the sort key of
+the last item.
+"""
+
+import base64
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import DateTime, Select, literal, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import noload, selectinload
+from sqlalchemy.sql.functions import FunctionElement
+
+from app.config import get_settings
+
+settings = get_settings()
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def _encode_value(value: Any) -> Any:
+    """Tag dates and datetimes so they decode back to the same type."""
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, date):
+        return {"d": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    """Reverse `_encode_value`."""
+    if isinstance(value, dict):
+        if "dt" in value:
+            return datetime.fromisoformat(value["dt"])
+        if "d" in value:
+            return date.fromisoformat(value["d"])
+        raise ValueError("Unknown cursor value")
+    return value
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Encode a sort key as an opaque cursor."""
+    raw = json.dumps([_encode_value(v) for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    """Decode a cursor back into its sort key. Raises ValueError if malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Malformed cursor")
+    return [_decode_value(v) for v in values]
+
+
+@dataclass
+class PageRequest:
+    """Requested page: size (None for the whole list), position after the cursor, and whether to load nested collections."""
+    limit: Optional[int]
+    after: Optional[List[Any]] = None
+    include_nested: bool = True
+
+
+def page_params(
+    limit: Optional[int] = Query(None, ge=1, description="Page size (maximum applies); without limit and cursor the whole list is returned"),
+    cursor: Optional[str] = Query(None, description="Value of X-Next-Cursor from the previous page"),
+    include_nested: bool = Query(True, description="Include nested collections (returned empty when false)")
+) -> PageRequest:
+    """FastAPI dependency reading pagination query parameters."""
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    if limit is None and after is None:
+        # Unpaginated, so clients that do not follow X-Next-Cursor still get every row
+        return PageRequest(limit=None, include_nested=include_nested)
+    return PageRequest(
+        limit=min(limit or settings.page_default_limit, settings.page_max_limit),
+        after=after,
+        include_nested=include_nested
+    )
+
+
+class sort_key(FunctionElement):
+    """A datetime as compared by keyset pagination; the value itself except on SQLite.
+
+    SQLite stores datetimes as text, `YYYY-MM-DD HH:MM:SS` from server defaults
+    but with `.ffffff` from bound parameters, so the raw strings do not sort
+    like the times they hold. There both sides are normalized to one format.
+    """
+    inherit_cache = True
+
+
+@compiles(sort_key)
+def _compile_sort_key(element, compiler, **kw):
+    return compiler.process(element.clauses, **kw)
+
+
+@compiles(sort_key, "sqlite")
+def _compile_sort_key_sqlite(element, compiler, **kw):
+    return f"strftime('%Y-%m-%d %H:%M:%f', {compiler.process(element.clauses, **kw)})"
+
+
+def _key(column: Any, value: Any = None, bind: bool = False) -> Any:
+    """The column (or a cursor value bound with its type) in the form rows are ordered and compared by."""
+    expression = literal(value, column.type) if bind else column
+    return sort_key(expression) if isinstance(column.type, DateTime) else expression
+
+
+def apply_keyset(query: Select, columns: Sequence[Any], page: PageRequest, descending: bool = False) -> Select:
+    """Order by `columns`, start after the cursor and fetch one extra row to detect a next page."""
+    keys = [_key(column) for column in columns]
+    if page.after is not None:
+        if len(page.after) != len(columns):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        key = tuple_(*keys)
+        after = tuple_(*(_key(column, value, bind=True) for column, value in zip(columns, page.after)))
+        query = query.where(key < after if descending else key > after)
+    query = query.order_by(*(k.desc() if descending else k.asc() for k in keys))
+    return query if page.limit is None else query.limit(page.limit + 1)
+
+
+def nested_options(page: Optional[PageRequest], *relationships: Any) -> Tuple[Any, ...]:
+    """Loader options for nested collections: selectinload, or noload when the page excludes them."""
+    if page is not None and not page.include_nested:
+        return tuple(noload(relationship) for relationship in relationships)
+    return tuple(selectinload(relationship) for relationship in relationships)
+
+
+def finish_page(
+    response: Response,
+    items: Sequence[Any],
+    page: PageRequest,
+    key: Callable[[Any], Sequence[Any]]
+) -> List[Any]:
+    """Trim the extra row and set X-Next-Cursor when another page exists."""
+    items = list(items)
+    if page.limit is not None and len(items) > page.limit:
+        items = items[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(items[-1]))
+    return items
@@ -0,0 +1,153 @@
+"""Per-request SQL statement counts and time, slow query logging and query budgets.
+
+Engine event hooks attribute every statement to the request being handled
+through a context variable (FastAPI runs the endpoint, its dependencies and
+sync handlers' threads in copies of the request's context, so they all see
+the same `QueryStats`):
+
+- `QueryStatsMiddleware` counts statements and database time per request and,
+  with `DEBUG` on, reports them as `X-DB-Queries` and `Server-Timing: db;dur=...`
+  headers. Statements issued after the response has started (streamed exports)
+  are counted but cannot be in the headers.
+- Statements slower than `SLOW_QUERY_MS` are logged with the request's route.
+- `query_budget` counts every statement on the engine, whichever task or
+  thread issues it, so a test or benchmark can assert an endpoint stays within
+  a fixed number of statements (N+1 regressions show up as a failed budget).
+"""
+
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+from sqlalchemy import event
+
+from app.config import get_settings
+from app.database import engine
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+QUERIES_HEADER = "X-DB-Queries"
+
+# Longest statement text included in a slow query log line
+_LOGGED_STATEMENT_LENGTH = 500
+
+
+class QueryStats:
+    """Statements issued and time spent in the database."""
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self, keep_statements: bool = False):
+        self.count = 0
+        self.duration = 0.0
+        # Statement texts, only kept for budgets (to show what went over)
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+
+    def add(self, statement: str, duration: float) -> None:
+        """Record one executed statement."""
+        self.count += 1
+        self.duration += duration
+        if self.statements is not None:
+            self.statements.append(statement)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """More statements were issued than the budget allows."""
+
+
+# Stats of the request being handled, and the route it matched (for slow query logs)
+_request_stats: ContextVar[Optional[QueryStats]] = ContextVar("request_query_stats", default=None)
+_request_scope: ContextVar[Optional[dict]] = ContextVar("request_scope", default=None)
+
+# Open query_budget blocks; they see every statement regardless of context
+_budgets: List[QueryStats] = []
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Query stats of the request being handled, if any."""
+    return _request_stats.get()
+
+
+def _route() -> str:
+    scope = _request_scope.get()
+    if scope is None:
+        return "-"
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
+
+
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add(statement, duration)
+    for budget in _budgets:
+        budget.add(statement, duration)
+    if duration * 1000 >= settings.slow_query_ms:
+        logger.warning(
+            "Slow query (%.1f ms) in %s: %s",
+            duration * 1000, _route(), " ".join(statement.split())[:_LOGGED_STATEMENT_LENGTH],
+        )
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _handle_error(exception_context):
+    # after_cursor_execute does not run for a failed statement
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+
+
+@contextmanager
+def query_budget(max_queries: Optional[int] = None, label: str = "block") -> Iterator[QueryStats]:
+    """Count the statements issued inside the block; raise QueryBudgetExceeded past `max_queries`."""
+    stats = QueryStats(keep_statements=True)
+    _budgets.append(stats)
+    try:
+        yield stats
+    finally:
+        _budgets.remove(stats)
+    if max_queries is not None and stats.count > max_queries:
+        raise QueryBudgetExceeded(
+            f"{label} issued {stats.count} statements, budget is {max_queries}:\n" + "\n".join(stats.statements)
+        )
+
+
+class QueryStatsMiddleware:
+    """ASGI middleware attributing statements to the request; adds debug headers when DEBUG is on."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        stats_token = _request_stats.set(stats)
+        scope_token = _request_scope.set(scope)
+
+        async def add_headers(message):
+            if message["type"] == "http.response.start" and settings.debug:
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (QUERIES_HEADER.lower().encode(), str(stats.count).encode()),
+                    (b"server-timing", f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'.encode()),
+                ]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, add_headers)
+        finally:
+            _request_stats.reset(stats_token)
+            _request_scope.reset(scope_token)
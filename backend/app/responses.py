@@ -0,0 +1,68 @@
+"""Fast JSON responses for large lists.
+
+FastAPI validates a returned object against `response_model`, converts it to
+plain Python with `serialize(mode="json")` and only then encodes it with the
+stdlib `json` module. For lists of thousands of nested rows those three
+passes dominate the request. The helpers here return a ready `Response`
+instead (the `response_model` stays on the route for the OpenAPI schema):
+
+- `model_response` validates ORM objects with a cached `TypeAdapter` and
+  encodes straight to bytes in pydantic-core, skipping the intermediate
+  Python structures.
+- `rows_response` encodes flat `Row` tuples from column selects with orjson,
+  skipping pydantic altogether; use it only when the selected columns are
+  exactly the schema's fields and need no conversion.
+
+See benchmarks/serialization_bench.py for the CPU time of each path.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence
+
+import orjson
+from fastapi import Response, status
+from pydantic import TypeAdapter
+
+# "Z" for UTC, as pydantic writes it, so both paths produce the same output
+ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+JSON_MEDIA_TYPE = "application/json"
+
+
+@lru_cache(maxsize=None)
+def type_adapter(schema: Any) -> TypeAdapter:
+    """TypeAdapter for a schema type, built once per type."""
+    return TypeAdapter(schema)
+
+
+def _json_response(body: bytes, response: Optional[Response], status_code: int) -> Response:
+    """Wrap encoded JSON, keeping headers (X-Next-Cursor, ETag) set on the injected response."""
+    json_response = Response(body, status_code=status_code, media_type=JSON_MEDIA_TYPE)
+    if response is not None:
+        for name, value in response.headers.items():
+            if name not in ("content-length", "content-type"):
+                json_response.headers.append(name, value)
+    return json_response
+
+
+def model_response(
+    schema: Any,
+    content: Any,
+    response: Optional[Response] = None,
+    status_code: int = status.HTTP_200_OK
+) -> Response:
+    """Validate `content` (ORM objects) against `schema` and encode it in one pydantic-core pass."""
+    adapter = type_adapter(schema)
+    return _json_response(adapter.dump_json(adapter.validate_python(content)), response, status_code)
+
+
+def rows_response(
+    rows: Sequence[Any],
+    response: Optional[Response] = None,
+    constants: Optional[Dict[str, Any]] = None,
+    status_code: int = status.HTTP_200_OK
+) -> Response:
+    """Encode `Row` tuples from a column select as a JSON array of objects, adding `constants` to each."""
+    extra = constants or {}
+    body = orjson.dumps([{**row._mapping, **extra} for row in rows], option=ORJSON_OPTIONS)
+    return _json_response(body, response, status_code)
@@ -0,0 +1,74 @@
+"""Single-flight coalescing for identical in-flight computations."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from app.metrics import record_cache
+
+
+class SingleFlight:
+    """Share one in-flight computation between concurrent identical calls.
+
+    The first caller for a key (the leader) runs the computation; callers
+    arriving while it is in flight await the leader's result instead of
+    starting their own. Nothing is cached once the call completes.
+    Coalescing is per process - each uvicorn worker has its own registry.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    def in_flight(self, key: Hashable) -> bool:
+        """Check whether a computation for the key is currently running."""
+        return key in self._calls
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Run fn once for all concurrent callers sharing the same key."""
+        while True:
+            existing = self._calls.get(key)
+            if existing is None:
+                break
+            record_cache("single_flight", True)
+            try:
+                return await asyncio.shield(existing)
+            except asyncio.CancelledError:
+                if not existing.cancelled():
+                    raise
+                # The leader was cancelled, not us - retry, possibly as the new leader
+
+        record_cache("single_flight", False)
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark as retrieved so an exception without followers is not reported
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+
+def analysis_key(user_id: str, target_date: Any, operation: str) -> Tuple[str, str, str]:
+    """Build the coalescing key for a per-user, per-date analysis."""
+    return (user_id, str(target_date), operation)
+
+
+# Singleton instance
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """Get the single-flight registry singleton."""
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
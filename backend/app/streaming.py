@@ -0,0 +1,84 @@
+"""Streaming NDJSON/CSV exports straight from server-side database cursors.
+
+Queries run in their own session (the request session is closed before a
+streaming body is sent) with `yield_per`, so only one batch of rows is held
+in memory at a time regardless of how large the export is.
+"""
+
+import csv
+import enum
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Dict, List, Sequence
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select
+
+from app.config import get_settings
+from app.database import async_session_maker
+
+settings = get_settings()
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def jsonable(value: Any) -> Any:
+    """Convert a column value to a JSON/CSV friendly scalar."""
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def stream_batches(query: Select, batch_size: int = 0) -> AsyncIterator[Sequence[Any]]:
+    """Run `query` on a server-side cursor and yield its rows one batch at a time."""
+    batch_size = batch_size or settings.export_batch_size
+    async with async_session_maker() as db:
+        result = await db.stream(query.execution_options(yield_per=batch_size))
+        async for partition in result.partitions():
+            yield partition
+
+
+async def encode_ndjson(batches: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """Encode record batches as newline-delimited JSON, one chunk per batch."""
+    async for records in batches:
+        if records:
+            yield "".join(json.dumps(record, default=str) + "\n" for record in records).encode()
+
+
+async def encode_csv(batches: AsyncIterator[List[Dict[str, Any]]], fields: Sequence[str]) -> AsyncIterator[bytes]:
+    """Encode record batches as CSV with a header row; nested values are JSON-encoded."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(fields)
+    async for records in batches:
+        for record in records:
+            writer.writerow([
+                json.dumps(value, default=str) if isinstance(value, (list, dict)) else value
+                for value in (record.get(field) for field in fields)
+            ])
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+def export_response(
+    batches: AsyncIterator[List[Dict[str, Any]]],
+    export_format: str,
+    fields: Sequence[str],
+    filename: str
+) -> StreamingResponse:
+    """Build a streaming attachment response in the requested format."""
+    body = encode_csv(batches, fields) if export_format == "csv" else encode_ndjson(batches)
+    return StreamingResponse(
+        body,
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
@@ -0,0 +1,319 @@
+"""Deterministic OpenAI-compatible stand-in server for offline AI benchmarks.
+
+Serves `POST /v1/chat/completions` with canned JSON for each IGAMS AI role,
+plus in-memory `/v1/files` and `/v1/batches` for the batch pipeline, so the
+`app.ai` path can be load-tested without a real provider.
+
+Run:
+    uvicorn benchmarks.fake_llm_server:app --port 8100
+
+and point the backend at it:
+    OPENAI_API_KEY=fake OPENAI_BASE_URL=http://localhost:8100/v1
+
+Behaviour is configured through FAKE_LLM_* environment variables, e.g.
+    FAKE_LLM_LATENCY=lognormal:-1.2,0.6   # seconds; fixed:x | uniform:a,b | exponential:mean | lognormal:mu,sigma
+    FAKE_LLM_ERROR_RATE=0.05              # share of requests answered with FAKE_LLM_ERROR_STATUS
+    FAKE_LLM_MALFORMED_RATE=0.01          # share of responses whose content is not valid JSON
+    FAKE_LLM_TOKEN_DELAY=0.01             # seconds between chunks when stream=true
+    FAKE_LLM_BATCH_CONCURRENCY=64         # concurrent requests while processing a batch
+    FAKE_LLM_SEED=42
+"""
+
+import asyncio
+import json
+import random
+import time
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic_settings import BaseSettings
+
+
+class FakeLLMSettings(BaseSettings):
+    """Stand-in server settings loaded from FAKE_LLM_* environment variables."""
+
+    latency: str = "fixed:0.2"
+    error_rate: float = 0.0
+    error_status: int = 503
+    malformed_rate: float = 0.0
+    token_delay: float = 0.0
+    batch_concurrency: int = 64
+    seed: int = 42
+
+    class Config:
+        env_prefix = "FAKE_LLM_"
+        case_sensitive = False
+
+
+def parse_latency(spec: str) -> Tuple[str, List[float]]:
+    """Parse a latency distribution spec such as `uniform:0.1,0.5`."""
+    kind, _, raw_params = spec.partition(":")
+    params = [float(p) for p in raw_params.split(",") if p]
+    expected = {"fixed": 1, "uniform": 2, "exponential": 1, "lognormal": 2}
+    if kind not in expected or len(params) != expected[kind]:
+        raise ValueError(f"Invalid latency spec: {spec!r}")
+    return kind, params
+
+
+def sample_latency(rng: random.Random, kind: str, params: List[float]) -> float:
+    """Draw one latency in seconds from the configured distribution."""
+    if kind == "fixed":
+        return params[0]
+    if kind == "uniform":
+        return rng.uniform(params[0], params[1])
+    if kind == "exponential":
+        return rng.expovariate(1.0 / params[0]) if params[0] > 0 else 0.0
+    return rng.lognormvariate(params[0], params[1])
+
+
+# Canned role responses, keyed by the role named in the system prompt
+CANNED_RESPONSES: Dict[str, Dict[str, Any]] = {
+    "Process Engineer": {
+        "processes": [
+            {
+                "name": f"Phase {p + 1}",
+                "description": "Benchmark process",
+                "purpose": "Exercise process persistence",
+                "sequence_order": p,
+                "steps": [
+                    {
+                        "name": f"Step {p + 1}.{s + 1}",
+                        "action_verb": "Execute",
+                        "estimated_duration_minutes": 30,
+                        "quality_criteria": "Output reviewed against checklist",
+                        "expected_output": "Checklist-compliant artifact"
+                    }
+                    for s in range(5)
+                ]
+            }
+            for p in range(3)
+        ]
+    },
+    "Quality Inspector": {
+        "quality_score": 0.72,
+        "compliance_score": 0.8,
+        "findings": [
+            {
+                "type": "waste",
+                "severity": "medium",
+                "description": "Two steps produce overlapping output",
+                "recommendation": "Consider merging the overlapping steps"
+            }
+        ],
+        "waste_identified": ["duplication"],
+        "errors_detected": []
+    },
+    "Control System": {
+        "trigger": "quality_below_threshold",
+        "severity": "medium",
+        "analysis": "Quality criteria are broader than the step duration allows",
+        "recommendation": {
+            "action": "simplify",
+            "target": "step",
+            "description": "Narrow the quality criteria to the essential checks",
+            "expected_impact": "Quality improvement of ~15%",
+            "effort_change": "Reduced by 10 minutes per execution"
+        }
+    },
+}
+
+
+def detect_role(messages: List[Dict[str, Any]]) -> str:
+    """Find which IGAMS role a request is for from its system prompt."""
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    for role in CANNED_RESPONSES:
+        if role in system:
+            return role
+    return "Quality Inspector"
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token)."""
+    return max(1, len(text) // 4)
+
+
+settings = FakeLLMSettings()
+_latency_kind, _latency_params = parse_latency(settings.latency)
+_rng = random.Random(settings.seed)
+
+app = FastAPI(title="Fake LLM", description="Deterministic OpenAI-compatible stand-in")
+
+
+async def _complete(body: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """Produce (status_code, response body) for a non-streaming chat completion."""
+    messages = body.get("messages", [])
+    model = body.get("model", "fake-model")
+
+    # Draw everything up front so results only depend on request order and seed
+    latency = sample_latency(_rng, _latency_kind, _latency_params)
+    fail = _rng.random() < settings.error_rate
+    malformed = _rng.random() < settings.malformed_rate
+
+    await asyncio.sleep(latency)
+
+    if fail:
+        return settings.error_status, {
+            "error": {"message": "Injected failure", "type": "server_error", "code": None}
+        }
+
+    content = json.dumps(CANNED_RESPONSES[detect_role(messages)])
+    if malformed:
+        content = content[: len(content) // 2]
+
+    prompt_tokens = sum(estimate_tokens(m.get("content") or "") for m in messages)
+    completion_tokens = estimate_tokens(content)
+    return 200, {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }
+        ],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    """Answer a chat completion request with the canned JSON for its role."""
+    body = await request.json()
+    status_code, payload = await _complete(body)
+    if status_code != 200:
+        return JSONResponse(status_code=status_code, content=payload)
+
+    if body.get("stream"):
+        return StreamingResponse(
+            _stream_chunks(payload["id"], payload["created"], payload["model"],
+                           payload["choices"][0]["message"]["content"]),
+            media_type="text/event-stream"
+        )
+    return payload
+
+
+async def _stream_chunks(completion_id: str, created: int, model: str, content: str):
+    """Emit the content as server-sent chat.completion.chunk events, ~4 characters per token."""
+    def chunk(delta: Dict[str, Any], finish_reason=None) -> str:
+        payload = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(payload)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    for i in range(0, len(content), 4):
+        if settings.token_delay:
+            await asyncio.sleep(settings.token_delay)
+        yield chunk({"content": content[i:i + 4]})
+    yield chunk({}, finish_reason="stop")
+    yield "data: [DONE]\n\n"
+
+
+# Batch API stand-in: files and batches are kept in memory
+_files: Dict[str, bytes] = {}
+_batches: Dict[str, Dict[str, Any]] = {}
+
+
+@app.post("/v1/files")
+async def upload_file(file: UploadFile = File(...), purpose: str = Form(...)):
+    """Store an uploaded file."""
+    file_id = f"file-{uuid.uuid4().hex}"
+    _files[file_id] = await file.read()
+    return {
+        "id": file_id,
+        "object": "file",
+        "bytes": len(_files[file_id]),
+        "created_at": int(time.time()),
+        "filename": file.filename,
+        "purpose": purpose
+    }
+
+
+@app.get("/v1/files/{file_id}/content")
+async def file_content(file_id: str):
+    """Return a stored file's raw content."""
+    if file_id not in _files:
+        return JSONResponse(status_code=404, content={"error": {"message": "No such file"}})
+    return Response(content=_files[file_id], media_type="application/jsonl")
+
+
+@app.post("/v1/batches")
+async def create_batch(request: Request):
+    """Create a batch and process its requests in the background."""
+    body = await request.json()
+    input_file_id = body.get("input_file_id")
+    if input_file_id not in _files:
+        return JSONResponse(status_code=400, content={"error": {"message": "Unknown input_file_id"}})
+
+    batch_id = f"batch_{uuid.uuid4().hex}"
+    lines = [json.loads(line) for line in _files[input_file_id].decode().splitlines() if line.strip()]
+    _batches[batch_id] = {
+        "id": batch_id,
+        "object": "batch",
+        "endpoint": body.get("endpoint", "/v1/chat/completions"),
+        "input_file_id": input_file_id,
+        "completion_window": body.get("completion_window", "24h"),
+        "status": "in_progress",
+        "output_file_id": None,
+        "error_file_id": None,
+        "created_at": int(time.time()),
+        "completed_at": None,
+        "request_counts": {"total": len(lines), "completed": 0, "failed": 0}
+    }
+    asyncio.get_running_loop().create_task(_run_batch(batch_id, lines))
+    return _batches[batch_id]
+
+
+@app.get("/v1/batches/{batch_id}")
+async def get_batch(batch_id: str):
+    """Return a batch's status."""
+    if batch_id not in _batches:
+        return JSONResponse(status_code=404, content={"error": {"message": "No such batch"}})
+    return _batches[batch_id]
+
+
+async def _run_batch(batch_id: str, lines: List[Dict[str, Any]]) -> None:
+    """Complete every batch request with bounded concurrency and write the output file."""
+    batch = _batches[batch_id]
+    semaphore = asyncio.Semaphore(settings.batch_concurrency)
+
+    async def run_line(line: Dict[str, Any]) -> str:
+        async with semaphore:
+            status_code, payload = await _complete(line.get("body", {}))
+        counts = batch["request_counts"]
+        counts["completed" if status_code == 200 else "failed"] += 1
+        return json.dumps({
+            "id": f"batch_req_{uuid.uuid4().hex}",
+            "custom_id": line.get("custom_id"),
+            "response": {"status_code": status_code, "request_id": uuid.uuid4().hex, "body": payload},
+            "error": None
+        })
+
+    output = await asyncio.gather(*(run_line(line) for line in lines))
+    output_file_id = f"file-{uuid.uuid4().hex}"
+    _files[output_file_id] = ("\n".join(output) + "\n").encode()
+    batch.update(status="completed", output_file_id=output_file_id, completed_at=int(time.time()))
+
+
+@app.get("/v1/models")
+async def list_models():
+    """List the single fake model."""
+    return {"object": "list", "data": [{"id": "gpt-4o", "object": "model", "owned_by": "fake"}]}
+
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run(app, host="127.0.0.1", port=8100, log_level="warning")
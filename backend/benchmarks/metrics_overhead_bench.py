@@ -0,0 +1,75 @@
+"""Per-request overhead of MetricsMiddleware and the cost of rendering /metrics.
+
+Calls the application's routes directly through ASGI (no server, no network)
+with and without the metrics middleware and reports the time per request.
+`/health` is the cheapest route, so its relative overhead is the worst case;
+the unauthenticated log lookup exercises route matching deep in the table.
+
+    python -m benchmarks.metrics_overhead_bench --requests 20000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+from typing import Any, Dict
+
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi import FastAPI  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.metrics import MetricsMiddleware, get_metrics  # noqa: E402
+
+
+def make_scope(asgi_app: FastAPI, path: str) -> Dict[str, Any]:
+    return {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "", "query_string": b"",
+        "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80),
+        "app": asgi_app,
+    }
+
+
+async def run(asgi_app, router_app: FastAPI, path: str, requests: int) -> float:
+    """Seconds per request."""
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await asgi_app(make_scope(router_app, path), receive, send)
+    return (time.perf_counter() - started) / requests
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    # The bare router, so neither side pays for the app's other middlewares
+    bare = FastAPI()
+    bare.router.routes.extend(app.router.routes)
+    instrumented = MetricsMiddleware(bare)
+    print(f"{len(bare.router.routes)} routes, {args.requests} requests per case")
+    print(f"{'path':<42} {'bare us':>9} {'metrics us':>11} {'overhead us':>12} {'overhead':>9}")
+    for path in ("/health", "/api/operations/logs/00000000-0000-0000-0000-000000000000"):
+        await run(bare, bare, path, 1000)  # warm up
+        without = await run(bare, bare, path, args.requests)
+        with_metrics = await run(instrumented, bare, path, args.requests)
+        overhead = with_metrics - without
+        print(
+            f"{path[:42]:<42} {without * 1e6:>9.1f} {with_metrics * 1e6:>11.1f} "
+            f"{overhead * 1e6:>12.1f} {overhead / without:>8.1%}"
+        )
+
+    started = time.perf_counter()
+    body = get_metrics().render()
+    print(f"render /metrics: {(time.perf_counter() - started) * 1000:.2f} ms, {len(body):,} bytes")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
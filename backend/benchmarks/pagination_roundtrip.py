@@ -0,0 +1,98 @@
+"""Walks keyset pagination page by page and checks every row comes back exactly once.
+
+Creates goals and daily logs through the ASGI app (in process, no server
+needed), gives them all the same created_at so the cursor has to break ties
+on the id, then follows X-Next-Cursor with a small page size on a descending
+list (goals) and an ascending one (logs in a range, both nested and flat).
+Exits non-zero when a walk repeats or skips a row or does not end, so it can
+run in CI against a scratch database:
+
+    DATABASE_URL=sqlite+aiosqlite:///./pagination.db python -m benchmarks.pagination_roundtrip
+"""
+
+import os
+import sys
+import uuid
+from datetime import date
+from typing import Any, Dict, List
+
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import func, update  # noqa: E402
+
+from app.main import app  # noqa: E402
+from app.database import engine  # noqa: E402
+from app.modules.inputs.models import GoalModel  # noqa: E402
+from app.modules.daily_operations.models import DailyLogModel  # noqa: E402
+
+ROWS = 7
+PAGE_SIZE = 2
+
+
+def walk(client: TestClient, url: str, params: Dict[str, Any]) -> List[str]:
+    """Ids of every page in order; stops after more pages than rows could fill."""
+    ids: List[str] = []
+    cursor = None
+    for _ in range(ROWS + 2):
+        response = client.get(url, params={**params, "limit": PAGE_SIZE, **({"cursor": cursor} if cursor else {})})
+        response.raise_for_status()
+        ids += [item["id"] for item in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return ids
+    raise SystemExit(f"{url}: still paging after {ROWS + 2} pages ({len(ids)} rows seen)")
+
+
+def tie_created_at(client: TestClient, model, user_id: str) -> None:
+    """Give all of the user's rows one server-generated created_at (second precision on SQLite)."""
+    async def run():
+        async with engine.begin() as conn:
+            await conn.execute(update(model).where(model.user_id == user_id).values(created_at=func.now()))
+
+    client.portal.call(run)
+
+
+def main() -> int:
+    failures = 0
+    with TestClient(app) as client:
+        email = f"pages-{uuid.uuid4().hex[:8]}@example.com"
+        client.post("/api/auth/register", json={"email": email, "password": "bench-password", "full_name": "Bench"})
+        token = client.post("/api/auth/login", data={"username": email, "password": "bench-password"}).json()
+        client.headers["Authorization"] = f"Bearer {token['access_token']}"
+        user_id = client.get("/api/auth/me").json()["id"]
+
+        goals = [
+            client.post("/api/inputs/goals", json={"title": f"Goal {i}", "purpose": "Paging", "resources": []}).json()
+            for i in range(ROWS)
+        ]
+        process = client.post("/api/processes", json={
+            "goal_id": goals[0]["id"], "name": "Paging process",
+            "steps": [{"name": f"Step {i}", "sequence_order": i} for i in range(ROWS)]
+        }).json()
+        today = date.today().isoformat()
+        logs = [
+            client.post("/api/operations/logs", json={"step_id": step["id"], "execution_date": today}).json()
+            for step in process["steps"]
+        ]
+        tie_created_at(client, GoalModel, user_id)
+        tie_created_at(client, DailyLogModel, user_id)
+
+        cases = [
+            ("GET /inputs/goals", "/api/inputs/goals", {}, goals),
+            ("GET /operations/logs/range", "/api/operations/logs/range",
+             {"start_date": today, "end_date": today}, logs),
+            ("GET /operations/logs/range (flat)", "/api/operations/logs/range",
+             {"start_date": today, "end_date": today, "include_nested": False}, logs),
+        ]
+        print(f"{'list':<36} {'rows':>5} {'seen':>5} {'unique':>7}")
+        for label, url, params, expected in cases:
+            ids = walk(client, url, params)
+            ok = len(ids) == len(set(ids)) and set(ids) == {item["id"] for item in expected}
+            failures += not ok
+            print(f"{label:<36} {len(expected):>5} {len(ids):>5} {len(set(ids)):>7}{'' if ok else '  FAILED'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
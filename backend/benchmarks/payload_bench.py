@@ -0,0 +1,118 @@
+"""Bytes on the wire and server CPU per response encoding for typical mobile payloads.
+
+Builds daily log list pages (as /api/operations/logs/range returns them) and
+an NDJSON export from an in-memory SQLite database, then encodes each the way
+app.encoding would for the given Accept / Accept-Encoding: JSON or
+MessagePack, uncompressed, gzip or brotli (streamed exports are compressed in
+`--chunk`-row chunks with a flush after each, as the middleware does).
+Reports the median CPU time of the encoding step and the size sent.
+
+    python -m benchmarks.payload_bench --pages 20,100,500 --deviations 1
+"""
+
+import argparse
+import os
+import statistics
+import time
+from typing import Callable, List, Tuple
+
+os.environ.setdefault("DEBUG", "false")
+
+import msgpack  # noqa: E402
+import orjson  # noqa: E402
+from sqlalchemy import create_engine, select  # noqa: E402
+from sqlalchemy.orm import Session, selectinload  # noqa: E402
+
+import app.main  # noqa: E402,F401  (registers every model on Base.metadata)
+from app.config import get_settings  # noqa: E402
+from app.database import Base  # noqa: E402
+from app.encoding import _Compressor  # noqa: E402
+from app.responses import model_response  # noqa: E402
+from app.streaming import jsonable  # noqa: E402
+from app.modules.daily_operations.models import DailyLogModel  # noqa: E402
+from app.modules.daily_operations.schemas import DailyLog  # noqa: E402
+from app.modules.daily_operations.service import LOG_FLAT_COLUMNS  # noqa: E402
+from benchmarks.serialization_bench import seed  # noqa: E402
+
+settings = get_settings()
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    return _Compressor(encoding).finish(body)
+
+
+def compress_stream(chunks: List[bytes], encoding: str) -> bytes:
+    compressor = _Compressor(encoding)
+    return b"".join(compressor.compress(chunk) for chunk in chunks[:-1]) + compressor.finish(chunks[-1])
+
+
+def transcode(body: bytes) -> bytes:
+    return msgpack.packb(orjson.loads(body))
+
+
+def measure(fn: Callable[[], bytes], repeat: int) -> Tuple[float, int]:
+    """Median CPU seconds per call and the encoded size."""
+    times = []
+    out = b""
+    for _ in range(repeat):
+        started = time.process_time()
+        out = fn()
+        times.append(time.process_time() - started)
+    return statistics.median(times), len(out)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pages", default="20,100,500", help="comma-separated page sizes (logs per response)")
+    parser.add_argument("--deviations", type=int, default=1, help="deviations per log")
+    parser.add_argument("--export-rows", type=int, default=20000)
+    parser.add_argument("--chunk", type=int, default=settings.export_batch_size, help="rows per streamed chunk")
+    parser.add_argument("--repeat", type=int, default=7)
+    args = parser.parse_args()
+    pages = [int(size) for size in args.pages.split(",")]
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        seed(session, max(max(pages), args.export_rows), args.deviations)
+    payloads: List[Tuple[str, bytes, List[bytes]]] = []
+    with Session(engine) as session:
+        logs = session.scalars(
+            select(DailyLogModel).options(selectinload(DailyLogModel.deviations))
+            .order_by(DailyLogModel.created_at).limit(max(pages))
+        ).all()
+        for size in pages:
+            body = model_response(List[DailyLog], logs[:size]).body
+            payloads.append((f"page of {size} logs", body, []))
+        rows = session.execute(select(*LOG_FLAT_COLUMNS).limit(args.export_rows)).all()
+        lines = [orjson.dumps({key: jsonable(value) for key, value in row._mapping.items()}) + b"\n" for row in rows]
+        chunks = [b"".join(lines[i:i + args.chunk]) for i in range(0, len(lines), args.chunk)]
+        payloads.append((f"ndjson export, {len(rows)} rows", b"".join(chunks), chunks))
+
+    print(f"gzip level {settings.compression_gzip_level}, brotli quality {settings.compression_brotli_quality}")
+    print(f"{'payload':<28} {'encoding':<16} {'bytes':>11} {'ratio':>6} {'cpu ms':>8}")
+    for name, body, chunks in payloads:
+        if chunks:
+            cases = [
+                ("identity", lambda: body),
+                ("gzip (streamed)", lambda: compress_stream(chunks, "gzip")),
+                ("br (streamed)", lambda: compress_stream(chunks, "br")),
+                ("gzip (one shot)", lambda: compress(body, "gzip")),
+                ("br (one shot)", lambda: compress(body, "br")),
+            ]
+        else:
+            cases = [
+                ("json", lambda: body),
+                ("json + gzip", lambda: compress(body, "gzip")),
+                ("json + br", lambda: compress(body, "br")),
+                ("msgpack", lambda: transcode(body)),
+                ("msgpack + gzip", lambda: compress(transcode(body), "gzip")),
+                ("msgpack + br", lambda: compress(transcode(body), "br")),
+            ]
+        for encoding, fn in cases:
+            seconds, size = measure(fn, args.repeat)
+            print(f"{name:<28} {encoding:<16} {size:>11,} {size / len(body):>6.2f} {seconds * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
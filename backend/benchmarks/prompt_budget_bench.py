@@ -0,0 +1,92 @@
+"""Prompt size versus coverage for the Quality Inspector execution context.
+
+Synthesizes a day of logs and deviations and, for each token budget, reports
+the rendered prompt size and how much of the signal survives: the share of
+problem logs (skipped, blocked, low quality or with deviations) and of
+deviations that made it into the prompt.
+
+    python -m benchmarks.prompt_budget_bench --logs 60 --budgets 250,500,1000,1500,3000,0
+"""
+
+import argparse
+import random
+import time
+from typing import Any, Dict, List
+
+from app.ai.context import build_execution_context, estimate_tokens, _priority
+from app.ai.prompts.quality_inspector import get_quality_inspector_prompt
+
+STATUSES = ["completed"] * 6 + ["skipped", "blocked", "pending", "in_progress"]
+DEVIATION_TYPES = ["time", "quality", "process", "skip", "external"]
+
+
+def synthesize_day(rng: random.Random, n_logs: int) -> List[Dict[str, Any]]:
+    """Build a day of logs shaped like get_day_execution_details output."""
+    logs = []
+    for i in range(n_logs):
+        status = rng.choice(STATUSES)
+        deviations = [
+            {
+                "type": rng.choice(DEVIATION_TYPES),
+                "description": "Took longer because " + " ".join(["the source material was incomplete"] * rng.randint(1, 6)),
+                "root_cause": rng.choice([None, "Unclear quality criteria for this step " * rng.randint(1, 4)]),
+                "impact_level": round(rng.random(), 2),
+            }
+            for _ in range(rng.choice([0, 0, 0, 1, 1, 2]))
+        ]
+        logs.append({
+            "log_id": str(i),
+            "step_name": f"Step {i + 1} - review and summarize notes",
+            "status": status,
+            "quality_score": round(rng.random(), 2) if status == "completed" else None,
+            "actual_execution": "Worked through the checklist and " * rng.randint(1, 10) if status == "completed" else None,
+            "deviations": deviations,
+        })
+    return logs
+
+
+def render(logs, deviations, summary) -> str:
+    """Render the full Quality Inspector prompt for a context."""
+    return get_quality_inspector_prompt({
+        "date": "2026-01-01",
+        "execution_accuracy": 0.6,
+        "time_deviation": 1.2,
+        "quality_compliance": 0.7,
+        "logs": logs,
+        "deviations": deviations,
+        "omitted_summary": summary,
+    })
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logs", type=int, default=60, help="Logs in the synthetic day")
+    parser.add_argument("--budgets", default="250,500,1000,1500,3000,0", help="Comma-separated token budgets; 0 = unlimited")
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    day = synthesize_day(random.Random(args.seed), args.logs)
+    problem_logs = sum(1 for log in day if _priority(log) >= 2)
+    total_deviations = sum(len(log["deviations"]) for log in day)
+
+    print(f"{args.logs} logs, {problem_logs} problem logs, {total_deviations} deviations")
+    print(f"{'budget':>8} {'prompt_tok':>10} {'logs':>6} {'problem%':>9} {'deviation%':>11} {'build_ms':>9}")
+    for raw in args.budgets.split(","):
+        budget = int(raw) or 10 ** 9
+        started = time.perf_counter()
+        logs, deviations, summary = build_execution_context(day, budget)
+        build_ms = (time.perf_counter() - started) * 1000
+        prompt_tokens = estimate_tokens(render(logs, deviations, summary))
+
+        kept_names = {log["step_name"] for log in logs}
+        kept_problems = sum(1 for log in day if _priority(log) >= 2 and log["step_name"] in kept_names)
+        print(
+            f"{raw if int(raw) else 'none':>8} {prompt_tokens:>10} {len(logs):>6}"
+            f" {kept_problems / problem_logs if problem_logs else 1.0:>9.1%}"
+            f" {len(deviations) / total_deviations if total_deviations else 1.0:>11.1%}"
+            f" {build_ms:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
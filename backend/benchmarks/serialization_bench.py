@@ -0,0 +1,132 @@
+"""CPU time of serializing large log lists, FastAPI's default path versus app.responses.
+
+Loads `--logs` daily logs with `--deviations` deviations each from an
+in-memory SQLite database, then serializes the page the way each pipeline
+would (database time is not included):
+
+- fastapi: response_model validation, `serialize(mode="json")`, stdlib json
+- fastapi+orjson: the same conversion, encoded with orjson
+- model_response: cached TypeAdapter, validated and encoded in pydantic-core
+- rows_response: flat Row tuples encoded with orjson (include_nested=false)
+
+and reports the median process CPU time per response and the body size.
+
+    python -m benchmarks.serialization_bench --logs 5000 --deviations 2
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, List, Tuple
+
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi.responses import JSONResponse, ORJSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from fastapi.utils import create_response_field  # noqa: E402
+from sqlalchemy import create_engine, insert, select  # noqa: E402
+from sqlalchemy.orm import Session, noload, selectinload  # noqa: E402
+
+import app.main  # noqa: E402,F401  (registers every model on Base.metadata)
+from app.database import Base  # noqa: E402
+from app.responses import model_response, rows_response  # noqa: E402
+from app.modules.daily_operations.models import DailyLogModel, DeviationModel, ExecutionStatus  # noqa: E402
+from app.modules.daily_operations.schemas import DailyLog  # noqa: E402
+from app.modules.daily_operations.service import LOG_FLAT_COLUMNS  # noqa: E402
+
+
+def seed(session: Session, logs: int, deviations: int) -> None:
+    """Insert completed logs with deviations; foreign keys are not enforced by SQLite."""
+    user_id, step_id = str(uuid.uuid4()), str(uuid.uuid4())
+    start = datetime(2026, 1, 1, 8)
+    log_rows = [
+        {
+            "id": str(uuid.uuid4()),
+            "step_id": step_id,
+            "user_id": user_id,
+            "execution_date": date(2026, 1, 1) + timedelta(days=i // 10),
+            "status": ExecutionStatus.COMPLETED,
+            "planned_start": start,
+            "actual_start": start + timedelta(minutes=i % 7),
+            "actual_end": start + timedelta(minutes=30 + i % 11),
+            "actual_execution": "Worked through the checklist and noted two blockers.",
+            "quality_score": 0.8,
+            "quality_notes": "Fine",
+            "created_at": start + timedelta(seconds=i),
+        }
+        for i in range(logs)
+    ]
+    session.execute(insert(DailyLogModel), log_rows)
+    session.execute(insert(DeviationModel), [
+        {
+            "id": str(uuid.uuid4()),
+            "daily_log_id": row["id"],
+            "deviation_type": "time",
+            "description": "Started later than planned because of a meeting.",
+            "impact_level": 0.3,
+            "root_cause": "Calendar conflict",
+            "created_at": row["created_at"],
+        }
+        for row in log_rows for _ in range(deviations)
+    ])
+    session.commit()
+
+
+def fastapi_default(field, objects: List[Any], response_class) -> bytes:
+    """What a route returning ORM objects with response_model costs after the handler."""
+    content = asyncio.run(serialize_response(field=field, response_content=objects))
+    return response_class(content).body
+
+
+def measure(fn: Callable[[], bytes], repeat: int) -> Tuple[float, int]:
+    """Median CPU seconds per call and the body size."""
+    times = []
+    body = b""
+    for _ in range(repeat):
+        started = time.process_time()
+        body = fn()
+        times.append(time.process_time() - started)
+    return statistics.median(times), len(body)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logs", type=int, default=5000)
+    parser.add_argument("--deviations", type=int, default=2, help="deviations per log")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    field = create_response_field(name="Response_bench", type_=List[DailyLog], mode="serialization")
+    with Session(engine) as session:
+        seed(session, args.logs, args.deviations)
+    # Separate sessions so the flat load does not share (and reset) the nested instances
+    with Session(engine) as nested_session, Session(engine) as flat_session:
+        nested = nested_session.scalars(select(DailyLogModel).options(selectinload(DailyLogModel.deviations))).all()
+        flat = flat_session.scalars(select(DailyLogModel).options(noload(DailyLogModel.deviations))).all()
+        rows = flat_session.execute(select(*LOG_FLAT_COLUMNS)).all()
+
+        cases = [
+            ("nested", "fastapi", lambda: fastapi_default(field, nested, JSONResponse)),
+            ("nested", "fastapi+orjson", lambda: fastapi_default(field, nested, ORJSONResponse)),
+            ("nested", "model_response", lambda: model_response(List[DailyLog], nested).body),
+            ("flat", "fastapi", lambda: fastapi_default(field, flat, JSONResponse)),
+            ("flat", "model_response", lambda: model_response(List[DailyLog], flat).body),
+            ("flat", "rows_response", lambda: rows_response(rows, constants={"deviations": []}).body),
+        ]
+        print(f"{args.logs} logs, {args.deviations} deviations each (nested) / none (flat)")
+        print(f"{'shape':<7} {'pipeline':<16} {'cpu ms':>9} {'speedup':>8} {'bytes':>11}")
+        baseline = {}
+        for shape, name, fn in cases:
+            seconds, size = measure(fn, args.repeat)
+            baseline.setdefault(shape, seconds)
+            print(f"{shape:<7} {name:<16} {seconds * 1000:>9.1f} {baseline[shape] / seconds:>7.1f}x {size:>11,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""Offline recall and latency benchmark for the template reuse index.
+
+Builds a synthetic corpus of goal "families" (near-identical goals that share
+one design), indexes a few accepted variants per family and queries with
+fresh paraphrased variants. Held-out families act as novel goals that should
+fall back to the AI.
+
+    python -m benchmarks.template_index_bench --families 500 --variants 3 --threshold 0.85
+"""
+
+import argparse
+import random
+import statistics
+import time
+from typing import Dict, List
+
+from app.ai.template_index import TemplateIndex, goal_text
+
+SUBJECTS = [
+    "spanish", "python", "marathon", "piano", "thesis", "startup", "portfolio", "garden", "novel",
+    "certification", "weight", "savings", "podcast", "photography", "kitchen", "chess", "german",
+    "calculus", "guitar", "triathlon", "blog", "youtube", "mobile", "investing", "climbing", "yoga",
+]
+ACTIONS = ["learn", "finish", "launch", "build", "improve", "master", "prepare", "complete", "grow", "start"]
+QUALIFIERS = [
+    "fluently", "before summer", "in six months", "for work", "from scratch", "as a beginner",
+    "part time", "with a mentor", "on weekends", "for an exam", "professionally", "this year",
+]
+PURPOSES = [
+    "career change", "personal growth", "health", "promotion", "travel", "family", "financial freedom",
+    "side income", "confidence", "relocation", "university admission", "community",
+]
+FILLER = ["really", "want", "need", "goal", "plan", "better", "able", "get", "daily", "consistent"]
+RESOURCES = [("time", "hours"), ("money", "dollars"), ("tool", "laptop"), ("effort", "sessions")]
+
+
+def make_family(rng: random.Random) -> Dict[str, object]:
+    """Pick the fixed core of a family of near-identical goals."""
+    return {
+        "subject": rng.sample(SUBJECTS, 2),
+        "action": rng.choice(ACTIONS),
+        "qualifier": rng.choice(QUALIFIERS),
+        "purpose": rng.sample(PURPOSES, 2),
+        "resources": rng.sample(RESOURCES, 2),
+    }
+
+
+def make_variant(rng: random.Random, family: Dict[str, object]) -> Dict[str, object]:
+    """Paraphrase a family core with filler words, drops and reordering."""
+    title_words = [family["action"], *family["subject"], *family["qualifier"].split()]
+    title_words += rng.sample(FILLER, rng.randint(0, 3))
+    if len(title_words) > 4 and rng.random() < 0.3:
+        title_words.pop(rng.randrange(len(title_words)))
+    rng.shuffle(title_words)
+    purpose_words = [*family["purpose"], *rng.sample(FILLER, rng.randint(1, 3))]
+    rng.shuffle(purpose_words)
+    return {
+        "title": " ".join(title_words),
+        "description": None,
+        "purpose": " ".join(purpose_words),
+        "resources": [
+            {"name": f"{kind} budget", "type": kind, "unit": unit}
+            for kind, unit in family["resources"]
+        ],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--families", type=int, default=500, help="Families with accepted designs in the index")
+    parser.add_argument("--novel", type=int, default=200, help="Held-out families used as novel goals")
+    parser.add_argument("--variants", type=int, default=3, help="Indexed variants per family")
+    parser.add_argument("--queries", type=int, default=2000, help="Queries against indexed families")
+    parser.add_argument("--threshold", type=float, default=0.85, help="Minimum similarity for reuse")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    families = [make_family(rng) for _ in range(args.families)]
+    novel = [make_family(rng) for _ in range(args.novel)]
+
+    index = TemplateIndex()
+    for f_id, family in enumerate(families):
+        for v in range(args.variants):
+            index.add(f"{f_id}:{v}", goal_text(make_variant(rng, family)), {"family": f_id})
+    started = time.perf_counter()
+    index.build()
+    build_ms = (time.perf_counter() - started) * 1000
+
+    latencies: List[float] = []
+    top1_correct = reused = reused_correct = 0
+    for _ in range(args.queries):
+        f_id = rng.randrange(len(families))
+        text = goal_text(make_variant(rng, families[f_id]))
+        started = time.perf_counter()
+        matches = index.query(text, limit=1)
+        latencies.append(time.perf_counter() - started)
+        if matches and matches[0][2]["family"] == f_id:
+            top1_correct += 1
+        if matches and matches[0][0] >= args.threshold:
+            reused += 1
+            reused_correct += matches[0][2]["family"] == f_id
+
+    false_reuse = 0
+    for family in novel:
+        matches = index.query(goal_text(make_variant(rng, family)), limit=1)
+        false_reuse += bool(matches and matches[0][0] >= args.threshold)
+
+    latencies.sort()
+    print(f"indexed documents:    {len(index)} (build {build_ms:.1f} ms)")
+    print(f"recall@1:             {top1_correct / args.queries:.3f}")
+    print(f"reuse rate @ {args.threshold:.2f}:   {reused / args.queries:.3f}"
+          f" (precision {reused_correct / reused if reused else 0.0:.3f})")
+    print(f"novel false reuse:    {false_reuse / len(novel) if novel else 0.0:.3f}")
+    print(f"query latency ms:     p50={latencies[len(latencies) // 2] * 1000:.3f}"
+          f" p95={latencies[int(len(latencies) * 0.95)] * 1000:.3f}"
+          f" mean={statistics.mean(latencies) * 1000:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""SQL statements issued per write endpoint, checked against a budget.
+
+Drives every create/update endpoint once through the ASGI app (in process,
+no server needed) and counts the statements each one sends to the database.
+Writes use INSERT/UPDATE ... RETURNING, so each should cost its ownership
+lookup plus one statement per table written. Exits non-zero when an endpoint
+goes over budget, so it can run in CI against a scratch database:
+
+    DATABASE_URL=sqlite+aiosqlite:///./write_statements.db python -m benchmarks.write_statements
+"""
+
+import os
+import sys
+import uuid
+from datetime import date
+from typing import Any, Dict, List, Tuple
+
+os.environ.setdefault("DEBUG", "false")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from app.main import app  # noqa: E402
+from app.query_stats import query_budget  # noqa: E402
+
+# Endpoint -> maximum statements (ownership/existence lookups included)
+BUDGETS = {
+    "POST /auth/register": 2,
+    "POST /inputs/goals (2 resources)": 2,
+    "PATCH /inputs/goals/{id}": 3,
+    "POST /inputs/goals/{id}/resources": 3,
+    "POST /processes (3 steps)": 4,
+    "PATCH /processes/{id}": 3,
+    "POST /processes/{id}/steps": 3,
+    "PATCH /processes/steps/{id}": 2,
+    "POST /operations/logs": 1,
+    "POST /operations/logs/{id}/start": 3,
+    "POST /operations/logs/{id}/complete": 3,
+    "PATCH /operations/logs/{id}": 3,
+    "POST /operations/logs/{id}/deviations": 3,
+    "POST /control/improvements": 1,
+    "PATCH /control/improvements/{id}": 2,
+    "POST /control/actions": 1,
+}
+
+
+def main() -> int:
+    results: List[Tuple[str, int, int]] = []
+
+    def call(label: str, method: str, url: str, **kwargs: Any) -> Dict[str, Any]:
+        with query_budget(label=label) as stats:
+            response = client.request(method, f"/api{url}", **kwargs)
+        if response.status_code >= 400:
+            raise SystemExit(f"{label}: HTTP {response.status_code} {response.text}")
+        results.append((label, stats.count, response.status_code))
+        return response.json()
+
+    with TestClient(app) as client:
+        email = f"writes-{uuid.uuid4().hex[:8]}@example.com"
+        call("POST /auth/register", "POST", "/auth/register",
+             json={"email": email, "password": "bench-password", "full_name": "Bench"})
+        token = client.post("/api/auth/login", data={"username": email, "password": "bench-password"}).json()
+        client.headers["Authorization"] = f"Bearer {token['access_token']}"
+
+        goal = call("POST /inputs/goals (2 resources)", "POST", "/inputs/goals", json={
+            "title": "Benchmark goal", "purpose": "Count statements",
+            "resources": [{"resource_type": "time", "name": "1h"}, {"resource_type": "tool", "name": "Laptop"}]
+        })
+        call("PATCH /inputs/goals/{id}", "PATCH", f"/inputs/goals/{goal['id']}", json={"title": "Renamed"})
+        call("POST /inputs/goals/{id}/resources", "POST", f"/inputs/goals/{goal['id']}/resources",
+             json={"resource_type": "money", "name": "Budget"})
+
+        process = call("POST /processes (3 steps)", "POST", "/processes", json={
+            "goal_id": goal["id"], "name": "Benchmark process",
+            "steps": [{"name": f"Step {i}", "sequence_order": i, "estimated_duration_minutes": 20} for i in range(3)]
+        })
+        call("PATCH /processes/{id}", "PATCH", f"/processes/{process['id']}", json={"name": "Renamed"})
+        step = call("POST /processes/{id}/steps", "POST", f"/processes/{process['id']}/steps",
+                    json={"name": "Extra step", "sequence_order": 3})
+        call("PATCH /processes/steps/{id}", "PATCH", f"/processes/steps/{step['id']}", json={"name": "Renamed"})
+
+        today = date.today().isoformat()
+        log = call("POST /operations/logs", "POST", "/operations/logs",
+                   json={"step_id": step["id"], "execution_date": today})
+        call("POST /operations/logs/{id}/start", "POST", f"/operations/logs/{log['id']}/start",
+             json={"actual_start": f"{today}T08:00:00"})
+        call("POST /operations/logs/{id}/complete", "POST", f"/operations/logs/{log['id']}/complete",
+             json={"actual_end": f"{today}T08:30:00", "actual_execution": "Done", "quality_score": 0.9})
+        call("PATCH /operations/logs/{id}", "PATCH", f"/operations/logs/{log['id']}", json={"quality_notes": "Fine"})
+        call("POST /operations/logs/{id}/deviations", "POST", f"/operations/logs/{log['id']}/deviations",
+             json={"deviation_type": "time", "description": "Started late"})
+
+        improvement = call("POST /control/improvements", "POST", "/control/improvements", json={
+            "target_type": "step", "target_id": step["id"], "improvement_type": "simplify",
+            "title": "Simplify", "description": "Fewer checks"
+        })
+        call("PATCH /control/improvements/{id}", "PATCH", f"/control/improvements/{improvement['id']}",
+             json={"status": "approved"})
+        call("POST /control/actions", "POST", "/control/actions", json={
+            "trigger_type": "manual", "action_type": "adjust", "action_description": "Tightened checklist"
+        })
+
+    over = 0
+    print(f"{'endpoint':<42} {'statements':>10} {'budget':>7}")
+    for label, count_, _ in results:
+        budget = BUDGETS[label]
+        flag = "" if count_ <= budget else "  OVER BUDGET"
+        over += count_ > budget
+        print(f"{label:<42} {count_:>10} {budget:>7}{flag}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())